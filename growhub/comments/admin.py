@@ -1,3 +1,10 @@
 from django.contrib import admin
 
-# Register your models here.
+from .models import Comment
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ['id', 'project', 'author', 'depth', 'reply_count', 'is_deleted']
+    list_filter = ['is_deleted']
+    raw_id_fields = ['project', 'position', 'author', 'parent', 'root']
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:55
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('projects', '0009_list_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Comment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(blank=True, default='', max_length=255)),
+                ('depth', models.PositiveSmallIntegerField(default=0)),
+                ('body', models.TextField()),
+                ('reply_count', models.PositiveIntegerField(default=0)),
+                ('thread_size', models.PositiveIntegerField(default=0)),
+                ('is_deleted', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('edited_at', models.DateTimeField(blank=True, null=True)),
+                ('author', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='comments', to=settings.AUTH_USER_MODEL)),
+                ('parent', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='replies', to='comments.comment')),
+                ('position', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='comments', to='projects.projectposition')),
+                ('project', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='projects.project')),
+                ('root', models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='+', to='comments.comment')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['root', 'path'], name='comment_thread_idx'), models.Index(condition=models.Q(('parent__isnull', True)), fields=['project', '-id'], name='comment_project_roots_idx'), models.Index(condition=models.Q(('parent__isnull', True)), fields=['position', '-id'], name='comment_position_roots_idx')],
+            },
+        ),
+    ]
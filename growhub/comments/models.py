@@ -1,3 +1,130 @@
-from django.db import models
+from django.conf import settings
+from django.db import models, transaction
+from django.db.models import F
 
-# Create your models here.
+from projects.models import Project, ProjectPosition
+
+# Глубже ответы не вкладываются: ответ на комментарий этой глубины
+# становится его соседом
+MAX_DEPTH = 8
+# Сегмент пути — id комментария, дополненный нулями: пути сравниваются
+# как строки и сортируются как кортежи id (обход дерева в глубину)
+SEGMENT_WIDTH = 12
+
+
+def path_segment(pk):
+    return f'{pk:0{SEGMENT_WIDTH}d}'
+
+
+class CommentQuerySet(models.QuerySet):
+    def for_read(self):
+        """
+        Комментарии с автором одним запросом: от автора только username.
+        """
+        return self.select_related('author').only(
+            *[field.attname for field in Comment._meta.concrete_fields],
+            'author__id', 'author__username',
+        )
+
+    def thread(self, comment):
+        """
+        Все ответы под комментарием в порядке обхода дерева. Потомки
+        лежат в индексе (root, path) подряд сразу за самим комментарием:
+        страница читается диапазоном от path, сколько бы ни было веток.
+        """
+        return self.filter(
+            root_id=comment.root_id or comment.pk,
+            path__gt=comment.path,
+            path__startswith=comment.path,
+        ).order_by('path')
+
+    def post(self, project, author, body, parent=None, position=None):
+        """
+        Новый комментарий или ответ. Существующие строки не
+        переписываются, меняются только счётчики родителя и корня.
+        """
+        project_id, position_id = project.pk, position and position.pk
+        root_id, depth = None, 0
+        if parent is not None:
+            if parent.depth >= MAX_DEPTH:
+                parent = self.get(pk=parent.parent_id)
+            # Ответ остаётся в той же ветке, что и родитель
+            project_id, position_id = parent.project_id, parent.position_id
+            root_id, depth = parent.root_id or parent.pk, parent.depth + 1
+        with transaction.atomic():
+            comment = self.create(
+                project_id=project_id, position_id=position_id, author=author,
+                parent=parent, root_id=root_id, depth=depth, body=body,
+            )
+            # id известен только после вставки
+            comment.path = (parent.path if parent else '') + path_segment(comment.pk)
+            self.filter(pk=comment.pk).update(path=comment.path)
+            if parent is None:
+                return comment
+            if parent.pk == comment.root_id:
+                self.filter(pk=parent.pk).update(
+                    reply_count=F('reply_count') + 1, thread_size=F('thread_size') + 1
+                )
+            else:
+                self.filter(pk=parent.pk).update(reply_count=F('reply_count') + 1)
+                self.filter(pk=comment.root_id).update(
+                    thread_size=F('thread_size') + 1
+                )
+        return comment
+
+
+class Comment(models.Model):
+    """
+    Комментарий к проекту (или его позиции). Ветка хранится
+    материализованным путём: path — id всех предков и самого
+    комментария, root — корень ветки (у корня пусто).
+    """
+    project = models.ForeignKey(
+        Project, on_delete=models.CASCADE, related_name='comments'
+    )
+    position = models.ForeignKey(
+        ProjectPosition, on_delete=models.SET_NULL, related_name='comments',
+        blank=True, null=True,
+    )
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL,
+        related_name='comments', null=True,
+    )
+    parent = models.ForeignKey(
+        'self', on_delete=models.CASCADE, related_name='replies',
+        blank=True, null=True,
+    )
+    # Индекс по root — первый столбец comment_thread_idx
+    root = models.ForeignKey(
+        'self', on_delete=models.CASCADE, related_name='+',
+        blank=True, null=True, db_index=False,
+    )
+    path = models.CharField(max_length=255, blank=True, default='')
+    depth = models.PositiveSmallIntegerField(default=0)
+    body = models.TextField()
+    # Прямые ответы и (у корня) все ответы ветки
+    reply_count = models.PositiveIntegerField(default=0)
+    thread_size = models.PositiveIntegerField(default=0)
+    # Удалённый комментарий остаётся в ветке без текста
+    is_deleted = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    edited_at = models.DateTimeField(blank=True, null=True)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['root', 'path'], name='comment_thread_idx'),
+            # Ветки проекта/позиции, новые первыми (keyset по id)
+            models.Index(
+                fields=['project', '-id'], name='comment_project_roots_idx',
+                condition=models.Q(parent__isnull=True),
+            ),
+            models.Index(
+                fields=['position', '-id'], name='comment_position_roots_idx',
+                condition=models.Q(parent__isnull=True),
+            ),
+        ]
+
+    def __str__(self):
+        return f'Comment #{self.pk} on {self.project_id}'
@@ -0,0 +1,75 @@
+from rest_framework import serializers
+
+from growhub.metrics import TimedSerializerMixin
+from projects.models import ProjectPosition
+from users.models import User
+from .models import Comment
+
+
+class CommentAuthorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ['id', 'username']
+
+
+class CommentSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    author = CommentAuthorSerializer(read_only=True)
+    project_id = serializers.UUIDField(read_only=True)
+    position_id = serializers.UUIDField(read_only=True)
+    parent_id = serializers.IntegerField(read_only=True)
+    root_id = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = [
+            'id', 'project_id', 'position_id', 'parent_id', 'root_id', 'depth',
+            'author', 'body', 'reply_count', 'thread_size', 'is_deleted',
+            'created_at', 'edited_at',
+        ]
+        read_only_fields = [
+            'depth', 'reply_count', 'thread_size', 'is_deleted', 'edited_at'
+        ]
+
+
+class CommentWriteSerializer(serializers.ModelSerializer):
+    """
+    Новый комментарий: parent — id комментария этого же проекта,
+    position — позиция проекта (у ответа берётся от родителя).
+    """
+    parent = serializers.PrimaryKeyRelatedField(
+        queryset=Comment.objects.only(
+            'id', 'project_id', 'position_id', 'parent_id', 'root_id', 'path', 'depth'
+        ),
+        required=False, allow_null=True,
+    )
+    position = serializers.PrimaryKeyRelatedField(
+        queryset=ProjectPosition.objects.only('id', 'project_id'),
+        required=False, allow_null=True,
+    )
+
+    class Meta:
+        model = Comment
+        fields = ['body', 'parent', 'position']
+
+    def validate(self, attrs):
+        project = self.context['project']
+        for name in ['parent', 'position']:
+            related = attrs.get(name)
+            if related is not None and related.project_id != project.pk:
+                raise serializers.ValidationError(
+                    {name: 'Belongs to another project'}
+                )
+        return attrs
+
+    def create(self, validated_data):
+        return Comment.objects.post(
+            project=self.context['project'],
+            author=self.context['request'].user,
+            **validated_data,
+        )
+
+
+class CommentUpdateSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Comment
+        fields = ['body']
@@ -1,3 +1,128 @@
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
 
-# Create your tests here.
+from projects.models import Project, ProjectPosition
+from users.models import User
+from .models import MAX_DEPTH, Comment
+
+
+class CommentThreadTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='commenter@example.com', username='commenter'
+        )
+        cls.other = User.objects.create_user(
+            email='other@example.com', username='other'
+        )
+        cls.project = Project.objects.create(name='GrowHub', author=cls.author)
+        cls.position = ProjectPosition.objects.create(project=cls.project)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.url = f'/api/projects/{self.project.pk}/comments/'
+
+    def post(self, body, **data):
+        response = self.client.post(self.url, {'body': body, **data}, format='json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return response.json()
+
+    def test_thread_is_depth_first_and_counts_are_denormalized(self):
+        root = self.post('root')
+        first = self.post('first', parent=root['id'])
+        nested = self.post('nested', parent=first['id'])
+        second = self.post('second', parent=root['id'])
+        self.post('another thread')
+
+        root = Comment.objects.get(pk=root['id'])
+        self.assertEqual((root.reply_count, root.thread_size), (2, 3))
+        self.assertEqual(Comment.objects.get(pk=first['id']).reply_count, 1)
+        self.assertEqual(nested['root_id'], root.pk)
+        self.assertEqual(nested['depth'], 2)
+
+        response = self.client.get(f'{self.url}{root.pk}/thread/')
+        bodies = [item['body'] for item in response.json()['results']]
+        self.assertEqual(bodies, ['first', 'nested', 'second'])
+
+        # Поддерево
+        response = self.client.get(f'{self.url}{first["id"]}/thread/')
+        self.assertEqual([item['id'] for item in response.json()['results']],
+                         [nested['id']])
+
+        # Список — только корни, новые первыми
+        response = self.client.get(self.url)
+        self.assertEqual(
+            [item['body'] for item in response.json()['results']],
+            ['another thread', 'root'],
+        )
+        self.assertEqual(second['parent_id'], root.pk)
+
+    def test_pages_cost_the_same_queries(self):
+        root = Comment.objects.post(self.project, self.author, 'root')
+        parent = root
+        for index in range(30):
+            parent = Comment.objects.post(
+                self.project, self.author, f'reply {index}',
+                parent=root if index % 3 == 0 else parent,
+            )
+
+        url = f'{self.url}{root.pk}/thread/?page_size=10'
+        seen, queries = [], []
+        while url:
+            with CaptureQueriesContext(connection) as context:
+                data = self.client.get(url).json()
+            queries.append(len(context))
+            seen += [item['id'] for item in data['results']]
+            url = data['next']
+        self.assertEqual(len(seen), 30)
+        self.assertEqual(seen, sorted(seen, key=lambda pk: Comment.objects.get(
+            pk=pk).path))
+        self.assertEqual(len(set(queries)), 1)
+
+    def test_depth_is_capped(self):
+        comment = None
+        for index in range(MAX_DEPTH + 2):
+            comment = Comment.objects.post(
+                self.project, self.author, str(index), parent=comment
+            )
+        self.assertEqual(comment.depth, MAX_DEPTH)
+
+    def test_replies_stay_in_project_and_position(self):
+        thread = self.post('about the position', position=str(self.position.pk))
+        reply = self.post('reply', parent=thread['id'])
+        self.assertEqual(reply['position_id'], str(self.position.pk))
+        response = self.client.get(self.url, {'position': str(self.position.pk)})
+        self.assertEqual([item['id'] for item in response.json()['results']],
+                         [thread['id']])
+
+        other_project = Project.objects.create(name='Other', author=self.author)
+        response = self.client.post(
+            f'/api/projects/{other_project.pk}/comments/',
+            {'body': 'wrong', 'parent': thread['id']}, format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_only_author_edits_and_delete_keeps_thread(self):
+        root = self.post('root')
+        reply = self.post('reply', parent=root['id'])
+
+        other = APIClient()
+        other.force_authenticate(self.other)
+        response = other.patch(f'{self.url}{root["id"]}/', {'body': 'hacked'})
+        self.assertEqual(response.status_code, 403)
+
+        response = self.client.patch(f'{self.url}{root["id"]}/', {'body': 'edited'})
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNotNone(response.json()['edited_at'])
+
+        response = self.client.delete(f'{self.url}{root["id"]}/')
+        self.assertEqual(response.status_code, 204)
+        response = self.client.get(f'{self.url}{root["id"]}/')
+        self.assertEqual((response.json()['is_deleted'], response.json()['body']),
+                         (True, ''))
+        self.assertEqual(response.json()['thread_size'], 1)
+        response = self.client.get(f'{self.url}{root["id"]}/thread/')
+        self.assertEqual(response.json()['results'][0]['id'], reply['id'])
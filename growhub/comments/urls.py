@@ -0,0 +1,14 @@
+from django.urls import path, include
+from rest_framework_nested import routers
+
+from projects.urls import router as projects_router
+from .views import CommentViewSet
+
+comments_router = routers.NestedSimpleRouter(
+    projects_router, r'projects', lookup='project'
+)
+comments_router.register(r'comments', CommentViewSet, basename='project-comments')
+
+urlpatterns = [
+    path('', include(comments_router.urls)),
+]
@@ -1,3 +1,105 @@
-from django.shortcuts import render
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import permissions, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
 
-# Create your views here.
+from growhub.pagination import KeysetPagination
+from projects.models import Project
+from .models import Comment
+from .serializers import (CommentSerializer, CommentUpdateSerializer,
+                          CommentWriteSerializer)
+
+
+class IsCommentAuthorOrReadOnly(permissions.BasePermission):
+    def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        return obj.author_id == request.user.pk
+
+
+class ThreadPagination(KeysetPagination):
+    """
+    Ответы ветки по path: путь уникален, поэтому id в ключ не добавляется.
+    """
+    ordering = 'path'
+    tiebreaker = 'path'
+    page_size = 50
+    max_page_size = 200
+
+
+class CommentViewSet(viewsets.ModelViewSet):
+    """
+    Комментарии проекта: список — корни веток (новые первыми,
+    ?position= — ветки позиции), thread — ответы под комментарием
+    в порядке обхода дерева. Удаление оставляет комментарий в ветке
+    без текста.
+    """
+    filterset_fields = ['position']
+    ordering = ['-id']
+    http_method_names = ['get', 'post', 'patch', 'delete', 'head', 'options']
+
+    def get_project(self):
+        if not hasattr(self, '_project'):
+            self._project = get_object_or_404(
+                Project.objects.only('id'), pk=self.kwargs['project_pk']
+            )
+        return self._project
+
+    def get_queryset(self):
+        queryset = Comment.objects.for_read().filter(project=self.get_project())
+        if self.action == 'list':
+            queryset = queryset.filter(parent__isnull=True)
+        elif self.action in ['partial_update', 'destroy']:
+            queryset = queryset.filter(is_deleted=False)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'create':
+            return CommentWriteSerializer
+        if self.action == 'partial_update':
+            return CommentUpdateSerializer
+        return CommentSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        if 'project_pk' in self.kwargs:
+            context['project'] = self.get_project()
+        return context
+
+    def get_permissions(self):
+        if self.action in ['partial_update', 'destroy']:
+            return [permissions.IsAuthenticated(), IsCommentAuthorOrReadOnly()]
+        return [permissions.IsAuthenticatedOrReadOnly()]
+
+    def create(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        comment = serializer.save()
+        comment = Comment.objects.for_read().get(pk=comment.pk)
+        return Response(CommentSerializer(comment).data, status=201)
+
+    def partial_update(self, request, *args, **kwargs):
+        comment = self.get_object()
+        serializer = self.get_serializer(comment, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        serializer.save(edited_at=timezone.now())
+        return Response(CommentSerializer(comment).data)
+
+    def perform_destroy(self, instance):
+        # Строка остаётся: ответы и счётчики ветки не меняются
+        Comment.objects.filter(pk=instance.pk).update(is_deleted=True, body='')
+
+    @action(detail=True, methods=['get'])
+    def thread(self, request, *args, **kwargs):
+        """
+        Ответы под комментарием (все уровни), курсорная пагинация по path
+        """
+        comment = self.get_object()
+        paginator = ThreadPagination()
+        page = paginator.paginate_queryset(
+            Comment.objects.for_read().thread(comment), request
+        )
+        return paginator.get_paginated_response(
+            CommentSerializer(page, many=True).data
+        )
@@ -0,0 +1,103 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.http import Http404
+from rest_framework.response import Response
+
+from growhub.lookups import acurrent_lookups
+
+
+class AsyncReadMixin:
+    """
+    Async-версии list/retrieve для ASGI-режима (ASYNC_READ_VIEWS).
+
+    GET-запросы к async_actions обрабатываются корутиной: страница или
+    объект читаются через async ORM, и воркер не держит поток на время
+    ожидания БД и медленного клиента. Остальные методы того же URL
+    уходят в обычный синхронный вьюсет.
+    """
+    async_actions = ('list', 'retrieve')
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not getattr(settings, 'ASYNC_READ_VIEWS', False):
+            return view
+
+        async_methods = {
+            method: action for method, action in actions.items()
+            if method == 'get' and action in cls.async_actions
+        }
+        if not async_methods:
+            return view
+        sync_view = sync_to_async(view)
+
+        async def async_view(request, *args, **kwargs):
+            action = async_methods.get(request.method.lower())
+            if action is None:
+                return await sync_view(request, *args, **kwargs)
+            self = cls(**initkwargs)
+            self.action_map = actions
+            return await self.adispatch(request, action, *args, **kwargs)
+
+        async_view.cls = view.cls
+        async_view.initkwargs = view.initkwargs
+        async_view.actions = view.actions
+        async_view.csrf_exempt = True
+        return async_view
+
+    async def adispatch(self, request, action, *args, **kwargs):
+        self.args = args
+        self.kwargs = kwargs
+        request = self.initialize_request(request, *args, **kwargs)
+        self.request = request
+        self.headers = self.default_response_headers
+
+        try:
+            # Аутентификация, права и троттлинг — синхронные
+            await sync_to_async(self.initial)(request, *args, **kwargs)
+            self.lookup_context = await acurrent_lookups()
+            handler = getattr(self, f'a{action}')
+            response = await handler(request, *args, **kwargs)
+        except Exception as exc:
+            response = self.handle_exception(exc)
+
+        self.response = self.finalize_response(request, response, *args, **kwargs)
+        return self.response
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        return {**context, **getattr(self, 'lookup_context', {})}
+
+    async def afilter_queryset(self):
+        # Валидация фильтров может обращаться к БД (ModelChoiceFilter)
+        return await sync_to_async(self.filter_queryset)(self.get_queryset())
+
+    async def aget_object(self):
+        queryset = await self.afilter_queryset()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        lookup = {self.lookup_field: self.kwargs[lookup_url_kwarg]}
+        try:
+            obj = await queryset.aget(**lookup)
+        except (queryset.model.DoesNotExist, TypeError, ValueError, ValidationError):
+            raise Http404
+        self.check_object_permissions(self.request, obj)
+        return obj
+
+    async def alist(self, request, *args, **kwargs):
+        queryset = await self.afilter_queryset()
+        page = None
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(
+                queryset, request, view=self
+            )
+        if page is None:
+            objects = [obj async for obj in queryset]
+            return Response(self.get_serializer(objects, many=True).data)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        instance = await self.aget_object()
+        serializer = self.get_serializer(instance)
+        return Response(serializer.data)
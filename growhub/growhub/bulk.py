@@ -0,0 +1,149 @@
+from collections import namedtuple
+from contextvars import ContextVar
+
+from django.db import connections, models, transaction
+
+SyncResult = namedtuple('SyncResult', ['created', 'updated', 'deleted'])
+
+# (модель, pk родителя), чьи строки сейчас сверяет sync_related
+_syncing = ContextVar('bulk_syncing', default=frozenset())
+
+
+def is_syncing(model, parent_id):
+    """
+    Строки model родителя parent_id сверяет sync_related: сигналам
+    строк не нужно сдвигать версию родителя, её сдвигает его save().
+    """
+    return (model, parent_id) in _syncing.get()
+
+
+def delete_rows(model, pks, using='default'):
+    """
+    Удаляет строки одним DELETE, без загрузки объектов и сигналов.
+    Ссылки на них с on_delete=SET_NULL обнуляются одним UPDATE на
+    связь, как это сделал бы Collector. Если у модели есть каскады или
+    M2M, строки удаляются обычным delete(). Возвращает число строк.
+    """
+    relations = model._meta.related_objects
+    if model._meta.many_to_many or any(
+        getattr(relation, 'on_delete', None) not in (models.SET_NULL, models.DO_NOTHING)
+        for relation in relations
+    ):
+        return model._base_manager.using(using).filter(pk__in=pks).delete()[0]
+
+    for relation in relations:
+        if relation.on_delete is models.SET_NULL:
+            name = relation.field.name
+            relation.related_model._base_manager.using(using).filter(
+                **{f'{name}__in': pks}
+            ).update(**{name: None})
+    return model._base_manager.using(using).filter(pk__in=pks)._raw_delete(using)
+
+
+def sync_related(queryset, items, fields, **parent):
+    """
+    Приводит набор дочерних строк (queryset) к списку items.
+
+    Строки сопоставляются по id: новые вставляются одним bulk_create,
+    изменившиеся обновляются одним bulk_update (только реально
+    изменённые поля), отсутствующие в items удаляются одним DELETE
+    (delete_rows). Сигналы строк не срабатывают: версию, кэш и события
+    родителя обновляет его save(). Неизвестный id считается новой
+    строкой. parent — значения FK, которые проставляются создаваемым
+    строкам (например, project=...). Возвращает SyncResult с
+    количеством затронутых строк.
+    """
+    model = queryset.model
+    existing = {obj.pk: obj for obj in queryset}
+    to_create, to_update, changed_fields, seen = [], [], set(), set()
+
+    for item in items:
+        item = dict(item)
+        obj = existing.get(item.pop('id', None))
+        if obj is None:
+            to_create.append(model(**parent, **item))
+            continue
+
+        seen.add(obj.pk)
+        changed = [
+            field for field in fields
+            if field in item and getattr(obj, field) != item[field]
+        ]
+        for field in changed:
+            setattr(obj, field, item[field])
+        if changed:
+            to_update.append(obj)
+            changed_fields.update(changed)
+
+    to_delete = [pk for pk in existing if pk not in seen]
+
+    parents = {(model, getattr(value, 'pk', value)) for value in parent.values()}
+    token = _syncing.set(_syncing.get() | parents)
+    try:
+        with transaction.atomic(using=queryset.db):
+            if to_delete:
+                delete_rows(model, to_delete, using=queryset.db)
+            if to_create:
+                model.objects.bulk_create(to_create)
+            if to_update:
+                model.objects.bulk_update(to_update, sorted(changed_fields))
+    finally:
+        _syncing.reset(token)
+
+    return SyncResult(len(to_create), len(to_update), len(to_delete))
+
+
+def insert_rows(model, fields, rows, using='default'):
+    """
+    Вставляет кортежи значений полей fields без экземпляров модели и
+    компиляции INSERT на каждую строку: в PostgreSQL (psycopg 3) —
+    COPY, иначе одним executemany. Для связующих таблиц M2M: ни
+    сигналов, ни значений по умолчанию.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = [model._meta.get_field(name) for name in fields]
+    table = quote(model._meta.db_table)
+    names = ', '.join(quote(column.column) for column in columns)
+    params = [
+        [
+            column.get_db_prep_save(value, connection)
+            for column, value in zip(columns, row)
+        ]
+        for row in rows
+    ]
+    if not params:
+        return
+    with connection.cursor() as cursor:
+        if _can_copy(connection):
+            with cursor.cursor.copy(f'COPY {table} ({names}) FROM STDIN') as copy:
+                for values in params:
+                    copy.write_row(values)
+            return
+        cursor.executemany(
+            'INSERT INTO {} ({}) VALUES ({})'.format(
+                table, names, ', '.join(['%s'] * len(columns))
+            ),
+            params,
+        )
+
+
+def _can_copy(connection):
+    if connection.vendor != 'postgresql':
+        return False
+    from django.db.backends.postgresql.psycopg_any import is_psycopg3
+    return is_psycopg3
+
+
+def insert_objects(objs, using='default'):
+    """
+    bulk_create через insert_rows для моделей, чей pk задаётся в
+    Python (UUID): все поля строки, значения auto_now/auto_now_add
+    проставляются как при save(). Без сигналов и без RETURNING.
+    """
+    if not objs:
+        return
+    model = type(objs[0])
+    fields = model._meta.concrete_fields
+    rows = [[field.pre_save(obj, True) for field in fields] for obj in objs]
+    insert_rows(model, [field.name for field in fields], rows, using)
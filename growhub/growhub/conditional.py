@@ -0,0 +1,71 @@
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalRetrieveMixin:
+    """
+    ETag / Last-Modified для retrieve по полю updated_at.
+
+    Версия объекта читается одним узким запросом (только updated_at),
+    без вложенных связей; если клиент прислал актуальный валидатор,
+    ответ 304 отдаётся до запуска сериализатора.
+    """
+    version_field = 'updated_at'
+
+    def get_lookup_value(self):
+        return self.kwargs[self.lookup_url_kwarg or self.lookup_field]
+
+    def get_object_version(self):
+        lookup = {self.lookup_field: self.get_lookup_value()}
+        try:
+            return self.get_queryset().filter(**lookup).values_list(
+                self.version_field, flat=True
+            ).first()
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+    async def aget_object_version(self):
+        lookup = {self.lookup_field: self.get_lookup_value()}
+        try:
+            return await self.get_queryset().filter(**lookup).values_list(
+                self.version_field, flat=True
+            ).afirst()
+        except (TypeError, ValueError, ValidationError):
+            return None
+
+    def get_validators(self, updated_at):
+        etag = quote_etag(f'{self.get_lookup_value()}-{updated_at.timestamp():.6f}')
+        return etag, int(updated_at.timestamp())
+
+    def set_validators(self, response, etag, last_modified):
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        updated_at = self.get_object_version()
+        if updated_at is None:
+            return super().retrieve(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(updated_at)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().retrieve(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        updated_at = await self.aget_object_version()
+        if updated_at is None:
+            return await super().aretrieve(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(updated_at)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = await super().aretrieve(request, *args, **kwargs)
+        return self.set_validators(response, etag, last_modified)
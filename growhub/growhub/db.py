@@ -0,0 +1,97 @@
+import threading
+from collections import Counter
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+POSTGRESQL = 'django.db.backends.postgresql'
+
+# Счётчики psycopg_pool: get_stats() не возвращает нулевые
+POOL_STATS = (
+    'pool_min', 'pool_max', 'pool_size', 'pool_available', 'requests_waiting',
+    'requests_num', 'requests_queued', 'requests_wait_ms', 'requests_errors',
+    'usage_ms', 'connections_num', 'connections_ms', 'connections_errors',
+    'connections_lost', 'returns_bad',
+)
+
+_lock = threading.Lock()
+_connects = Counter()
+
+
+def configure_database(config, *, conn_max_age, health_checks, pool=False,
+                       pool_min_size=2, pool_max_size=4, pool_timeout=10.0):
+    """
+    Соединения для DATABASES из DATABASE_URL: постоянные (CONN_MAX_AGE
+    с проверкой перед повторным использованием) или пул psycopg на
+    воркер (только PostgreSQL, нужен psycopg[pool]). Заданное в самом
+    URL (?conn_max_age=, OPTIONS) не перезаписывается.
+    """
+    config = {**config, 'OPTIONS': {**config.get('OPTIONS', {})}}
+    # С пулом проверка соединения — check пула при выдаче соединения
+    config.setdefault('CONN_HEALTH_CHECKS', health_checks)
+    if not pool:
+        config.setdefault('CONN_MAX_AGE', conn_max_age)
+        return config
+
+    if config['ENGINE'] != POSTGRESQL:
+        raise ImproperlyConfigured('DB_POOL requires PostgreSQL')
+    config['OPTIONS'].setdefault('pool', {
+        'min_size': pool_min_size,
+        'max_size': max(pool_min_size, pool_max_size),
+        # Сколько запрос ждёт свободное соединение, прежде чем упасть
+        'timeout': pool_timeout,
+    })
+    # Соединения держит пул: Django не даёт совмещать его с CONN_MAX_AGE
+    config['CONN_MAX_AGE'] = 0
+    return config
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    with _lock:
+        _connects[connection.alias] += 1
+
+
+connection_created.connect(_on_connection_created)
+
+
+def connection_mode(connection):
+    if connection.settings_dict['OPTIONS'].get('pool'):
+        return 'pool'
+    if connection.settings_dict['CONN_MAX_AGE'] == 0:
+        return 'per_request'
+    return 'persistent'
+
+
+def database_stats():
+    """
+    Соединения текущего процесса по алиасам: connects — открытия
+    соединения в Django (с пулом — выдачи из пула), pool — статистика
+    psycopg_pool (ожидание и использование соединений).
+    """
+    stats = {}
+    for alias in connections:
+        connection = connections[alias]
+        mode = connection_mode(connection)
+        with _lock:
+            connects = _connects[alias]
+        stats[alias] = {
+            'vendor': connection.vendor,
+            'mode': mode,
+            'conn_max_age': connection.settings_dict['CONN_MAX_AGE'],
+            'health_checks': connection.settings_dict['CONN_HEALTH_CHECKS'],
+            'connects': connects,
+        }
+        if mode == 'pool':
+            stats[alias]['pool'] = {
+                **dict.fromkeys(POOL_STATS, 0), **connection.pool.get_stats()
+            }
+    return stats
+
+
+def reset_database_stats():
+    with _lock:
+        _connects.clear()
+    for alias in connections:
+        if connection_mode(connections[alias]) == 'pool':
+            connections[alias].pool.pop_stats()
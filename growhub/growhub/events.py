@@ -0,0 +1,310 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import time
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.db import connection, transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger('growhub.events')
+
+
+# Подписчик отстал и потерял события: клиенту нужно перечитать данные
+RESET = {'type': 'reset'}
+
+
+def matches(filters, event):
+    """
+    filters — {ключ события: множество значений}. Событие подходит,
+    если по каждому ключу у него есть хотя бы одно из значений.
+    """
+    return all(
+        not values.isdisjoint(event.get(key, ())) for key, values in filters.items()
+    )
+
+
+class Subscription:
+    """
+    Очередь событий одного клиента в его event loop. При переполнении
+    (клиент не успевает читать) очередь заменяется одним RESET.
+    """
+
+    def __init__(self, filters, loop=None):
+        self.filters = filters
+        self.loop = loop or asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=settings.EVENTS_QUEUE_SIZE)
+
+    def deliver(self, event):
+        # Вызывается в потоке event loop подписчика
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESET)
+
+
+class Broker:
+    """
+    Раздача событий подписчикам процесса. Публикует бэкенд: локальный
+    сразу, общий — после того как событие вернулось из общего хранилища.
+    Последние EVENTS_BUFFER_SIZE событий хранятся для переподключения
+    с Last-Event-ID.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+        self.buffer = deque(maxlen=settings.EVENTS_BUFFER_SIZE)
+        self._backend = None
+
+    @property
+    def backend(self):
+        if self._backend is None:
+            self._backend = import_string(settings.EVENTS_BACKEND)(self)
+        return self._backend
+
+    def publish(self, event):
+        self.backend.publish(event)
+
+    def dispatch(self, event):
+        """
+        Событие с id — подписчикам процесса; из любого потока.
+        """
+        with self.lock:
+            self.buffer.append(event)
+            targets = [sub for sub in self.subscriptions if matches(sub.filters, event)]
+        for sub in targets:
+            try:
+                sub.loop.call_soon_threadsafe(sub.deliver, event)
+            except RuntimeError:
+                # Event loop уже закрыт: подписка умрёт вместе с ним
+                pass
+
+    def is_full(self):
+        return len(self.subscriptions) >= settings.EVENTS_MAX_SUBSCRIBERS
+
+    def subscribe(self, filters, last_event_id=None):
+        """
+        Новая подписка и события после last_event_id из буфера.
+        None вместо списка — часть событий уже вытеснена из буфера.
+        """
+        sub = Subscription(filters)
+        with self.lock:
+            self.subscriptions.add(sub)
+            missed = []
+            if last_event_id is not None:
+                missed = self.replay(filters, last_event_id)
+        self.backend.subscribed()
+        return sub, missed
+
+    def replay(self, filters, last_event_id):
+        # Буфер должен начинаться не позже следующего за last_event_id
+        # события и доходить до него (иначе id из другого процесса)
+        if (not self.buffer or self.buffer[0]['id'] > last_event_id + 1
+                or self.buffer[-1]['id'] < last_event_id):
+            return None
+        return [
+            event for event in self.buffer
+            if event['id'] > last_event_id and matches(filters, event)
+        ]
+
+    def unsubscribe(self, sub):
+        with self.lock:
+            self.subscriptions.discard(sub)
+
+
+class LocalBackend:
+    """
+    События только своего процесса: хватает одного ASGI-воркера.
+    Нумерация начинается с текущего времени в мс, чтобы id после
+    перезапуска не повторяли старые.
+    """
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.counter = itertools.count(time.time_ns() // 1_000_000)
+        self.lock = threading.Lock()
+
+    def publish(self, event):
+        with self.lock:
+            event = {'id': next(self.counter), **event}
+            self.broker.dispatch(event)
+
+    def subscribed(self):
+        pass
+
+
+class CacheBackend:
+    """
+    Общий поток событий для нескольких воркеров через общий кэш
+    (CACHE_URL: Redis/Memcached): номер — cache.incr, событие — ключ
+    с этим номером. Каждый процесс с подписчиками опрашивает номер
+    раз в EVENTS_POLL_INTERVAL секунд в фоновом потоке и раздаёт
+    новые события сам. Номера общие, поэтому Last-Event-ID работает
+    при переподключении к другому воркеру.
+    """
+    sequence_key = 'events:seq'
+    # Номер уже выдан, а событие ещё не записано: ждать не дольше
+    missing_grace = 2.0
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.lock = threading.Lock()
+        self.thread = None
+        self.last_id = None
+
+    def publish(self, event):
+        cache.add(self.sequence_key, 0, timeout=None)
+        event_id = cache.incr(self.sequence_key)
+        cache.set(
+            f'events:{event_id}', {'id': event_id, **event},
+            timeout=settings.EVENTS_RETENTION,
+        )
+
+    def subscribed(self):
+        with self.lock:
+            if self.thread is None:
+                self.last_id = cache.get(self.sequence_key, 0)
+                self.thread = threading.Thread(
+                    target=self.run, name='events-poller', daemon=True
+                )
+                self.thread.start()
+
+    def run(self):
+        missing_since = None
+        while True:
+            time.sleep(settings.EVENTS_POLL_INTERVAL)
+            try:
+                missing_since = self.poll(missing_since)
+            except Exception:
+                logger.exception('Events poll failed')
+
+    def poll(self, missing_since=None):
+        current = cache.get(self.sequence_key, 0)
+        if current <= self.last_id:
+            return None
+        # Отставшему процессу старые события уже не помогут: их нет в буфере
+        self.last_id = max(self.last_id, current - settings.EVENTS_BUFFER_SIZE)
+        keys = [f'events:{n}' for n in range(self.last_id + 1, current + 1)]
+        found = cache.get_many(keys)
+        for key in keys:
+            event = found.get(key)
+            if event is None:
+                if missing_since is None:
+                    return time.monotonic()
+                if time.monotonic() - missing_since < self.missing_grace:
+                    return missing_since
+                # Событие так и не появилось (или истекло): пропуск
+                missing_since = None
+            else:
+                self.broker.dispatch(event)
+            self.last_id += 1
+        return None
+
+
+broker = Broker()
+
+
+_scheduled = threading.local()
+
+
+def publish_on_commit(key, build, replace=False):
+    """
+    Событие уходит подписчикам после коммита: клиент, перечитавший
+    данные по событию, увидит изменение. build() вызывается после
+    коммита и видит итоговые строки; несколько правок одного объекта
+    в транзакции (key) дают одно событие — первое, если replace не
+    задан (создание и правка — это создание), иначе последнее
+    (удаление после правки).
+    """
+    scheduled = _scheduled.__dict__.setdefault('callbacks', {})
+    pending = scheduled.get(key)
+    # После отката колбэков транзакции в run_on_commit уже нет
+    if pending is not None and any(
+        item[1] is pending for item in connection.run_on_commit
+    ):
+        if replace:
+            pending.build = build
+        return
+
+    def publish():
+        scheduled.pop(key, None)
+        event = publish.build()
+        if event is not None:
+            broker.publish(event)
+
+    publish.build = build
+    scheduled[key] = publish
+    # Ошибка публикации не должна ронять уже закоммиченный запрос
+    transaction.on_commit(publish, robust=True)
+
+
+def format_event(event):
+    data = json.dumps(event, separators=(',', ':'))
+    return f'id: {event["id"]}\nevent: {event["type"]}\ndata: {data}\n\n'
+
+
+def format_reset():
+    return 'event: reset\ndata: {}\n\n'
+
+
+async def stream_events(filters, last_event_id=None):
+    """
+    Поток SSE одной подписки. Подписка живёт, пока поток читают:
+    отключение клиента закрывает генератор.
+    """
+    sub, missed = broker.subscribe(filters, last_event_id)
+    try:
+        yield f'retry: {settings.EVENTS_RETRY_MS}\n\n'
+        if missed is None:
+            yield format_reset()
+        for event in missed or []:
+            yield format_event(event)
+        while True:
+            try:
+                event = await asyncio.wait_for(
+                    sub.queue.get(), timeout=settings.EVENTS_HEARTBEAT
+                )
+            except asyncio.TimeoutError:
+                # Комментарий держит соединение через прокси
+                yield ': keep-alive\n\n'
+                continue
+            yield format_reset() if event is RESET else format_event(event)
+    finally:
+        broker.unsubscribe(sub)
+
+
+def event_stream_response(request, filters):
+    """
+    Ответ text/event-stream для подписки с filters (только под ASGI:
+    под WSGI бесконечный поток занял бы поток воркера целиком).
+    Переподключение с Last-Event-ID досылает пропущенные события.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': 'Event stream requires ASGI'}, status=501)
+
+    last_event_id = request.headers.get('Last-Event-ID') or request.GET.get(
+        'last_event_id'
+    )
+    try:
+        last_event_id = int(last_event_id) if last_event_id else None
+    except ValueError:
+        return JsonResponse({'last_event_id': 'Expected an integer'}, status=400)
+
+    if broker.is_full():
+        return JsonResponse({'detail': 'Too many subscribers'}, status=503)
+    response = StreamingHttpResponse(
+        stream_events(filters, last_event_id), content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    # Буферизация в nginx задержала бы события
+    response['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,24 @@
+"""
+Хуки gunicorn для manage.py serve (-c python:growhub.gunicorn_conf).
+"""
+import logging
+
+logger = logging.getLogger('growhub.server')
+
+
+def post_worker_init(worker):
+    """
+    Прогрев индекса подбора до первого запроса: полная сборка идёт
+    при старте воркера, а не в запросе пользователя.
+    """
+    from django.db import connections
+
+    from projects.matching import matching_index
+
+    try:
+        matching_index.ensure_current()
+    except Exception:
+        # Без прогрева индекс соберётся в первом запросе
+        logger.warning('Matching index warm-up failed', exc_info=True)
+    finally:
+        connections.close_all()
@@ -0,0 +1,150 @@
+import threading
+
+from asgiref.sync import sync_to_async
+from rest_framework import serializers
+
+from growhub.response_cache import aget_generation, get_generation
+
+# Все таблицы процесса: async-вьюхи сверяют их заранее (acurrent_lookups)
+_tables = []
+# False — снимок дан заранее, перечитывать таблицу из поля нельзя
+REFRESH_CONTEXT_KEY = 'lookup:refresh'
+
+
+class LookupTable:
+    """
+    Небольшой редко меняющийся справочник в памяти процесса:
+    {id: строка, готовая для ответа}.
+
+    Версия — поколение namespace в общем кэше (то же, что у кэша
+    ответов): запись сдвигает его через invalidate(), и каждый
+    процесс перечитывает таблицу целиком при следующем обращении.
+    Без общего кэша (CACHE_URL) таблица другого воркера отстаёт,
+    поэтому id на запись проверяются по базе (missing).
+    """
+
+    def __init__(self, namespace, queryset, fields):
+        self.namespace = namespace
+        self.queryset = queryset
+        self.fields = fields
+        self.lock = threading.Lock()
+        self.generation = None
+        self.rows = {}
+        _tables.append(self)
+
+    @property
+    def context_key(self):
+        return f'lookup:{self.namespace}'
+
+    def __deepcopy__(self, memo):
+        # Поля DRF копируются вместе с аргументами при создании
+        # сериализатора, а таблица одна на процесс
+        return self
+
+    def current(self):
+        generation = get_generation(self.namespace)
+        if generation != self.generation:
+            with self.lock:
+                if generation != self.generation:
+                    self.load(generation)
+        return self.rows
+
+    async def acurrent(self):
+        if await aget_generation(self.namespace) != self.generation:
+            await sync_to_async(self.current)()
+        return self.rows
+
+    def load(self, generation=None):
+        rows = {
+            row['id']: {**row, 'id': str(row['id'])}
+            for row in self.queryset.all().values(*self.fields)
+        }
+        # Словарь заменяется целиком: читатели без блокировки видят
+        # либо старую, либо новую таблицу
+        self.rows, self.generation = rows, generation
+        return rows
+
+    def missing(self, ids):
+        """
+        id, которых нет в базе: одним запросом, и для тех, что есть в
+        таблице (строку могли удалить в другом воркере), и для тех, что
+        в ней не нашлись (строку могли только что создать).
+        """
+        if not ids:
+            return []
+        existing = set(
+            self.queryset.filter(pk__in=ids).values_list('pk', flat=True)
+        )
+        return [pk for pk in ids if pk not in existing]
+
+
+async def acurrent_lookups():
+    """
+    Снимки всех таблиц для context сериализатора: в async-вьюхе
+    поле не может само сходить в кэш и базу.
+    """
+    context = {table.context_key: await table.acurrent() for table in _tables}
+    context[REFRESH_CONTEXT_KEY] = False
+    return context
+
+
+class LookupRelatedField(serializers.Field):
+    """
+    Связанные строки справочника (many-to-many): из базы нужны только
+    id связей, сами строки берутся из LookupTable. Поколение сверяется
+    один раз на сериализацию — снимок таблицы лежит в context.
+    """
+
+    def __init__(self, table, **kwargs):
+        self.table = table
+        kwargs['read_only'] = True
+        super().__init__(**kwargs)
+
+    def get_attribute(self, instance):
+        return super().get_attribute(instance).all()
+
+    def get_rows(self, refresh=False):
+        key = self.table.context_key
+        if refresh:
+            # Строка новее снимка: таблица перечитывается один раз
+            self.context[key] = self.table.load(self.table.generation)
+        elif key not in self.context:
+            self.context[key] = self.table.current()
+        return self.context[key]
+
+    def to_representation(self, related):
+        return self.represent_ids(obj.pk for obj in related)
+
+    def represent_ids(self, ids):
+        rows = self.get_rows()
+        result = []
+        refresh = self.context.get(REFRESH_CONTEXT_KEY, True)
+        for pk in ids:
+            if pk not in rows and refresh:
+                rows = self.get_rows(refresh=True)
+                refresh = False
+            if pk in rows:
+                result.append(dict(rows[pk]))
+        return result
+
+
+class LookupIdsField(serializers.ListField):
+    """
+    Список id справочника на запись: неизвестные id отклоняются
+    одним запросом к базе (LookupTable.missing).
+    """
+    child = serializers.UUIDField()
+    default_error_messages = {
+        'unknown': 'Unknown ids: {ids}.',
+    }
+
+    def __init__(self, table, **kwargs):
+        self.table = table
+        super().__init__(**kwargs)
+
+    def to_internal_value(self, data):
+        ids = list(dict.fromkeys(super().to_internal_value(data)))
+        missing = self.table.missing(ids)
+        if missing:
+            self.fail('unknown', ids=', '.join(map(str, missing)))
+        return ids
@@ -0,0 +1,244 @@
+import json
+import statistics
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import NoReverseMatch, reverse
+from rest_framework.test import APIClient
+
+from projects.models import Project, ProjectPosition
+from users.models import User
+from users.serializers import ClaimsTokenObtainPairSerializer
+
+# Модули с роутерами: бенчмарк проходит по всем их GET-маршрутам
+ROUTER_MODULES = ['users.urls', 'projects.urls']
+
+
+def percentile(values, q):
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def iter_routers(module_name):
+    module = __import__(module_name, fromlist=['urlpatterns'])
+    for value in vars(module).values():
+        if hasattr(value, 'registry') and hasattr(value, 'get_routes'):
+            yield value
+
+
+def get_sample(viewset):
+    """
+    Объект для detail-маршрутов: по модели вьюсета, детерминированно.
+    """
+    queryset = getattr(viewset, 'queryset', None)
+    if queryset is not None:
+        model = queryset.model
+    else:
+        model = viewset.serializer_class.Meta.model
+    if model is ProjectPosition:
+        # Открытая позиция, чтобы подбор кандидатов не был пустым
+        return model.objects.filter(count_needed__gt=0).order_by('pk').first()
+    if model is Project:
+        return model.objects.filter(positions__isnull=False).order_by('pk').first()
+    return model.objects.order_by('pk').first()
+
+
+def router_endpoints(router):
+    parent_kwarg = getattr(router, 'nest_prefix', None)
+    for prefix, viewset, basename in router.registry:
+        sample = get_sample(viewset)
+        base_kwargs = {}
+        if parent_kwarg:
+            # Вложенный роутер: родитель берётся из самого объекта
+            if sample is None:
+                continue
+            parent_field = parent_kwarg.rstrip('_') + '_id'
+            base_kwargs[f'{parent_kwarg}pk'] = getattr(sample, parent_field)
+
+        for route in router.get_routes(viewset):
+            if 'get' not in router.get_method_map(viewset, route.mapping):
+                continue
+            kwargs = dict(base_kwargs)
+            if route.detail:
+                if sample is None:
+                    continue
+                kwargs['pk'] = sample.pk
+            name = route.name.format(basename=basename)
+            try:
+                yield name, reverse(name, kwargs=kwargs)
+            except NoReverseMatch:
+                continue
+
+
+def collect_endpoints():
+    """
+    [(url name, url)] для всех GET-маршрутов роутеров из ROUTER_MODULES.
+    """
+    endpoints = {}
+    for module_name in ROUTER_MODULES:
+        for router in iter_routers(module_name):
+            endpoints.update(router_endpoints(router))
+    return sorted(endpoints.items())
+
+
+class Command(BaseCommand):
+    help = (
+        'Бенчмарк GET-эндпоинтов роутеров users/projects через тестовый '
+        'клиент: перцентили задержки, число запросов к БД и пик памяти. '
+        'Результат пишется в JSON; --compare сверяет его с baseline.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--output', help='Куда сохранить результат (JSON)')
+        parser.add_argument('--compare', help='Baseline (JSON) для сравнения')
+        parser.add_argument('--threshold', type=float, default=0.25,
+                            help='Допустимый рост p95 и памяти (доля)')
+        parser.add_argument('--min-delta-ms', type=float, default=2.0,
+                            help='Рост p95 меньше этого значения считается шумом')
+        parser.add_argument('--user', help='Email пользователя для запросов')
+        parser.add_argument('--filter', default='',
+                            help='Только маршруты, имя которых содержит строку')
+        parser.add_argument('--with-cache', action='store_true',
+                            help='Не отключать кэш ответов')
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['user'])
+        with override_settings(
+            ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver'],
+            RESPONSE_CACHE_ENABLED=options['with_cache'],
+        ):
+            results = self.run(user, options)
+
+        report = {
+            'meta': {
+                'created': datetime.now(timezone.utc).isoformat(),
+                'iterations': options['iterations'],
+                'vendor': connection.vendor,
+                'rows': {
+                    'users': User.objects.count(),
+                    'projects': Project.objects.count(),
+                    'positions': ProjectPosition.objects.count(),
+                },
+            },
+            'endpoints': results,
+        }
+        self.print_report(results)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2, sort_keys=True)
+            self.stdout.write(f"Saved to {options['output']}")
+        if options['compare']:
+            self.compare(results, options)
+
+    def get_user(self, email):
+        users = User.objects.filter(is_active=True)
+        user = (
+            users.filter(email=email).first() if email
+            else users.filter(is_staff=True).order_by('date_joined').first()
+        )
+        if user is None:
+            raise CommandError('No user to benchmark with: pass --user or run seed')
+        return user
+
+    def run(self, user, options):
+        client = APIClient()
+        token = ClaimsTokenObtainPairSerializer.get_token(user).access_token
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        results = {}
+        for name, url in collect_endpoints():
+            if options['filter'] not in name:
+                continue
+            results[name] = self.measure(client, url, options)
+            self.stdout.write(f"{name}: p95 {results[name]['p95_ms']} ms")
+        return results
+
+    def measure(self, client, url, options):
+        for _ in range(options['warmup']):
+            client.get(url)
+
+        queries = []
+
+        def count_queries(execute, sql, params, many, context):
+            queries[-1] += 1
+            return execute(sql, params, many, context)
+
+        latencies = []
+        with connection.execute_wrapper(count_queries):
+            for _ in range(options['iterations']):
+                queries.append(0)
+                started = time.perf_counter()
+                response = client.get(url)
+                latencies.append((time.perf_counter() - started) * 1000)
+
+        # Память отдельным прогоном: tracemalloc сильно искажает время
+        tracemalloc.start()
+        try:
+            client.get(url)
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        return {
+            'url': url,
+            'status': response.status_code,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p95_ms': round(percentile(latencies, 95), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+            'mean_ms': round(statistics.fmean(latencies), 2),
+            'queries': max(queries),
+            'peak_kb': round(peak / 1024, 1),
+        }
+
+    def print_report(self, results):
+        self.stdout.write(
+            f"{'endpoint':<32}{'status':>7}{'p50':>9}{'p95':>9}{'p99':>9}"
+            f"{'queries':>9}{'peak KB':>10}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<32}{result['status']:>7}{result['p50_ms']:>9}"
+                f"{result['p95_ms']:>9}{result['p99_ms']:>9}"
+                f"{result['queries']:>9}{result['peak_kb']:>10}"
+            )
+
+    def compare(self, results, options):
+        with open(options['compare']) as baseline_file:
+            baseline = json.load(baseline_file)['endpoints']
+
+        threshold = options['threshold']
+        regressions = []
+        for name, result in results.items():
+            base = baseline.get(name)
+            if base is None:
+                continue
+            if result['status'] != base['status']:
+                regressions.append(
+                    f"{name}: status {base['status']} -> {result['status']}"
+                )
+            p95, base_p95 = result['p95_ms'], base['p95_ms']
+            if (p95 > base_p95 * (1 + threshold)
+                    and p95 - base_p95 > options['min_delta_ms']):
+                regressions.append(f'{name}: p95 {base_p95} -> {p95} ms')
+            if result['queries'] > base['queries']:
+                regressions.append(
+                    f"{name}: queries {base['queries']} -> {result['queries']}"
+                )
+            if result['peak_kb'] > base['peak_kb'] * (1 + threshold) + 64:
+                regressions.append(
+                    f"{name}: peak memory {base['peak_kb']} -> {result['peak_kb']} KB"
+                )
+
+        for name in sorted(set(baseline) - set(results)):
+            self.stdout.write(f'{name}: missing from this run')
+        if regressions:
+            raise CommandError('Regressions:\n' + '\n'.join(regressions))
+        self.stdout.write(self.style.SUCCESS('No regressions against baseline'))
@@ -0,0 +1,84 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from growhub.importer import INPUT_FORMATS, ImportAborted, guess_format, read_rows
+from projects.imports import ProjectImporter, StackImporter
+from users.imports import SkillImporter, UserImporter
+
+IMPORTERS = {
+    'skills': SkillImporter,
+    'stacks': StackImporter,
+    'users': UserImporter,
+    'projects': ProjectImporter,
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоковый импорт навыков, стеков, пользователей или проектов из '
+        'NDJSON/CSV пачками bulk-операций. После каждой пачки пишется '
+        'checkpoint; --resume продолжает с него.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(IMPORTERS))
+        parser.add_argument('file')
+        parser.add_argument('--input', choices=INPUT_FORMATS,
+                            help='По умолчанию — по расширению файла')
+        parser.add_argument('--batch-size', type=int, default=None)
+        parser.add_argument('--checkpoint',
+                            help='Файл checkpoint (по умолчанию <file>.checkpoint)')
+        parser.add_argument('--resume', action='store_true',
+                            help='Пропустить строки до сохранённого checkpoint')
+
+    def handle(self, *args, **options):
+        checkpoint_path = options['checkpoint'] or f"{options['file']}.checkpoint"
+        start = 0
+        if options['resume']:
+            start = self.read_checkpoint(checkpoint_path, options)
+
+        importer = IMPORTERS[options['resource']]()
+        if options['batch_size']:
+            importer.batch_size = options['batch_size']
+
+        def save_checkpoint(report):
+            state = {'resource': options['resource'], **report.as_dict()}
+            del state['errors']
+            # Запись через временный файл: checkpoint не бывает битым
+            with open(f'{checkpoint_path}.tmp', 'w') as target:
+                json.dump(state, target)
+            os.replace(f'{checkpoint_path}.tmp', checkpoint_path)
+
+        input_format = options['input'] or guess_format(options['file'])
+        with open(options['file'], encoding='utf-8-sig', newline='') as source:
+            try:
+                report = importer.run(
+                    read_rows(source, input_format), start,
+                    on_checkpoint=save_checkpoint,
+                )
+            except ImportAborted as exc:
+                raise CommandError(
+                    f'{exc}: {exc.__cause__}. Resume with --resume'
+                ) from exc
+
+        for error in report.errors:
+            for field, messages in error['errors'].items():
+                self.stderr.write(
+                    f"line {error['line']}: {field}: {' '.join(messages)}"
+                )
+        self.stdout.write(
+            f'created {report.created}, updated {report.updated}, '
+            f'failed {report.failed}, checkpoint {report.checkpoint}'
+        )
+
+    def read_checkpoint(self, path, options):
+        try:
+            with open(path) as source:
+                state = json.load(source)
+        except FileNotFoundError:
+            return 0
+        if state.get('resource') != options['resource']:
+            raise CommandError(f"{path} belongs to a {state.get('resource')} import")
+        return state['checkpoint']
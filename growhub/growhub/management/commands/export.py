@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from growhub.export import parse_watermark
+from projects.exports import ProjectExporter
+from users.exports import UserExporter
+
+EXPORTERS = {
+    'projects': ProjectExporter,
+    'users': UserExporter,
+}
+
+
+class Command(BaseCommand):
+    help = 'Потоковая выгрузка проектов или пользователей в NDJSON/CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('resource', choices=sorted(EXPORTERS))
+        parser.add_argument('--output', choices=['ndjson', 'csv'], default='ndjson')
+        parser.add_argument('--since', help='Только строки, изменённые с этого момента')
+        parser.add_argument('--file', help='Файл вместо stdout')
+        parser.add_argument('--chunk-size', type=int, default=None)
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = parse_watermark(options['since'])
+            except ValueError:
+                raise CommandError('--since expects an ISO 8601 date or datetime')
+
+        exporter = EXPORTERS[options['resource']]()
+        if options['chunk_size']:
+            exporter.chunk_size = options['chunk_size']
+
+        watermark = timezone.now()
+        chunks = exporter.stream(options['output'], since)
+        if options['file']:
+            with open(options['file'], 'w', encoding='utf-8', newline='') as target:
+                target.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+        # Водяной знак — для следующего запуска с --since
+        self.stderr.write(f'watermark: {watermark.isoformat()}')
@@ -0,0 +1,102 @@
+import http.client
+import itertools
+import json
+import statistics
+import threading
+import time
+from urllib.parse import urlsplit
+
+from django.core.management.base import BaseCommand
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    index = min(len(values) - 1, int(round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def run_client(urls, headers, deadline, latencies, errors, lock):
+    """
+    Один клиент: последовательные GET по кругу через keep-alive соединение.
+    """
+    connection = None
+    local_latencies, local_errors = [], 0
+    for url in itertools.cycle(map(urlsplit, urls)):
+        if time.monotonic() >= deadline:
+            break
+        if connection is None:
+            connection = http.client.HTTPConnection(url.netloc, timeout=30)
+        path = url.path + (f'?{url.query}' if url.query else '')
+        start = time.perf_counter()
+        try:
+            connection.request('GET', path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            local_errors += 1
+            connection.close()
+            connection = None
+            continue
+        if response.status >= 400:
+            local_errors += 1
+        local_latencies.append((time.perf_counter() - start) * 1000)
+    with lock:
+        latencies.extend(local_latencies)
+        errors.append(local_errors)
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагрузочный тест запущенного сервера: N параллельных клиентов '
+        'с keep-alive, результат — запросов в секунду и перцентили задержки'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('urls', nargs='+', help='Полные URL эндпоинтов')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--duration', type=float, default=10.0)
+        parser.add_argument('--header', action='append', default=[],
+                            help='Заголовок вида "Authorization: Bearer ..."')
+        parser.add_argument('--json', action='store_true', help='Вывод в JSON')
+
+    def handle(self, *args, **options):
+        headers = dict(
+            (name.strip(), value.strip())
+            for name, value in (h.split(':', 1) for h in options['header'])
+        )
+        urls = options['urls']
+        deadline = time.monotonic() + options['duration']
+        latencies, errors = [], []
+        lock = threading.Lock()
+
+        started = time.monotonic()
+        threads = [
+            threading.Thread(
+                target=run_client,
+                args=(urls[n % len(urls):] + urls[:n % len(urls)], headers,
+                      deadline, latencies, errors, lock)
+            )
+            for n in range(options['concurrency'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - started
+
+        result = {
+            'requests': len(latencies),
+            'errors': sum(errors),
+            'rps': round(len(latencies) / elapsed, 1),
+            'mean_ms': round(statistics.fmean(latencies), 2) if latencies else 0.0,
+            'p50_ms': round(percentile(latencies, 50), 2),
+            'p90_ms': round(percentile(latencies, 90), 2),
+            'p99_ms': round(percentile(latencies, 99), 2),
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+            return
+        for name, value in result.items():
+            self.stdout.write(f'{name:>10}: {value}')
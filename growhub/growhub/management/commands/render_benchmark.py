@@ -0,0 +1,99 @@
+import io
+import json
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from growhub import renderers
+from growhub.renderers import FastJSONParser, FastJSONRenderer
+from projects.models import Project
+from projects.serializers import ProjectReadSerializer
+from users.models import User
+from users.serializers import UserReadSerializer
+
+
+def timed(func, iterations):
+    """
+    Медиана времени одного вызова, мс.
+    """
+    times = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        times.append((time.perf_counter() - started) * 1000)
+    return statistics.median(times)
+
+
+class Command(BaseCommand):
+    help = (
+        'Микробенчмарк JSON: стандартные JSONRenderer/JSONParser против '
+        'growhub.renderers на списках проектов и пользователей из базы'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=500,
+                            help='Строк в одном ответе')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--json', action='store_true', help='Вывод в JSON')
+
+    def handle(self, *args, **options):
+        if renderers.orjson is None:
+            raise CommandError('orjson не установлен: сравнивать не с чем')
+
+        rows = options['rows']
+        payloads = {
+            'projects': ProjectReadSerializer(
+                Project.objects.for_read().order_by('-created_at')[:rows], many=True
+            ).data,
+            'users': UserReadSerializer(
+                User.objects.for_read().order_by('-date_joined')[:rows], many=True
+            ).data,
+        }
+        results = {}
+        for name, data in payloads.items():
+            if not data:
+                raise CommandError(f'No {name} to benchmark with: run seed')
+            results[name] = self.compare(data, options['iterations'])
+
+        if options['json']:
+            self.stdout.write(json.dumps(results))
+            return
+        self.stdout.write(
+            f"{'payload':<10}{'rows':>6}{'KB':>8}{'render':>10}{'fast':>8}"
+            f"{'x':>6}{'parse':>9}{'fast':>8}{'x':>6}"
+        )
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name:<10}{result['rows']:>6}{result['kb']:>8}"
+                f"{result['render_ms']:>10}{result['fast_render_ms']:>8}"
+                f"{result['render_speedup']:>6}{result['parse_ms']:>9}"
+                f"{result['fast_parse_ms']:>8}{result['parse_speedup']:>6}"
+            )
+
+    def compare(self, data, iterations):
+        standard, fast = JSONRenderer(), FastJSONRenderer()
+        content = standard.render(data)
+        if fast.render(data) != content:
+            raise CommandError('Renderers disagree on the payload')
+
+        render_ms = timed(lambda: standard.render(data), iterations)
+        fast_render_ms = timed(lambda: fast.render(data), iterations)
+        parse_ms = timed(
+            lambda: JSONParser().parse(io.BytesIO(content)), iterations
+        )
+        fast_parse_ms = timed(
+            lambda: FastJSONParser().parse(io.BytesIO(content)), iterations
+        )
+        return {
+            'rows': len(data),
+            'kb': round(len(content) / 1024, 1),
+            'render_ms': round(render_ms, 2),
+            'fast_render_ms': round(fast_render_ms, 2),
+            'render_speedup': round(render_ms / fast_render_ms, 1),
+            'parse_ms': round(parse_ms, 2),
+            'fast_parse_ms': round(fast_parse_ms, 2),
+            'parse_speedup': round(parse_ms / fast_parse_ms, 1),
+        }
@@ -0,0 +1,274 @@
+import itertools
+import random
+import time
+from datetime import datetime, time as day_time, timedelta
+from math import ceil
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from growhub.response_cache import invalidate
+from projects.facets import rebuild_facets
+from projects.models import Project, ProjectPosition, Stack
+from projects.search import refresh_project_documents
+from users.models import Experience, GradeEnum, RoleEnum, Skill, User
+from users.search import refresh_user_documents
+
+TECHNOLOGIES = [
+    'Python', 'JavaScript', 'TypeScript', 'React', 'Django', 'PostgreSQL',
+    'Docker', 'Go', 'Java', 'Spring', 'Vue', 'Node.js', 'Kubernetes', 'Redis',
+    'FastAPI', 'Kotlin', 'Swift', 'Figma', 'Angular', 'C#', '.NET', 'Rust',
+    'GraphQL', 'Terraform', 'AWS', 'Flutter', 'Selenium', 'Kafka', 'PHP',
+    'Laravel', 'Ruby', 'Rails', 'MongoDB', 'ClickHouse', 'Svelte', 'Next.js',
+]
+
+ROLE_WEIGHTS = {
+    RoleEnum.BACKEND: 35, RoleEnum.FRONTEND: 25, RoleEnum.DEVOPS: 10,
+    RoleEnum.DESIGNER: 10, RoleEnum.QA: 10, RoleEnum.PM: 5,
+    RoleEnum.NOT_SELECTED: 5,
+}
+GRADE_WEIGHTS = {
+    GradeEnum.INTERN: 8, GradeEnum.JUNIOR: 25, GradeEnum.MIDDLE: 35,
+    GradeEnum.SENIOR: 20, GradeEnum.LEAD: 7, GradeEnum.ARCHITECT: 2,
+    GradeEnum.NOT_SELECTED: 3,
+}
+COMPANIES = ['Yandex', 'Sber', 'Tinkoff', 'VK', 'Ozon', 'Avito', 'Kaspersky']
+HISTORY_DAYS = 730
+
+
+def chunked(items, size):
+    iterator = iter(items)
+    while chunk := list(itertools.islice(iterator, size)):
+        yield chunk
+
+
+class Weighted:
+    """
+    Выбор с заданными весами; для популярности технологий —
+    распределение Ципфа (несколько очень частых и длинный хвост).
+    """
+
+    def __init__(self, rng, values, weights):
+        self.rng = rng
+        self.values = list(values)
+        self.cum_weights = list(itertools.accumulate(weights))
+
+    @classmethod
+    def zipf(cls, rng, values, exponent=1.1):
+        weights = [1 / (rank + 1) ** exponent for rank in range(len(values))]
+        return cls(rng, values, weights)
+
+    def one(self):
+        return self.rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+    def some(self, low, high):
+        count = self.rng.randint(low, high)
+        return set(self.rng.choices(self.values, cum_weights=self.cum_weights, k=count))
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу синтетическими данными заданного масштаба '
+        'пачками bulk_create (для бенчмарков и проверки планов запросов)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--projects', type=int, default=500)
+        parser.add_argument('--positions', type=int, default=5000)
+        parser.add_argument('--experiences', type=int, default=None,
+                            help='По умолчанию — по одной на пользователя')
+        parser.add_argument('--technologies', type=int, default=60,
+                            help='Размер словаря навыков/стеков')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--prefix', default='seed',
+                            help='Префикс username/email созданных пользователей')
+        parser.add_argument('--password', default=None,
+                            help='Пароль пользователей (по умолчанию непригодный)')
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=f"{options['prefix']}-").exists():
+            raise CommandError(
+                f"Users with prefix '{options['prefix']}' already exist, use --prefix"
+            )
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        self.prefix = options['prefix']
+        self.today = timezone.now().date()
+
+        with transaction.atomic():
+            skills, stacks = self.stage('catalog', self.create_catalog,
+                                        options['technologies'])
+            users = self.stage('users', self.create_users, options['users'],
+                               skills, options['password'])
+            experiences = options['experiences']
+            if experiences is None:
+                experiences = options['users']
+            self.stage('experiences', self.create_experiences, experiences, users)
+            projects = self.stage('projects', self.create_projects,
+                                  options['projects'], users, stacks)
+            self.stage('positions', self.create_positions, options['positions'],
+                       projects)
+            self.stage('search documents', self.refresh_documents, users, projects)
+            self.stage('facets', rebuild_facets)
+
+        invalidate('projects', 'stacks', 'skills', 'matching')
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(users)} users, {len(projects)} projects, '
+            f"{options['positions']} positions (admin: {self.prefix}-admin@example.com)"
+        ))
+
+    def stage(self, name, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        self.stdout.write(f'{name}: {time.perf_counter() - started:.1f}s')
+        return result
+
+    def random_day(self):
+        return self.today - timedelta(days=self.rng.randrange(HISTORY_DAYS))
+
+    def backdate(self, model, field, ids, to_value):
+        """
+        auto_now_add нельзя задать в bulk_create: даты проставляются
+        одним UPDATE на каждый день истории.
+        """
+        by_day = {}
+        for pk in ids:
+            by_day.setdefault(self.random_day(), []).append(pk)
+        for day, day_ids in by_day.items():
+            for chunk in chunked(day_ids, self.batch_size):
+                model.objects.filter(pk__in=chunk).update(**{field: to_value(day)})
+
+    def create_catalog(self, size):
+        names = TECHNOLOGIES[:size] + [
+            f'Tech {index}' for index in range(max(0, size - len(TECHNOLOGIES)))
+        ]
+        existing_skills = set(Skill.objects.values_list('code', flat=True))
+        Skill.objects.bulk_create([
+            Skill(code=name.lower(), name=name)
+            for name in names if name.lower() not in existing_skills
+        ])
+        existing_stacks = set(Stack.objects.values_list('name', flat=True))
+        Stack.objects.bulk_create([
+            Stack(name=name) for name in names if name not in existing_stacks
+        ])
+        codes = [name.lower() for name in names]
+        skills = dict(Skill.objects.filter(code__in=codes).values_list('code', 'id'))
+        stacks = dict(Stack.objects.filter(name__in=names).values_list('name', 'id'))
+        return (
+            Weighted.zipf(self.rng, [skills[code] for code in codes]),
+            Weighted.zipf(self.rng, [stacks[name] for name in names]),
+        )
+
+    def create_users(self, count, skills, password):
+        # Хэш считается один раз: иначе сидирование упирается в PBKDF2
+        password = make_password(password)
+        roles = Weighted(self.rng, ROLE_WEIGHTS, ROLE_WEIGHTS.values())
+        grades = Weighted(self.rng, GRADE_WEIGHTS, GRADE_WEIGHTS.values())
+
+        User.objects.create(
+            email=f'{self.prefix}-admin@example.com', username=f'{self.prefix}-admin',
+            password=password, is_staff=True, is_superuser=True,
+        )
+        users = User.objects.bulk_create(
+            (
+                User(
+                    email=f'{self.prefix}-{index}@example.com',
+                    username=f'{self.prefix}-{index}',
+                    password=password,
+                    role_id=roles.one(),
+                    grade_id=grades.one(),
+                    github=f'https://github.com/{self.prefix}-{index}',
+                )
+                for index in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        user_ids = [user.id for user in users]
+
+        through = User.skills.through
+        through.objects.bulk_create(
+            (
+                through(user_id=user_id, skill_id=skill_id)
+                for user_id in user_ids
+                for skill_id in skills.some(2, 8)
+            ),
+            batch_size=self.batch_size,
+        )
+        self.backdate(
+            User, 'date_joined', user_ids,
+            lambda day: timezone.make_aware(datetime.combine(day, day_time(12)))
+        )
+        return user_ids
+
+    def create_experiences(self, count, user_ids):
+        Experience.objects.bulk_create(
+            (
+                Experience(
+                    user_id=self.rng.choice(user_ids),
+                    company=self.rng.choice(COMPANIES),
+                    position='Developer',
+                    start_date=self.random_day(),
+                )
+                for _ in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+
+    def create_projects(self, count, user_ids, stacks):
+        # Авторы тоже распределены неравномерно: часть пользователей
+        # ведёт много проектов
+        active_authors = user_ids[:max(1, ceil(len(user_ids) / 5))]
+        authors = Weighted.zipf(self.rng, active_authors, 0.8)
+        projects = Project.objects.bulk_create(
+            (
+                Project(
+                    name=f'Project {index}',
+                    description=f'Synthetic project {index}',
+                    author_id=authors.one(),
+                )
+                for index in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+        project_ids = [project.id for project in projects]
+
+        through = Project.stacks.through
+        through.objects.bulk_create(
+            (
+                through(project_id=project_id, stack_id=stack_id)
+                for project_id in project_ids
+                for stack_id in stacks.some(1, 5)
+            ),
+            batch_size=self.batch_size,
+        )
+        self.backdate(Project, 'created_at', project_ids, lambda day: day)
+        return project_ids
+
+    def create_positions(self, count, project_ids):
+        roles = Weighted(self.rng, ROLE_WEIGHTS, ROLE_WEIGHTS.values())
+        grades = Weighted(self.rng, GRADE_WEIGHTS, GRADE_WEIGHTS.values())
+        ProjectPosition.objects.bulk_create(
+            (
+                ProjectPosition(
+                    project_id=self.rng.choice(project_ids),
+                    role_id=roles.one(),
+                    grade_id=grades.one(),
+                    # Примерно каждая десятая позиция уже закрыта
+                    count_needed=(
+                        0 if self.rng.random() < 0.1 else self.rng.randint(1, 3)
+                    ),
+                )
+                for _ in range(count)
+            ),
+            batch_size=self.batch_size,
+        )
+
+    def refresh_documents(self, user_ids, project_ids):
+        for chunk in chunked(user_ids, self.batch_size):
+            refresh_user_documents(User.objects.filter(pk__in=chunk))
+        for chunk in chunked(project_ids, self.batch_size):
+            refresh_project_documents(Project.objects.filter(pk__in=chunk))
@@ -0,0 +1,73 @@
+import os
+import shutil
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+WORKER_CLASSES = {
+    'wsgi': ('growhub.wsgi:application', 'gthread'),
+    'asgi': ('growhub.asgi:application', 'uvicorn_worker.UvicornWorker'),
+}
+
+
+def shared_events():
+    """
+    События видны всем воркерам: поток в общем кэше.
+    """
+    return (
+        settings.EVENTS_BACKEND != 'growhub.events.LocalBackend'
+        and settings.CACHE_SHARED
+    )
+
+
+class Command(BaseCommand):
+    help = 'Запуск сервера в режиме SERVER_MODE: dev, wsgi или asgi'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=['dev', *WORKER_CLASSES])
+        parser.add_argument('--bind')
+        parser.add_argument('--workers', type=int)
+
+    def handle(self, *args, **options):
+        mode = options['mode'] or settings.SERVER_MODE
+        bind = options['bind'] or settings.SERVER_BIND
+
+        if mode == 'dev':
+            call_command('runserver', bind)
+            return
+        if mode not in WORKER_CLASSES:
+            raise CommandError(f'Неизвестный SERVER_MODE: {mode}')
+
+        workers = options['workers'] or settings.SERVER_WORKERS
+        if mode == 'asgi' and workers > 1 and not shared_events():
+            raise CommandError(
+                'SSE с несколькими asgi-воркерами требует '
+                'EVENTS_BACKEND=growhub.events.CacheBackend и CACHE_URL'
+            )
+
+        gunicorn = shutil.which('gunicorn')
+        if gunicorn is None:
+            raise CommandError('gunicorn не установлен')
+
+        if workers > 1 and not settings.CACHE_SHARED:
+            self.stderr.write(
+                'CACHE_URL не задан: у каждого воркера свой кэш, '
+                'кэш ответов и события не видят правок других воркеров'
+            )
+
+        application, worker_class = WORKER_CLASSES[mode]
+        argv = [
+            'gunicorn', application,
+            '--config', 'python:growhub.gunicorn_conf',
+            '--bind', bind,
+            '--workers', str(workers),
+            '--worker-class', worker_class,
+            '--timeout', str(settings.SERVER_TIMEOUT),
+            '--access-logfile', '-',
+        ]
+        if mode == 'wsgi':
+            argv += ['--threads', str(settings.SERVER_THREADS)]
+
+        self.stdout.write(f'Starting {mode}: {" ".join(argv)}')
+        os.execv(gunicorn, argv)
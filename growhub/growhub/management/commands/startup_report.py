@@ -0,0 +1,118 @@
+import json
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.apps import apps
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PHASES = [
+    'settings', 'setup', 'application', 'first_request', 'to_first_response',
+    'second_request',
+]
+
+
+def import_times(stderr):
+    """
+    Собственное время импорта (без вложенных импортов) по пакетам верхнего
+    уровня из вывода python -X importtime, мс.
+    """
+    totals = defaultdict(float)
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, _, module = line[len('import time:'):].split('|')
+        totals[module.strip().split('.')[0]] += int(self_us) / 1000
+    return totals
+
+
+def run_once(path):
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-m', 'growhub.startup', path],
+        cwd=settings.BASE_DIR, capture_output=True, text=True,
+    )
+    process_ms = (time.perf_counter() - started) * 1000
+    if result.returncode:
+        raise CommandError(f'Startup failed:\n{result.stderr[-2000:]}')
+    report = json.loads(result.stdout.splitlines()[-1])
+    report['phases']['process'] = process_ms
+    report['imports'] = import_times(result.stderr)
+    return report
+
+
+def median_of(reports, key):
+    names = {name for report in reports for name in report[key]}
+    return {
+        name: round(statistics.median(
+            report[key].get(name, 0.0) for report in reports
+        ), 2)
+        for name in names
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        'Профиль холодного старта воркера: импорт по пакетам, ready() '
+        'приложений и время до первого ответа. Каждый прогон — новый процесс'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/projects/',
+                            help='Первый запрос после старта')
+        parser.add_argument('--runs', type=int, default=3)
+        parser.add_argument('--top', type=int, default=15)
+        parser.add_argument('--budget-ms', type=float,
+                            default=settings.STARTUP_BUDGET_MS,
+                            help='Предел времени до первого ответа')
+        parser.add_argument('--json', action='store_true', help='Вывод в JSON')
+
+    def handle(self, *args, **options):
+        reports = [run_once(options['path']) for _ in range(options['runs'])]
+        phases = median_of(reports, 'phases')
+        imports = median_of(reports, 'imports')
+        result = {
+            'runs': len(reports),
+            'path': options['path'],
+            'status': reports[-1]['status'],
+            'phases_ms': {name: phases[name] for name in [*PHASES, 'process']},
+            'ready_ms': dict(sorted(median_of(reports, 'ready').items())),
+            'imports_ms': dict(
+                sorted(imports.items(), key=lambda item: -item[1])[:options['top']]
+            ),
+            'budget_ms': options['budget_ms'],
+        }
+        if options['json']:
+            self.stdout.write(json.dumps(result))
+        else:
+            self.write_text(result)
+
+        total = result['phases_ms']['to_first_response']
+        if total > options['budget_ms']:
+            raise CommandError(
+                f'Time to first response {total:.0f} ms exceeds '
+                f'budget {options["budget_ms"]:.0f} ms'
+            )
+
+    def write_text(self, result):
+        project_apps = {
+            config.name.split('.')[0] for config in apps.get_app_configs()
+            if config.path.startswith(str(settings.BASE_DIR))
+        }
+        self.stdout.write(
+            f'Median of {result["runs"]} runs, first request '
+            f'GET {result["path"]} -> {result["status"]}'
+        )
+        self.stdout.write('Phases, ms (-X importtime adds overhead):')
+        for name, value in result['phases_ms'].items():
+            self.stdout.write(f'  {name:>20}: {value:.1f}')
+        self.stdout.write('ready(), ms:')
+        for name, value in result['ready_ms'].items():
+            self.stdout.write(f'  {name:>20}: {value:.2f}')
+        self.stdout.write('Import time by package (self), ms:')
+        for name, value in result['imports_ms'].items():
+            mark = ' *' if name in project_apps else ''
+            self.stdout.write(f'  {name:>20}: {value:.1f}{mark}')
@@ -0,0 +1,248 @@
+import bisect
+import contextvars
+import inspect
+import logging
+import threading
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+
+from asgiref.sync import markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from growhub.db import database_stats, reset_database_stats
+
+logger = logging.getLogger('growhub.metrics')
+
+# Границы корзин гистограмм, мс
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+HISTOGRAMS = ('wall_ms', 'db_ms', 'serializer_ms')
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    __slots__ = (
+        'queries', 'db_time', 'serializer_time', 'serializer_depth',
+        'worst_sql', 'worst_sql_time'
+    )
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.serializer_time = 0.0
+        self.serializer_depth = 0
+        self.worst_sql = None
+        self.worst_sql_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # execute_wrapper: считает запросы и время БД
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += duration
+            if duration > self.worst_sql_time:
+                self.worst_sql, self.worst_sql_time = sql, duration
+
+
+class TimedSerializerMixin:
+    """
+    Засекает время to_representation верхнего уровня
+    (вложенные сериализаторы не считаются повторно).
+    """
+
+    def to_representation(self, instance):
+        metrics = _current.get()
+        if metrics is None or metrics.serializer_depth:
+            return super().to_representation(instance)
+
+        metrics.serializer_depth += 1
+        start = time.perf_counter()
+        try:
+            return super().to_representation(instance)
+        finally:
+            metrics.serializer_time += time.perf_counter() - start
+            metrics.serializer_depth -= 1
+
+
+@contextmanager
+def timed_serialization():
+    """
+    То же для сборки ответа без сериализатора (growhub.values_read).
+    """
+    metrics = _current.get()
+    if metrics is None or metrics.serializer_depth:
+        yield
+        return
+    metrics.serializer_depth += 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics.serializer_time += time.perf_counter() - start
+        metrics.serializer_depth -= 1
+
+
+class MetricsRegistry:
+    """
+    Агрегаты по ключу "View.action" в памяти процесса:
+    счётчики, суммы и гистограммы времени.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.endpoints = defaultdict(self._empty)
+
+    @staticmethod
+    def _empty():
+        return {
+            'count': 0,
+            'queries': 0,
+            'max_queries': 0,
+            'response_bytes': 0,
+            **{f'{name}_sum': 0.0 for name in HISTOGRAMS},
+            **{name: [0] * (len(BUCKETS_MS) + 1) for name in HISTOGRAMS},
+        }
+
+    def record(self, key, values):
+        with self.lock:
+            entry = self.endpoints[key]
+            entry['count'] += 1
+            entry['queries'] += values['queries']
+            entry['max_queries'] = max(entry['max_queries'], values['queries'])
+            entry['response_bytes'] += values['response_bytes'] or 0
+            for name in HISTOGRAMS:
+                entry[f'{name}_sum'] += values[name]
+                entry[name][bisect.bisect_left(BUCKETS_MS, values[name])] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'buckets_ms': list(BUCKETS_MS),
+                'endpoints': {
+                    key: {
+                        name: list(value) if isinstance(value, list) else value
+                        for name, value in entry.items()
+                    }
+                    for key, entry in sorted(self.endpoints.items())
+                },
+            }
+
+
+registry = MetricsRegistry()
+
+
+def get_endpoint_key(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.view_name or match.func.__name__
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return f'{view_class.__name__}.{action}'
+
+
+class RequestMetricsMiddleware:
+    """
+    Время запроса, число и время SQL, время сериализации и размер ответа
+    по каждому эндпоинту: заголовок Server-Timing, агрегаты для
+    /api/metrics/ и лог медленных запросов с самым долгим SQL.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.server_timing = getattr(settings, 'REQUEST_METRICS_SERVER_TIMING', True)
+        self.slow_ms = getattr(settings, 'SLOW_REQUEST_THRESHOLD_MS', None)
+        self.is_async = inspect.iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self.finish(request, response, metrics, start)
+
+    def finish(self, request, response, metrics, start):
+        values = {
+            'wall_ms': (time.perf_counter() - start) * 1000,
+            'db_ms': metrics.db_time * 1000,
+            'serializer_ms': metrics.serializer_time * 1000,
+            'queries': metrics.queries,
+            'response_bytes': (
+                None if response.streaming else len(response.content)
+            ),
+        }
+        key = get_endpoint_key(request)
+        registry.record(key, values)
+
+        if self.server_timing:
+            response['Server-Timing'] = (
+                f'app;dur={values["wall_ms"]:.1f}, '
+                f'db;dur={values["db_ms"]:.1f};desc="{metrics.queries} queries", '
+                f'serializer;dur={values["serializer_ms"]:.1f}'
+            )
+        if self.slow_ms is not None and values['wall_ms'] >= self.slow_ms:
+            logger.warning(
+                'Slow request %s %s (%s): %.1f ms, %d queries, %.1f ms in DB; '
+                'worst SQL (%.1f ms): %s',
+                request.method, request.get_full_path(), key, values['wall_ms'],
+                metrics.queries, values['db_ms'],
+                metrics.worst_sql_time * 1000, metrics.worst_sql,
+            )
+        return response
+
+
+class MetricsView(APIView):
+    """
+    Агрегированные метрики эндпоинтов и соединений с БД текущего
+    процесса (только админ). DELETE сбрасывает накопленные значения.
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({**registry.snapshot(), 'database': database_stats()})
+
+    def delete(self, request):
+        registry.reset()
+        reset_database_stats()
+        return Response(status=204)
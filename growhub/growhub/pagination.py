@@ -0,0 +1,205 @@
+import datetime
+import decimal
+import json
+import uuid
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _encode_value(value):
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    return value
+
+
+def _get_value(instance, field_name):
+    if isinstance(instance, dict):
+        return instance[field_name]
+    for attr in field_name.split('__'):
+        instance = getattr(instance, attr)
+        if instance is None:
+            break
+    return instance
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Keyset-пагинация по составному ключу (например, (-created_at, id)).
+
+    Курсор хранит значения всех полей сортировки последней строки страницы,
+    поэтому любая страница выбирается одним условием по индексу,
+    без OFFSET: глубокие страницы стоят столько же, сколько первая.
+    """
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = 'id'
+    tiebreaker = 'id'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset = self.prepare_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.build_page(list(queryset))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """
+        То же, что paginate_queryset, но страница читается через async ORM.
+        """
+        queryset = self.prepare_queryset(queryset, request, view)
+        if queryset is None:
+            return None
+        return self.build_page([obj async for obj in queryset])
+
+    def prepare_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+
+        self.cursor = self.decode_cursor(request)
+        if self.cursor is None:
+            self.reverse, self.current_position = False, None
+        else:
+            self.reverse, self.current_position = self.cursor
+
+        if self.reverse:
+            queryset = queryset.order_by(*_reverse_ordering(self.ordering))
+        else:
+            queryset = queryset.order_by(*self.ordering)
+
+        if self.current_position is not None:
+            try:
+                queryset = queryset.filter(
+                    self._get_keyset_filter(self.current_position, self.reverse)
+                )
+            except (ValueError, TypeError, ValidationError):
+                # Значение из подделанного курсора не подходит полю сортировки
+                raise NotFound(self.invalid_cursor_message)
+
+        # Берём на одну строку больше, чтобы понять, есть ли следующая страница
+        return queryset[:self.page_size + 1]
+
+    def build_page(self, results):
+        self.page = results[:self.page_size]
+        has_following_position = len(results) > len(self.page)
+
+        if self.reverse:
+            self.page = list(reversed(self.page))
+            self.has_next = self.current_position is not None
+            self.has_previous = has_following_position
+        else:
+            self.has_next = has_following_position
+            self.has_previous = self.current_position is not None
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+
+        return self.page
+
+    def get_ordering(self, request, queryset, view):
+        ordering = None
+        ordering_filters = [
+            filter_cls for filter_cls in getattr(view, 'filter_backends', [])
+            if hasattr(filter_cls, 'get_ordering')
+        ]
+        if ordering_filters:
+            ordering = ordering_filters[0]().get_ordering(request, queryset, view)
+        if not ordering:
+            ordering = getattr(view, 'ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            ordering = (ordering,)
+
+        ordering = tuple(ordering)
+        if ordering[-1].lstrip('-') not in ('pk', self.tiebreaker):
+            ordering += (self.tiebreaker,)
+        return ordering
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        if not self.page:
+            return self.get_first_link()
+        position = self._get_position_from_instance(self.page[-1], self.ordering)
+        return self.encode_cursor((False, position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return self.get_first_link()
+        position = self._get_position_from_instance(self.page[0], self.ordering)
+        return self.encode_cursor((True, position))
+
+    def get_first_link(self):
+        # Страница по устаревшему курсору пуста (строки удалили): ссылки
+        # строить не от чего, клиент начинает с первой страницы
+        return remove_query_param(self.base_url, self.cursor_query_param)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+
+        try:
+            payload = json.loads(urlsafe_b64decode(encoded.encode('ascii')))
+            reverse = bool(payload['r'])
+            position = payload['p']
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        if not all(
+            value is None or isinstance(value, (str, int, float))
+            for value in position
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return reverse, position
+
+    def encode_cursor(self, cursor):
+        reverse, position = cursor
+        payload = json.dumps(
+            {'r': int(reverse), 'p': position}, separators=(',', ':')
+        )
+        encoded = urlsafe_b64encode(payload.encode('ascii')).decode('ascii')
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        return [
+            _encode_value(_get_value(instance, order.lstrip('-')))
+            for order in ordering
+        ]
+
+    def _get_keyset_filter(self, position, reverse):
+        """
+        Разворачивает сравнение кортежей (a, b, c) > (x, y, z)
+        в OR из префиксных равенств — так работает и при разных
+        направлениях сортировки у полей.
+        """
+        condition = Q()
+        equal = Q()
+        for order, value in zip(self.ordering, position):
+            field_name = order.lstrip('-')
+            descending = order.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= equal & Q(**{f'{field_name}__{lookup}': value})
+            equal &= Q(**{field_name: value})
+        return condition
+
+
+def _reverse_ordering(ordering):
+    return tuple(
+        order[1:] if order.startswith('-') else '-' + order
+        for order in ordering
+    )
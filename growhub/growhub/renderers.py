@@ -0,0 +1,69 @@
+from django.conf import settings
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    # Z вместо +00:00 — как у JSONEncoder DRF; нестроковые ключи
+    # приводятся к строкам, как в json.dumps
+    ORJSON_OPTIONS = orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS
+
+# Остальные типы (Decimal, timedelta, lazy-строки, QuerySet...)
+# кодируются так же, как в стандартном рендерере
+_default = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer на orjson, если он установлен: UUID, даты и время
+    кодируются без вызова Python-кода, Decimal — через JSONEncoder DRF.
+    Ответ совпадает со стандартным рендерером побайтно для обычных
+    данных (компактный JSON, UTF-8 без экранирования).
+
+    Отступы (?indent, browsable API), UNICODE_JSON/COMPACT_JSON = False
+    и то, что orjson не умеет (целые больше 64 бит), рендерятся
+    стандартным JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (orjson is None or self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {})):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Как в JSONRenderer: U+2028/U+2029 ломают JSON внутри <script>
+        if b'\xe2\x80\xa8' in content or b'\xe2\x80\xa9' in content:
+            content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(
+                b'\xe2\x80\xa9', b'\\u2029'
+            )
+        return content
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSONParser на orjson: тело в UTF-8 разбирается без декодирования
+    в str. NaN и Infinity orjson не принимает, поэтому при
+    STRICT_JSON = False разбор стандартный.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if (orjson is None or not api_settings.STRICT_JSON
+                or encoding.lower().replace('-', '') != 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
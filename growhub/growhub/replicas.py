@@ -0,0 +1,222 @@
+import contextvars
+import inspect
+import logging
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger('growhub.replicas')
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+STICKY_KEY = 'replica-sticky:{}'
+
+# Отставание реплики, секунды. Реплика без WAL-приёма (или не реплика
+# вовсе) отстаёт на 0; простаивающий primary не считается отставанием
+LAG_QUERIES = {
+    'postgresql': (
+        'SELECT CASE WHEN NOT pg_is_in_recovery() '
+        'OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 '
+        'ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END'
+    ),
+}
+
+_routing = contextvars.ContextVar('read_routing', default=None)
+
+
+def measure_lag(alias):
+    """
+    Отставание реплики в секундах; None — реплика недоступна.
+    Для баз без репликации (SQLite) — 0.
+    """
+    connection = connections[alias]
+    sql = LAG_QUERIES.get(connection.vendor)
+    if sql is None:
+        return 0.0
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql)
+            lag = cursor.fetchone()[0]
+    except DatabaseError:
+        logger.warning('Replica %s is unavailable', alias, exc_info=True)
+        return None
+    return float(lag or 0)
+
+
+class ReplicaLag:
+    """
+    Отставание реплик, измеренное не чаще раза в
+    REPLICA_LAG_CHECK_INTERVAL секунд на процесс.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.entries = {}
+
+    def get(self, alias):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(alias)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        lag = measure_lag(alias)
+        interval = getattr(settings, 'REPLICA_LAG_CHECK_INTERVAL', 1.0)
+        with self.lock:
+            self.entries[alias] = (now + interval, lag)
+        return lag
+
+    def is_fresh(self, alias):
+        lag = self.get(alias)
+        return lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+replica_lag = ReplicaLag()
+
+
+def sticky_key(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return None
+    return STICKY_KEY.format(user.pk)
+
+
+class ReadRouting:
+    """
+    Куда читает безопасный запрос. Выбор делается при первом чтении,
+    когда DRF уже аутентифицировал пользователя (request.user), и дальше
+    не меняется: все чтения запроса идут в одну базу.
+    """
+    __slots__ = ('request', 'alias', 'resolving')
+
+    def __init__(self, request):
+        self.request = request
+        self.alias = None
+        self.resolving = False
+
+    def get_alias(self):
+        if self.alias is None:
+            if self.resolving:
+                # Чтения во время выбора (сессия, пользователь) — с primary
+                return DEFAULT_DB_ALIAS
+            self.resolving = True
+            try:
+                self.alias = self.choose()
+            finally:
+                self.resolving = False
+        return self.alias
+
+    def choose(self):
+        key = sticky_key(self.request)
+        if key is not None and cache.get(key):
+            return DEFAULT_DB_ALIAS
+        fresh = [
+            alias for alias in settings.DATABASE_REPLICAS
+            if replica_lag.is_fresh(alias)
+        ]
+        return random.choice(fresh) if fresh else DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def use_primary():
+    """
+    Чтения внутри блока — с основной базы, даже в безопасном запросе.
+    """
+    token = _routing.set(None)
+    try:
+        yield
+    finally:
+        _routing.reset(token)
+
+
+class ReplicaRouter:
+    """
+    Запись — всегда в default. Чтение в безопасном запросе — с реплики
+    из DATABASE_REPLICAS (см. ReplicaRoutingMiddleware), иначе тоже
+    из default: вне запросов, в транзакции, для primary_apps.
+    """
+    # Очередь задач блокирует строки, сессия нужна сразу после входа
+    primary_apps = {'jobs', 'sessions'}
+
+    def db_for_read(self, model, **hints):
+        routing = _routing.get()
+        if (routing is None or model._meta.app_label in self.primary_apps
+                or connections[DEFAULT_DB_ALIAS].in_atomic_block):
+            return DEFAULT_DB_ALIAS
+        return routing.get_alias()
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики содержат те же данные, что и default
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Безопасные запросы читают с реплик, если они настроены и отстают
+    не больше REPLICA_MAX_LAG_SECONDS. После успешной записи
+    пользователь REPLICA_STICKY_SECONDS читает с default и видит свои
+    изменения (read-your-writes).
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = inspect.iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+
+        if request.method in SAFE_METHODS:
+            if not settings.DATABASE_REPLICAS:
+                return self.get_response(request)
+            token = _routing.set(ReadRouting(request))
+            try:
+                return self.get_response(request)
+            finally:
+                _routing.reset(token)
+
+        response = self.get_response(request)
+        self.mark_sticky(request, response)
+        return response
+
+    async def __acall__(self, request):
+        if request.method in SAFE_METHODS:
+            if not settings.DATABASE_REPLICAS:
+                return await self.get_response(request)
+            token = _routing.set(ReadRouting(request))
+            try:
+                return await self.get_response(request)
+            finally:
+                _routing.reset(token)
+
+        response = await self.get_response(request)
+        # Пользователь сессии ленивый и может читать базу
+        await sync_to_async(self.mark_sticky)(request, response)
+        return response
+
+    def mark_sticky(self, request, response):
+        if not settings.DATABASE_REPLICAS or response.status_code >= 400:
+            return
+        key = sticky_key(request)
+        if key is not None:
+            cache.set(key, True, settings.REPLICA_STICKY_SECONDS)
@@ -0,0 +1,189 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+
+from growhub.replicas import use_primary
+
+GENERATION_KEY = 'response-cache:generation:{}'
+ENTRY_KEY = 'response-cache:{}:{}:{}'
+# Поколение хранится бессрочно: incr не продлевает срок ключа, и
+# истёкшее поколение сбросило бы все кэши и индексы разом
+GENERATION_TIMEOUT = None
+
+
+def get_generation(namespace):
+    key = GENERATION_KEY.format(namespace)
+    generation = cache.get(key)
+    if generation is None:
+        # Начальное значение от времени: после вытеснения ключа
+        # старые записи не совпадут с новым поколением
+        cache.add(key, time.time_ns(), GENERATION_TIMEOUT)
+        generation = cache.get(key)
+    return generation
+
+
+async def aget_generation(namespace):
+    key = GENERATION_KEY.format(namespace)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, time.time_ns(), GENERATION_TIMEOUT)
+        generation = await cache.aget(key)
+    return generation
+
+
+def _bump(namespaces):
+    for namespace in namespaces:
+        key = GENERATION_KEY.format(namespace)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), GENERATION_TIMEOUT)
+
+
+def invalidate(*namespaces):
+    """
+    Сдвигает поколение сразу и ещё раз после коммита: иначе чтение,
+    попавшее между записью и коммитом, закэширует старые данные
+    под новым поколением.
+    """
+    _bump(namespaces)
+    transaction.on_commit(lambda: _bump(namespaces))
+
+
+def make_etag(content):
+    return '"{}"'.format(hashlib.md5(content, usedforsecurity=False).hexdigest())
+
+
+def _opaque_tag(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def etag_matches(request, etag):
+    """
+    Слабое сравнение ETag из If-None-Match (RFC 9110, 13.1.2).
+    """
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or _opaque_tag(etag) in map(_opaque_tag, etags)
+
+
+class CachedResponseMixin:
+    """
+    Кэш готовых JSON-ответов для list/retrieve.
+
+    Ключ — поколение пространства имён, хост, путь и нормализованная
+    строка запроса. Поколение сдвигают сигналы на запись (invalidate),
+    поэтому устаревшие записи просто перестают находиться.
+    Каждая запись хранит ETag: If-None-Match отвечает 304 без БД.
+    """
+    cache_namespace = None
+    cached_actions = ('list', 'retrieve')
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request, *args, **kwargs)
+
+    async def alist(self, request, *args, **kwargs):
+        return await self.acached_response(super().alist, request, *args, **kwargs)
+
+    async def aretrieve(self, request, *args, **kwargs):
+        return await self.acached_response(
+            super().aretrieve, request, *args, **kwargs
+        )
+
+    def is_response_cacheable(self, request):
+        return (
+            getattr(settings, 'RESPONSE_CACHE_ENABLED', True)
+            and self.cache_namespace is not None
+            and self.action in self.cached_actions
+            and request.accepted_renderer.format == 'json'
+        )
+
+    def get_response_cache_key(self, request, generation):
+        query = sorted(
+            (name, sorted(values)) for name, values in request.query_params.lists()
+        )
+        raw = repr((request.get_host(), request.path, query)).encode()
+        digest = hashlib.md5(raw, usedforsecurity=False).hexdigest()
+        return ENTRY_KEY.format(self.cache_namespace, generation, digest)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        if not self.is_response_cacheable(request):
+            return handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(
+            request, get_generation(self.cache_namespace)
+        )
+        entry = cache.get(key)
+        if entry is not None:
+            return self.entry_response(request, entry, 'HIT')
+
+        # Запись кэша читается с default: отставшая реплика закэширует
+        # старые данные под новым поколением (см. invalidate)
+        with use_primary():
+            response = handler(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        entry = self.render_entry(request, response)
+        cache.set(key, entry, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300))
+        return self.entry_response(request, entry, 'MISS')
+
+    async def acached_response(self, handler, request, *args, **kwargs):
+        if not self.is_response_cacheable(request):
+            return await handler(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(
+            request, await aget_generation(self.cache_namespace)
+        )
+        entry = await cache.aget(key)
+        if entry is not None:
+            return self.entry_response(request, entry, 'HIT')
+
+        with use_primary():
+            response = await handler(request, *args, **kwargs)
+        if response.status_code != 200:
+            return response
+        entry = self.render_entry(request, response)
+        await cache.aset(
+            key, entry, getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+        )
+        return self.entry_response(request, entry, 'MISS')
+
+    def entry_response(self, request, entry, state):
+        if etag_matches(request, entry['etag']):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(
+                entry['content'], content_type=entry['content_type']
+            )
+        response['ETag'] = entry['etag']
+        if entry['last_modified']:
+            response['Last-Modified'] = entry['last_modified']
+        response['X-Cache'] = state
+        return response
+
+    def render_entry(self, request, response):
+        renderer = request.accepted_renderer
+        content = renderer.render(
+            response.data, request.accepted_media_type, self.get_renderer_context()
+        )
+        content_type = renderer.media_type
+        if renderer.charset:
+            content_type = f'{content_type}; charset={renderer.charset}'
+        # Валидаторы версии объекта (ConditionalRetrieveMixin) сохраняем
+        # как есть, иначе ETag считается по содержимому
+        return {
+            'content': content,
+            'content_type': content_type,
+            'etag': response.get('ETag') or make_etag(content),
+            'last_modified': response.get('Last-Modified'),
+        }
@@ -11,8 +11,11 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 import os
 import environ
+from django.core.exceptions import ImproperlyConfigured
 from pathlib import Path
 
+from growhub.db import configure_database
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 env = environ.Env()
 env.read_env(os.path.join(os.path.dirname(os.path.dirname(__file__)), '.env'))
@@ -39,25 +42,49 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     'rest_framework',
     'drf_yasg',
+    'growhub',
     'users',
     'projects',
     'comments',
+    'jobs',
     'corsheaders',
 ]
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'users.authentication.ClaimsJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
     'DEFAULT_FILTER_BACKENDS': ['django_filters.rest_framework.DjangoFilterBackend'],
+    'DEFAULT_PAGINATION_CLASS': 'growhub.pagination.KeysetPagination',
+    # JSON через orjson, если он установлен (growhub.renderers)
+    'DEFAULT_RENDERER_CLASSES': (
+        'growhub.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'growhub.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+    'PAGE_SIZE': env.int('API_PAGE_SIZE', default=20),
 }
 
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.ClaimsTokenObtainPairSerializer',
+}
+
+# Сколько секунд доверять закэшированному статусу пользователя
+# (активность, отзыв токена) в ClaimsJWTAuthentication
+JWT_USER_STATUS_TTL = env.int('JWT_USER_STATUS_TTL', default=60)
+
 AUTH_USER_MODEL = 'users.User'
 
 MIDDLEWARE = [
+    'growhub.metrics.RequestMetricsMiddleware',
+    'growhub.replicas.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
@@ -68,6 +95,10 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Метрики запросов (growhub.metrics): Server-Timing и лог медленных запросов
+REQUEST_METRICS_SERVER_TIMING = env.bool('REQUEST_METRICS_SERVER_TIMING', default=True)
+SLOW_REQUEST_THRESHOLD_MS = env.int('SLOW_REQUEST_THRESHOLD_MS', default=None)
+
 CORS_ALLOWED_ORIGINS = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
@@ -94,14 +125,137 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'growhub.wsgi.application'
+ASGI_APPLICATION = 'growhub.asgi.application'
+
+# Режим запуска (manage.py serve): dev — runserver, wsgi — gunicorn
+# с потоками, asgi — gunicorn с uvicorn-воркерами
+SERVER_MODE = env('SERVER_MODE', default='dev')
+SERVER_BIND = env('SERVER_BIND', default='0.0.0.0:8000')
+SERVER_WORKERS = env.int('SERVER_WORKERS', default=2 * (os.cpu_count() or 1) + 1)
+SERVER_THREADS = env.int('SERVER_THREADS', default=4)
+SERVER_TIMEOUT = env.int('SERVER_TIMEOUT', default=30)
+
+# Списки без сериализаторов: values_list и сборка dict (growhub.values_read)
+VALUES_READ_VIEWS = env.bool('VALUES_READ_VIEWS', default=False)
+
+# Предел времени от импорта до первого ответа воркера (manage.py startup_report)
+STARTUP_BUDGET_MS = env.int('STARTUP_BUDGET_MS', default=3000)
+
+# Async list/retrieve для горячих эндпоинтов (growhub.async_views)
+ASYNC_READ_VIEWS = env.bool('ASYNC_READ_VIEWS', default=SERVER_MODE == 'asgi')
 
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
+# Постоянные соединения или пул psycopg на воркер (growhub.db). Под ASGI
+# соединение не переживает запрос, поэтому там по умолчанию без
+# CONN_MAX_AGE: для переиспользования нужен DB_POOL
+DB_CONN_MAX_AGE = env.int('DB_CONN_MAX_AGE', default=0 if SERVER_MODE == 'asgi' else 60)
+DB_CONN_HEALTH_CHECKS = env.bool('DB_CONN_HEALTH_CHECKS', default=True)
+DB_POOL = env.bool('DB_POOL', default=False)
+DB_POOL_MIN_SIZE = env.int('DB_POOL_MIN_SIZE', default=2)
+# Больше соединений, чем потоков воркера, одновременно не понадобится
+DB_POOL_MAX_SIZE = env.int('DB_POOL_MAX_SIZE', default=SERVER_THREADS)
+DB_POOL_TIMEOUT = env.float('DB_POOL_TIMEOUT', default=10.0)
+
 DATABASES = {
-    'default': env.db()
+    'default': configure_database(
+        env.db(),
+        conn_max_age=DB_CONN_MAX_AGE,
+        health_checks=DB_CONN_HEALTH_CHECKS,
+        pool=DB_POOL,
+        pool_min_size=DB_POOL_MIN_SIZE,
+        pool_max_size=DB_POOL_MAX_SIZE,
+        pool_timeout=DB_POOL_TIMEOUT,
+    )
+}
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # Транзакция сразу берёт блокировку на запись: иначе параллельные
+    # писатели (потоки воркера jobs, gunicorn) получают "database is
+    # locked" при повышении блокировки вместо ожидания
+    DATABASES['default'].setdefault('OPTIONS', {}).setdefault(
+        'transaction_mode', 'IMMEDIATE'
+    )
+
+# Реплики только для чтения (growhub.replicas), DATABASE_URL через запятую.
+# Безопасные запросы читают с реплик, пока отставание не больше
+# REPLICA_MAX_LAG_SECONDS; после своей записи пользователь
+# REPLICA_STICKY_SECONDS читает с default. Отметка о записи хранится в
+# кэше, поэтому реплики требуют общий CACHE_URL
+DATABASE_REPLICAS = []
+for index, url in enumerate(env.list('DATABASE_REPLICA_URLS', default=[]), 1):
+    DATABASES[f'replica_{index}'] = {
+        **configure_database(
+            env.db_url_config(url),
+            conn_max_age=DB_CONN_MAX_AGE,
+            health_checks=DB_CONN_HEALTH_CHECKS,
+            pool=DB_POOL,
+            pool_min_size=DB_POOL_MIN_SIZE,
+            pool_max_size=DB_POOL_MAX_SIZE,
+            pool_timeout=DB_POOL_TIMEOUT,
+        ),
+        # В тестах реплика читает тестовую базу default
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(f'replica_{index}')
+DATABASE_ROUTERS = ['growhub.replicas.ReplicaRouter']
+REPLICA_STICKY_SECONDS = env.int('REPLICA_STICKY_SECONDS', default=5)
+REPLICA_MAX_LAG_SECONDS = env.float('REPLICA_MAX_LAG_SECONDS', default=5.0)
+REPLICA_LAG_CHECK_INTERVAL = env.float('REPLICA_LAG_CHECK_INTERVAL', default=1.0)
+
+# Поколения кэша ответов, справочники, подбор и события сверяются между
+# процессами через кэш: с несколькими воркерами (или воркером jobs)
+# нужен общий CACHE_URL, например redis://growhub-cache:6379/0
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://')
+}
+LOCAL_CACHE_BACKENDS = {
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
 }
+CACHE_SHARED = CACHES['default']['BACKEND'] not in LOCAL_CACHE_BACKENDS
+SINGLE_PROCESS = SERVER_MODE == 'dev' or SERVER_WORKERS == 1
+if DATABASE_REPLICAS and not CACHE_SHARED:
+    # Отметка о записи в локальном кэше не видна другим воркерам:
+    # следующий запрос пользователя прочитает с отстающей реплики
+    raise ImproperlyConfigured('DATABASE_REPLICA_URLS requires a shared CACHE_URL')
+
+# Кэш ответов каталога (growhub.response_cache). Без общего кэша каждый
+# воркер сдвигал бы только своё поколение и отдавал бы чужие правки
+# с опозданием, поэтому по умолчанию он включён только с общим кэшем
+RESPONSE_CACHE_ENABLED = env.bool(
+    'RESPONSE_CACHE_ENABLED', default=CACHE_SHARED or SINGLE_PROCESS
+)
+RESPONSE_CACHE_TIMEOUT = env.int('RESPONSE_CACHE_TIMEOUT', default=300)
+
+# События об изменениях каталога (growhub.events, SSE только под ASGI).
+# growhub.events.CacheBackend — общий поток для нескольких воркеров
+# через общий кэш (CACHE_URL), LocalBackend — события только своего
+# процесса; serve не запустит asgi-воркеры с событиями без общего потока
+EVENTS_BACKEND = env(
+    'EVENTS_BACKEND',
+    default='growhub.events.LocalBackend' if SINGLE_PROCESS
+    else 'growhub.events.CacheBackend',
+)
+EVENTS_HEARTBEAT = env.int('EVENTS_HEARTBEAT', default=15)
+EVENTS_RETRY_MS = env.int('EVENTS_RETRY_MS', default=3000)
+EVENTS_QUEUE_SIZE = env.int('EVENTS_QUEUE_SIZE', default=100)
+EVENTS_BUFFER_SIZE = env.int('EVENTS_BUFFER_SIZE', default=1000)
+EVENTS_MAX_SUBSCRIBERS = env.int('EVENTS_MAX_SUBSCRIBERS', default=1000)
+EVENTS_POLL_INTERVAL = env.float('EVENTS_POLL_INTERVAL', default=0.5)
+EVENTS_RETENTION = env.int('EVENTS_RETENTION', default=300)
+
+# Фоновые задачи (jobs): очередь в базе, воркер — manage.py run_jobs
+JOBS_POLL_INTERVAL = env.float('JOBS_POLL_INTERVAL', default=1.0)
+JOBS_MAX_ATTEMPTS = env.int('JOBS_MAX_ATTEMPTS', default=5)
+# Повтор через JOBS_RETRY_DELAY * 2^(попытка-1) секунд, не больше MAX
+JOBS_RETRY_DELAY = env.int('JOBS_RETRY_DELAY', default=10)
+JOBS_RETRY_MAX_DELAY = env.int('JOBS_RETRY_MAX_DELAY', default=3600)
+# Задача, взятая дольше этого (секунды), считается брошенной воркером
+JOBS_LOCK_TIMEOUT = env.int('JOBS_LOCK_TIMEOUT', default=600)
+# Сколько секунд хранить выполненные задачи (для статистики)
+JOBS_KEEP_DONE = env.int('JOBS_KEEP_DONE', default=86400)
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -0,0 +1,95 @@
+"""
+Замер холодного старта воркера в отдельном процессе:
+
+    python -X importtime -m growhub.startup /api/projects/
+
+печатает в stdout JSON с фазами старта (мс), временем ready() каждого
+приложения и статусом первого запроса; время импорта по модулям
+-X importtime пишет в stderr. Отчёт собирает manage.py startup_report.
+"""
+import io
+import json
+import os
+import sys
+import time
+
+
+def timed_ready(ready_ms):
+    """
+    Оборачивает ready() каждого приложения при создании его AppConfig.
+    """
+    from django.apps import AppConfig
+
+    create = AppConfig.create.__func__
+
+    def timed_create(cls, entry):
+        config = create(cls, entry)
+        ready = config.ready
+
+        def timed():
+            start = time.perf_counter()
+            ready()
+            ready_ms[config.label] = (time.perf_counter() - start) * 1000
+
+        config.ready = timed
+        return config
+
+    AppConfig.create = classmethod(timed_create)
+
+
+def request(application, path):
+    """
+    Запрос прямо в WSGI-приложение, без сервера и тестового клиента.
+    """
+    path, _, query = path.partition('?')
+    environ = {
+        'REQUEST_METHOD': 'GET', 'PATH_INFO': path, 'QUERY_STRING': query,
+        'SERVER_NAME': 'localhost', 'SERVER_PORT': '80',
+        'wsgi.input': io.BytesIO(), 'wsgi.errors': sys.stderr,
+        'wsgi.url_scheme': 'http',
+    }
+    status = []
+    response = application(environ, lambda line, headers: status.append(line))
+    try:
+        b''.join(response)
+    finally:
+        getattr(response, 'close', lambda: None)()
+    return int(status[0].split()[0])
+
+
+def main(path):
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'growhub.settings')
+    phases, ready_ms = {}, {}
+    start = mark = time.perf_counter()
+
+    def phase(name):
+        nonlocal mark
+        now = time.perf_counter()
+        phases[name] = (now - mark) * 1000
+        mark = now
+
+    import django
+    from django.conf import settings
+    # Первое обращение импортирует модуль настроек
+    settings.INSTALLED_APPS
+    phase('settings')
+
+    timed_ready(ready_ms)
+    django.setup(set_prefix=False)
+    phase('setup')
+
+    from django.core.handlers.wsgi import WSGIHandler
+    application = WSGIHandler()
+    phase('application')
+
+    status = request(application, path)
+    phase('first_request')
+    phases['to_first_response'] = (mark - start) * 1000
+    request(application, path)
+    phase('second_request')
+
+    json.dump({'phases': phases, 'ready': ready_ms, 'status': status}, sys.stdout)
+
+
+if __name__ == '__main__':
+    main(sys.argv[1] if len(sys.argv) > 1 else '/')
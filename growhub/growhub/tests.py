@@ -0,0 +1,967 @@
+import csv
+import io
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import uuid
+from base64 import urlsafe_b64encode
+from contextlib import contextmanager
+from io import StringIO
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from unittest import mock
+from urllib.parse import urlsplit
+
+from asgiref.sync import async_to_sync, sync_to_async
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.cache import cache
+from django.db import DatabaseError, connection, connections, transaction
+from django.http import HttpResponse
+from django.test import (
+    AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, TransactionTestCase,
+    override_settings,
+)
+from django.test.utils import CaptureQueriesContext
+from django.utils.translation import gettext_lazy
+from django.utils import timezone
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework.views import APIView
+
+from comments.models import Comment
+from growhub import renderers
+from growhub.bulk import SyncResult, sync_related
+from growhub.db import POSTGRESQL, configure_database
+from growhub.export import Exporter
+from growhub.importer import Importer
+from growhub.replicas import (
+    ReplicaRouter, ReplicaRoutingMiddleware, measure_lag, replica_lag, use_primary,
+)
+from jobs.models import Job
+from jobs.queue import run_pending
+from projects.facets import find_drift
+from projects.imports import ProjectImporter
+from projects.models import Project, ProjectPosition, Stack
+from projects.views import ProjectViewSet
+from users.models import Experience, GradeEnum, RoleEnum, Skill, User
+
+# Таблицы, которые растут вместе с числом пользователей и проектов.
+# Справочники (стеки, навыки, счётчики фасетов) читаются целиком.
+LARGE_TABLES = {
+    'users_user', 'users_user_skills', 'users_experience',
+    'projects_project', 'projects_project_stacks', 'projects_projectposition',
+    'comments_comment',
+}
+
+SAMPLE_FILTER_VALUES = {
+    'role_id': RoleEnum.BACKEND,
+    'grade_id': GradeEnum.MIDDLE,
+    'positions__role_id': RoleEnum.BACKEND,
+    'positions__grade_id': GradeEnum.MIDDLE,
+}
+
+SQLITE_SCAN = re.compile(r'^SCAN (\w+)$')
+POSTGRES_SCAN = re.compile(r'Seq Scan on (\w+)')
+
+
+def list_url_names(patterns=None):
+    """
+    Имена всех зарегистрированных list-маршрутов роутеров.
+    """
+    names = set()
+    for pattern in patterns if patterns is not None else get_resolver().url_patterns:
+        if isinstance(pattern, URLResolver):
+            names |= list_url_names(pattern.url_patterns)
+        elif isinstance(pattern, URLPattern) and (pattern.name or '').endswith('-list'):
+            names.add(pattern.name)
+    return names
+
+
+@contextmanager
+def capture_statements():
+    statements = []
+
+    def wrapper(execute, sql, params, many, context):
+        if sql.lstrip().upper().startswith('SELECT'):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield statements
+
+
+def sequential_scans(sql, params):
+    """
+    Таблицы из LARGE_TABLES, которые план читает целиком.
+
+    В PostgreSQL seq scan отключается на время EXPLAIN: на маленькой
+    тестовой базе планировщик иначе выбирает его всегда, а так
+    Seq Scan остаётся в плане, только если подходящего индекса нет.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {sql}', params)
+            plan = [row[0] for row in cursor.fetchall()]
+            tables = [m.group(1) for line in plan for m in POSTGRES_SCAN.finditer(line)]
+        else:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            plan = [row[-1] for row in cursor.fetchall()]
+            tables = [m.group(1) for m in map(SQLITE_SCAN.match, plan) if m]
+    return sorted(set(tables) & LARGE_TABLES), plan
+
+
+class ListEndpointIndexTest(TestCase):
+    """
+    EXPLAIN каждого запроса, который выполняют list-эндпоинты
+    (первая и вторая страница, фильтры, сортировки): полный проход
+    по большой таблице означает, что индекса под форму запроса нет.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        skills = Skill.objects.bulk_create(
+            [Skill(code=f'skill{i}', name=f'Skill {i}') for i in range(10)]
+        )
+        stacks = Stack.objects.bulk_create(
+            [Stack(name=f'Stack {i}') for i in range(10)]
+        )
+        cls.admin = User.objects.create_user(
+            email='explain@example.com', username='explain', is_staff=True
+        )
+        users = User.objects.bulk_create([
+            User(
+                email=f'user{i}@example.com', username=f'user{i}',
+                role_id=RoleEnum.values[i % len(RoleEnum.values)],
+                grade_id=GradeEnum.values[i % len(GradeEnum.values)],
+            )
+            for i in range(40)
+        ])
+        User.skills.through.objects.bulk_create([
+            User.skills.through(user_id=user.id, skill_id=skills[i % 10].id)
+            for i, user in enumerate(users)
+        ])
+        Experience.objects.bulk_create([
+            Experience(
+                user=cls.admin, company=f'Company {i}', position='Developer',
+                start_date=date(2020, 1, 1) + timedelta(days=30 * i),
+            )
+            for i in range(30)
+        ])
+        projects = Project.objects.bulk_create([
+            Project(name=f'Project {i}', author=users[i % 40]) for i in range(40)
+        ])
+        Project.stacks.through.objects.bulk_create([
+            Project.stacks.through(project_id=project.id, stack_id=stacks[i % 10].id)
+            for i, project in enumerate(projects)
+        ])
+        positions = ProjectPosition.objects.bulk_create([
+            ProjectPosition(
+                project=project,
+                role_id=RoleEnum.values[i % len(RoleEnum.values)],
+                grade_id=GradeEnum.values[i % len(GradeEnum.values)],
+            )
+            for i, project in enumerate(projects)
+        ])
+        cls.stack = stacks[0]
+        cls.project, cls.position = projects[0], positions[0]
+        for i in range(30):
+            Comment.objects.post(
+                projects[i % 2], cls.admin, f'Comment {i}', position=positions[i % 2]
+            )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def get_url_kwargs(self, name):
+        if name.startswith('user-experiences'):
+            return {'user_pk': self.admin.pk}
+        if name.startswith('project-comments'):
+            return {'project_pk': self.project.pk}
+        return {}
+
+    def get_filter_value(self, field):
+        if field == 'position':
+            return self.position.pk
+        return SAMPLE_FILTER_VALUES.get(field, self.stack.pk)
+
+    def get_query_variants(self, url):
+        view = get_resolver().resolve(urlsplit(url).path).func
+        view_class = view.cls
+        variants = [{}, {'page_size': 5}]
+        for field in getattr(view_class, 'filterset_fields', []):
+            variants.append({field: self.get_filter_value(field)})
+        for field in getattr(view_class, 'ordering_fields', None) or []:
+            variants += [{'ordering': field}, {'ordering': f'-{field}'}]
+        return variants
+
+    def assertIndexedStatements(self, url, params):
+        with capture_statements() as statements:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200, url)
+
+        for sql, sql_params in statements:
+            tables, plan = sequential_scans(sql, sql_params)
+            self.assertFalse(
+                tables,
+                f'{url} {params}: full scan of {tables}\n{sql}\n' + '\n'.join(plan)
+            )
+        return response
+
+    def test_list_endpoints_use_indexes(self):
+        names = list_url_names()
+        self.assertIn('project-list', names)
+
+        for name in sorted(names):
+            url = reverse(name, kwargs=self.get_url_kwargs(name))
+            for params in self.get_query_variants(url):
+                with self.subTest(name=name, params=params):
+                    response = self.assertIndexedStatements(url, params)
+                    next_url = response.json().get('next')
+                    if next_url:
+                        # Вторая страница: условие keyset по составному ключу
+                        self.assertIndexedStatements(next_url, {})
+
+
+class SeedBenchmarkTest(TestCase):
+    def test_seed_then_benchmark_and_compare(self):
+        call_command(
+            'seed', users=30, projects=10, positions=40, technologies=12,
+            stdout=StringIO()
+        )
+        self.assertEqual(User.objects.filter(username__startswith='seed-').count(), 31)
+        self.assertEqual(ProjectPosition.objects.count(), 40)
+        self.assertTrue(User.skills.through.objects.exists())
+        self.assertEqual(find_drift(), {})
+        with self.assertRaises(CommandError):
+            call_command('seed', users=1, stdout=StringIO())
+
+        with tempfile.NamedTemporaryFile('r', suffix='.json') as baseline:
+            call_command(
+                'benchmark', iterations=2, warmup=0, output=baseline.name,
+                stdout=StringIO()
+            )
+            report = json.load(baseline)
+            endpoints = report['endpoints']
+            for name in ['project-list', 'project-detail', 'user-list',
+                         'user-experiences-list', 'position-candidates']:
+                self.assertEqual(endpoints[name]['status'], 200, name)
+            self.assertEqual(report['meta']['rows']['positions'], 40)
+
+            call_command(
+                'benchmark', iterations=2, warmup=0, filter='project-list',
+                compare=baseline.name, threshold=100, min_delta_ms=1000,
+                stdout=StringIO()
+            )
+
+            # Baseline с меньшим числом запросов: регрессия
+            endpoints['project-list']['queries'] = 0
+            with open(baseline.name, 'w') as output:
+                json.dump(report, output)
+            with self.assertRaisesMessage(CommandError, 'project-list: queries'):
+                call_command(
+                    'benchmark', iterations=2, warmup=0, filter='project-list',
+                    compare=baseline.name, threshold=100, min_delta_ms=1000,
+                    stdout=StringIO()
+                )
+
+
+class ExportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='export@example.com', username='export', is_staff=True
+        )
+        cls.skill = Skill.objects.create(code='python', name='Python')
+        cls.admin.skills.add(cls.skill)
+        cls.stack = Stack.objects.create(name='Django')
+        cls.projects = []
+        for i in range(5):
+            project = Project.objects.create(name=f'Export {i}', author=cls.admin)
+            project.stacks.add(cls.stack)
+            ProjectPosition.objects.create(
+                project=project, role_id=RoleEnum.BACKEND, grade_id=GradeEnum.MIDDLE
+            )
+            cls.projects.append(project)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode()
+
+    def test_ndjson_in_chunks(self):
+        with self.settings(RESPONSE_CACHE_ENABLED=False):
+            response = self.client.get(reverse('export-projects'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertIn('projects.ndjson', response['Content-Disposition'])
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(
+            [row['id'] for row in rows], sorted(str(p.id) for p in self.projects)
+        )
+        self.assertEqual(rows[0]['stacks'][0]['name'], 'Django')
+        self.assertEqual(len(rows[0]['positions']), 1)
+
+    def test_csv_flattens_nested_values(self):
+        response = self.client.get(reverse('export-users'), {'output': 'csv'})
+        self.assertEqual(response.status_code, 200)
+        rows = list(csv.DictReader(StringIO(self.read(response))))
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['email'], 'export@example.com')
+        self.assertEqual(json.loads(rows[0]['skills'])[0]['code'], 'python')
+
+    def test_since_watermark(self):
+        response = self.client.get(reverse('export-projects'))
+        self.read(response)
+        watermark = response['X-Export-Watermark']
+
+        changed = self.projects[2]
+        changed.name = 'Changed'
+        changed.save()
+        response = self.client.get(reverse('export-projects'), {'since': watermark})
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([row['name'] for row in rows], ['Changed'])
+
+        response = self.client.get(
+            reverse('export-projects'),
+            {'since': (timezone.now() + timedelta(days=1)).date().isoformat()},
+        )
+        self.assertEqual(self.read(response), '')
+
+    def test_validation_and_permissions(self):
+        url = reverse('export-projects')
+        self.assertEqual(self.client.get(url, {'output': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'since': 'yesterday'}).status_code, 400)
+
+        self.client.force_authenticate(
+            User.objects.create_user(email='plain@example.com', username='plain')
+        )
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+    def test_export_command(self):
+        with tempfile.NamedTemporaryFile('r', suffix='.csv') as target:
+            call_command(
+                'export', 'projects', output='csv', file=target.name, chunk_size=2,
+                stderr=StringIO()
+            )
+            rows = list(csv.DictReader(target))
+        self.assertEqual(len(rows), 5)
+        self.assertEqual(json.loads(rows[0]['stacks'])[0]['name'], 'Django')
+
+    def test_exporter_requires_queryset(self):
+        class NoRows(Exporter):
+            watermark_field = 'created_at'
+
+        with self.assertRaisesMessage(TypeError, 'get_queryset'):
+            NoRows()
+
+
+class ImportTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user(
+            email='import@example.com', username='import', is_staff=True
+        )
+        cls.skill = Skill.objects.create(code='python', name='Python')
+        cls.admin.skills.add(cls.skill)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def write_csv(self, name, rows):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', newline='') as target:
+            csv.writer(target).writerows(rows)
+        return path
+
+    def upload(self, name, lines, **params):
+        upload = SimpleUploadedFile(name, ('\n'.join(lines) + '\n').encode())
+        return self.client.post(
+            reverse(f'import-{name.split(".")[0]}') + '?' + '&'.join(
+                f'{key}={value}' for key, value in params.items()
+            ),
+            {'file': upload}, format='multipart',
+        )
+
+    def test_skills_upsert_by_code(self):
+        response = self.upload('skills.ndjson', [
+            json.dumps({'code': 'python', 'name': 'Python 3'}),
+            json.dumps({'code': 'go'}),
+            json.dumps({'name': 'No code'}),
+        ])
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual(
+            (report['created'], report['updated'], report['failed']), (1, 1, 1)
+        )
+        self.assertEqual(report['errors'][0]['line'], 3)
+        self.assertEqual(Skill.objects.get(code='go').name, 'go')
+        self.skill.refresh_from_db()
+        self.assertEqual(self.skill.name, 'Python 3')
+        # Название навыка — часть поискового документа профиля
+        run_pending()
+        self.admin.refresh_from_db()
+        self.assertIn('Python 3', self.admin.search_document)
+
+    def test_users_with_line_errors(self):
+        rows = [
+            {'email': 'a@example.com', 'username': 'a', 'role_id': 'backend',
+             'skills': ['python', 'rust']},
+            {'email': 'a@example.com', 'username': 'a2'},
+            {'email': 'import@example.com', 'username': 'b'},
+            {'email': 'c@example.com', 'username': 'c', 'grade_id': 'guru'},
+        ]
+        response = self.upload(
+            'users.ndjson', [json.dumps(row) for row in rows] + ['{broken']
+        )
+        self.assertEqual(response.status_code, 200)
+        report = response.json()
+        self.assertEqual((report['created'], report['failed']), (1, 4))
+        errors = {error['line']: error['errors'] for error in report['errors']}
+        self.assertEqual(sorted(errors), [2, 3, 4, 5])
+        self.assertIn('email', errors[2])
+        self.assertIn('email', errors[3])
+        self.assertIn('grade_id', errors[4])
+        self.assertIn('non_field_errors', errors[5])
+
+        user = User.objects.get(email='a@example.com')
+        self.assertFalse(user.has_usable_password())
+        self.assertEqual(
+            sorted(user.skills.values_list('code', flat=True)), ['python', 'rust']
+        )
+        self.assertIn('rust', user.search_document)
+
+    def test_projects_resume_after_failure(self):
+        positions = json.dumps([{'role_id': 'backend', 'count_needed': 2}])
+        path = self.write_csv('projects.csv', [
+            ['name', 'author_email', 'stacks', 'positions'],
+            *[[f'Project {i}', 'import@example.com', 'Django;Vue', positions]
+              for i in range(5)],
+        ])
+        original = ProjectImporter.write_batch
+        calls = []
+
+        def failing_write(importer, rows):
+            calls.append(len(rows))
+            if len(calls) == 2:
+                raise DatabaseError('connection lost')
+            return original(importer, rows)
+
+        with mock.patch.object(ProjectImporter, 'write_batch', failing_write):
+            with self.assertRaisesMessage(CommandError, 'after line 3'):
+                call_command('bulk_import', 'projects', path, batch_size=2,
+                             stdout=StringIO(), stderr=StringIO())
+        self.assertEqual(Project.objects.count(), 2)
+
+        stdout = StringIO()
+        call_command('bulk_import', 'projects', path, batch_size=2, resume=True,
+                     stdout=stdout, stderr=StringIO())
+        self.assertIn('created 3', stdout.getvalue())
+        self.assertEqual(Project.objects.count(), 5)
+        self.assertEqual(ProjectPosition.objects.count(), 5)
+        project = Project.objects.get(name='Project 4')
+        self.assertEqual(
+            sorted(project.stacks.values_list('name', flat=True)), ['Django', 'Vue']
+        )
+        self.assertIn('Vue', project.search_document)
+        self.assertEqual(find_drift(), {})
+
+        with open(f'{path}.checkpoint') as source:
+            self.assertEqual(json.load(source)['checkpoint'], 6)
+
+    def test_validation_and_permissions(self):
+        url = reverse('import-stacks')
+        self.assertEqual(self.client.post(url, {}, format='multipart').status_code, 400)
+        response = self.upload('stacks.ndjson', ['{}'], input='xml')
+        self.assertEqual(response.status_code, 400)
+
+        self.client.force_authenticate(
+            User.objects.create_user(email='plain@example.com', username='plain')
+        )
+        self.assertEqual(self.upload('stacks.ndjson', ['{}']).status_code, 403)
+
+    def test_importer_requires_row_and_batch_methods(self):
+        class RowsOnly(Importer):
+            def clean_row(self, row):
+                return row
+
+        with self.assertRaisesMessage(TypeError, 'write_batch'):
+            RowsOnly()
+
+
+class SyncRelatedTest(TestCase):
+    FIELDS = ['role_id', 'grade_id', 'count_needed']
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(email='sync@example.com', username='sync')
+
+    def sync(self, size):
+        project = Project.objects.create(name=f'Sync {size}', author=self.author)
+        positions = ProjectPosition.objects.bulk_create([
+            ProjectPosition(project=project, role_id=RoleEnum.QA)
+            for _ in range(size)
+        ])
+        comment = Comment.objects.post(
+            project, self.author, 'On a removed position', position=positions[-1]
+        )
+        items = [
+            {'id': positions[0].pk, 'role_id': RoleEnum.QA, 'count_needed': 2},
+            {'id': positions[1].pk, 'role_id': RoleEnum.QA},
+            {'role_id': RoleEnum.BACKEND},
+            {'id': uuid.uuid4(), 'role_id': RoleEnum.DEVOPS},
+        ]
+        # SELECT строк, обнуление комментариев, DELETE, INSERT, UPDATE
+        # и точка сохранения — независимо от числа строк
+        with self.assertNumQueries(7):
+            result = sync_related(
+                project.positions.all(), items, self.FIELDS, project=project
+            )
+        return project, positions, comment, result
+
+    def test_counts_ids_and_bounded_queries(self):
+        for size in (10, 40):
+            project, positions, comment, result = self.sync(size)
+            self.assertEqual(result, SyncResult(created=2, updated=1, deleted=size - 2))
+            rows = {row.pk: row for row in project.positions.all()}
+            self.assertEqual(len(rows), 4)
+            # Сохранённые позиции не пересоздаются
+            self.assertEqual(rows[positions[0].pk].count_needed, 2)
+            self.assertIn(positions[1].pk, rows)
+            comment.refresh_from_db()
+            self.assertIsNone(comment.position_id)
+
+    def test_experiences_are_synced(self):
+        start = date(2020, 1, 1)
+        kept, removed = Experience.objects.bulk_create([
+            Experience(
+                user=self.author, company=company, position='Dev', start_date=start
+            )
+            for company in ('Kept', 'Removed')
+        ])
+        result = sync_related(
+            self.author.experiences.all(),
+            [{'id': kept.pk, 'company': 'Kept', 'position': 'Lead'}],
+            ['company', 'position'], user=self.author,
+        )
+        self.assertEqual(result, SyncResult(created=0, updated=1, deleted=1))
+        self.assertEqual(
+            list(self.author.experiences.values_list('id', 'position')),
+            [(kept.pk, 'Lead')],
+        )
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class KeysetPaginationTest(TestCase):
+    def test_cursor_past_deleted_rows(self):
+        for name in ['Alpha', 'Beta']:
+            Stack.objects.create(name=name)
+        first = self.client.get('/api/stacks/?ordering=name&page_size=1').json()
+        Stack.objects.filter(name='Beta').delete()
+
+        response = self.client.get(first['next'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'], [])
+        previous = self.client.get(response.json()['previous']).json()
+        self.assertEqual([row['name'] for row in previous['results']], ['Alpha'])
+
+    def test_tampered_cursor_is_not_found(self):
+        Stack.objects.create(name='Alpha')
+        for position in (['Alpha', 'not-a-uuid'], ['Alpha', {'id': 1}], ['Alpha']):
+            payload = json.dumps({'r': 0, 'p': position}).encode()
+            cursor = urlsafe_b64encode(payload).decode()
+            response = self.client.get(f'/api/stacks/?ordering=name&cursor={cursor}')
+            self.assertEqual(response.status_code, 404, position)
+            self.assertEqual(response.json()['detail'], 'Invalid cursor')
+
+
+class DatabaseConnectionsTest(TestCase):
+    sqlite = {'ENGINE': 'django.db.backends.sqlite3', 'NAME': 'db.sqlite3'}
+    postgres = {'ENGINE': POSTGRESQL, 'NAME': 'growhub', 'OPTIONS': {}}
+
+    def test_persistent_connections(self):
+        config = configure_database(self.sqlite, conn_max_age=60, health_checks=True)
+        self.assertEqual(config['CONN_MAX_AGE'], 60)
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        # ?conn_max_age= в DATABASE_URL важнее настройки
+        config = configure_database(
+            {**self.postgres, 'CONN_MAX_AGE': 5}, conn_max_age=60, health_checks=False
+        )
+        self.assertEqual(config['CONN_MAX_AGE'], 5)
+        self.assertNotIn('pool', config['OPTIONS'])
+
+    def test_pool(self):
+        config = configure_database(
+            {**self.postgres, 'CONN_MAX_AGE': 5}, conn_max_age=60,
+            health_checks=True, pool=True, pool_min_size=2, pool_max_size=8,
+        )
+        self.assertEqual(config['CONN_MAX_AGE'], 0)
+        pool = config['OPTIONS']['pool']
+        self.assertEqual((pool['min_size'], pool['max_size']), (2, 8))
+        self.assertTrue(config['CONN_HEALTH_CHECKS'])
+        self.assertEqual(self.postgres['OPTIONS'], {})
+
+        with self.assertRaisesMessage(ImproperlyConfigured, 'requires PostgreSQL'):
+            configure_database(self.sqlite, conn_max_age=60, health_checks=True,
+                               pool=True)
+
+    def test_replicas_require_shared_cache(self):
+        env = {**os.environ, 'DATABASE_REPLICA_URLS': 'sqlite:////tmp/replica.db'}
+        env.pop('CACHE_URL', None)
+        check = [sys.executable, 'manage.py', 'check']
+        options = {'cwd': settings.BASE_DIR, 'capture_output': True, 'text': True}
+        result = subprocess.run(check, env=env, **options)
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('requires a shared CACHE_URL', result.stderr)
+
+        env['CACHE_URL'] = 'redis://localhost:6379/0'
+        result = subprocess.run(check, env=env, **options)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_metrics(self):
+        admin = User.objects.create_user(
+            email='db-admin@example.com', username='db-admin', is_staff=True
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        client.delete('/api/metrics/')
+
+        extra = connections.create_connection('default')
+        try:
+            extra.ensure_connection()
+        finally:
+            extra.close()
+
+        database = client.get('/api/metrics/').json()['database']['default']
+        self.assertEqual(database['mode'], 'pool' if settings.DB_POOL else 'persistent')
+        self.assertEqual(database['connects'], 1)
+        if settings.DB_POOL:
+            self.assertIn('requests_wait_ms', database['pool'])
+        else:
+            self.assertEqual(database['conn_max_age'], settings.DB_CONN_MAX_AGE)
+
+
+@override_settings(DATABASE_REPLICAS=['replica'], RESPONSE_CACHE_ENABLED=False)
+class ReplicaRoutingTest(TransactionTestCase):
+    """
+    Две базы: default и реплика replica — второе соединение с той же
+    тестовой базой. Реплика видит только закоммиченное, поэтому
+    TransactionTestCase.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        # Алиас есть только у этого класса: раннер и остальные тесты
+        # видят одну базу default
+        default = connections['default'].settings_dict
+        connections.settings['replica'] = {
+            **default, 'TEST': {**default['TEST'], 'MIRROR': 'default'}
+        }
+        cls.databases = {'default', 'replica'}
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].close()
+        del connections['replica']
+        del connections.settings['replica']
+        del cls.databases
+
+    def setUp(self):
+        replica_lag.clear()
+        cache.clear()
+        self.user = User.objects.create_user(
+            email='replica@example.com', username='replica'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def request(self, client, method, url, data=None):
+        """
+        Ответ и число запросов к default и к реплике.
+        """
+        with CaptureQueriesContext(connections['default']) as primary:
+            with CaptureQueriesContext(connections['replica']) as replica:
+                response = getattr(client, method)(url, data, format='json')
+        return response, len(primary), len(replica)
+
+    def test_reads_from_replica_and_sticks_after_write(self):
+        response, primary, replica = self.request(self.client, 'get', '/api/users/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((primary, bool(replica)), (0, True))
+
+        response, primary, replica = self.request(
+            self.client, 'post', '/api/projects/', {'name': 'Replicated'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, 0)
+
+        # Свои записи автор видит сразу: читает с default
+        response, primary, replica = self.request(
+            self.client, 'get', '/api/projects/my/'
+        )
+        self.assertEqual(response.json()['results'][0]['name'], 'Replicated')
+        self.assertEqual((bool(primary), replica), (True, 0))
+
+        other = APIClient()
+        other.force_authenticate(User.objects.create_user(
+            email='other@example.com', username='other'
+        ))
+        _, primary, replica = self.request(other, 'get', '/api/users/')
+        self.assertEqual((primary, bool(replica)), (0, True))
+
+        cache.clear()
+        _, primary, replica = self.request(self.client, 'get', '/api/users/')
+        self.assertEqual((primary, bool(replica)), (0, True))
+
+    @override_settings(REPLICA_MAX_LAG_SECONDS=5)
+    def test_lagging_or_broken_replica_falls_back_to_primary(self):
+        self.assertEqual(measure_lag('replica'), 0.0)
+        for lag in [30.0, None]:
+            replica_lag.clear()
+            with mock.patch('growhub.replicas.measure_lag', return_value=lag):
+                _, primary, replica = self.request(self.client, 'get', '/api/users/')
+            self.assertEqual((bool(primary), replica), (True, 0))
+
+    def test_router_keeps_some_reads_on_primary(self):
+        router = ReplicaRouter()
+
+        def view(request):
+            seen['project'] = router.db_for_read(Project)
+            seen['job'] = router.db_for_read(Job)
+            with transaction.atomic():
+                seen['atomic'] = router.db_for_read(Project)
+            with use_primary():
+                seen['primary'] = router.db_for_read(Project)
+            return HttpResponse()
+
+        async def aview(request):
+            seen['async'] = await sync_to_async(router.db_for_read)(Project)
+            return HttpResponse()
+
+        seen = {}
+        ReplicaRoutingMiddleware(view)(RequestFactory().get('/'))
+        async_to_sync(ReplicaRoutingMiddleware(aview))(AsyncRequestFactory().get('/'))
+        self.assertEqual(seen, {
+            'project': 'replica', 'job': 'default', 'atomic': 'default',
+            'primary': 'default', 'async': 'replica',
+        })
+        # Вне запроса и в небезопасном запросе — default
+        self.assertEqual(router.db_for_read(Project), 'default')
+        ReplicaRoutingMiddleware(view)(RequestFactory().post('/'))
+        self.assertEqual(seen['project'], 'default')
+
+
+class StartupReportTest(TestCase):
+    def test_report_and_budget(self):
+        out = StringIO()
+        # Запрос без базы: процесс отчёта видит не тестовую базу
+        with self.assertRaisesMessage(CommandError, 'exceeds budget'):
+            call_command(
+                'startup_report', runs=1, json=True, budget_ms=0,
+                path='/api/events/?role=unknown', stdout=out,
+            )
+        report = json.loads(out.getvalue())
+        self.assertEqual(report['status'], 400)
+        self.assertGreater(report['phases_ms']['to_first_response'], 0)
+        self.assertIn('users', report['ready_ms'])
+        self.assertIn('django', report['imports_ms'])
+
+
+class ServeTest(SimpleTestCase):
+    @override_settings(EVENTS_BACKEND='growhub.events.LocalBackend', CACHE_SHARED=True)
+    def test_asgi_workers_require_shared_events(self):
+        with self.assertRaisesMessage(CommandError, 'CacheBackend'):
+            call_command('serve', mode='asgi', workers=2)
+        with override_settings(
+            EVENTS_BACKEND='growhub.events.CacheBackend', CACHE_SHARED=False
+        ), self.assertRaisesMessage(CommandError, 'CACHE_URL'):
+            call_command('serve', mode='asgi', workers=2)
+
+        with mock.patch('shutil.which', return_value='/bin/gunicorn'), \
+                mock.patch('os.execv') as execv:
+            call_command('serve', mode='asgi', workers=1, stdout=StringIO())
+            with override_settings(EVENTS_BACKEND='growhub.events.CacheBackend'):
+                call_command('serve', mode='asgi', workers=4, stdout=StringIO())
+        argv = execv.call_args.args[1]
+        self.assertEqual(argv[argv.index('--workers') + 1], '4')
+        self.assertIn('python:growhub.gunicorn_conf', argv)
+
+
+class FastJSONTest(TestCase):
+    data = {
+        'id': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+        'day': date(2025, 1, 2),
+        'at': datetime(2025, 1, 2, 3, 4, 5, 678901, tzinfo=UTC),
+        'naive': datetime(2025, 1, 2, 3, 4, 5),
+        'price': Decimal('1.50'),
+        'lazy': gettext_lazy('Привет'),
+        'text': 'строка\u2028с разделителем',
+        'nested': [{1: None, 'ok': True, 'ratio': 0.25}],
+    }
+
+    def test_renderer_matches_stdlib(self):
+        content = renderers.FastJSONRenderer().render(self.data)
+        self.assertEqual(content, JSONRenderer().render(self.data))
+        self.assertIn(b'"2025-01-02T03:04:05.678901Z"', content)
+
+        # Что orjson не умеет или не нужно ему — стандартный рендерер
+        big = {'value': 2 ** 70}
+        self.assertEqual(
+            renderers.FastJSONRenderer().render(big), JSONRenderer().render(big)
+        )
+        indented = renderers.FastJSONRenderer().render(
+            self.data, renderer_context={'indent': 2}
+        )
+        self.assertEqual(indented, JSONRenderer().render(
+            self.data, renderer_context={'indent': 2}
+        ))
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertEqual(
+                renderers.FastJSONRenderer().render(self.data),
+                JSONRenderer().render(self.data),
+            )
+
+    def test_parser_matches_stdlib(self):
+        content = JSONRenderer().render(self.data)
+        parser = renderers.FastJSONParser()
+        self.assertEqual(
+            parser.parse(io.BytesIO(content)), JSONParser().parse(io.BytesIO(content))
+        )
+        for body in [b'{"a": ', b'{"a": NaN}']:
+            with self.assertRaises(ParseError):
+                parser.parse(io.BytesIO(body))
+        latin = 'ключ'.encode('cp1251')
+        with self.assertRaises(ParseError):
+            parser.parse(io.BytesIO(latin))
+        self.assertEqual(
+            parser.parse(io.BytesIO('"ключ"'.encode('cp1251')),
+                         parser_context={'encoding': 'cp1251'}),
+            'ключ',
+        )
+
+    def test_api_uses_fast_json(self):
+        view = APIView()
+        self.assertIsInstance(view.get_renderers()[0], renderers.FastJSONRenderer)
+        self.assertIsInstance(view.get_parsers()[0], renderers.FastJSONParser)
+        response = APIClient().post(
+            '/api/auth/login/', b'{"email": ', content_type='application/json'
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('JSON parse error', response.json()['detail'])
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ValuesReadContractTest(TestCase):
+    """
+    Режим values (VALUES_READ_VIEWS) обязан отдавать те же байты, что
+    и сериализаторы: новое поле сериализатора без поддержки в
+    growhub.values_read уронит этот тест, а не ответ в продакшене.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        skills = [
+            Skill.objects.create(code=f'c{i}', name=f'Навык {i}') for i in range(3)
+        ]
+        stacks = [Stack.objects.create(name=f'Стек {i}') for i in range(3)]
+        cls.author = User.objects.create_user(
+            email='values@example.com', username='values', telegram='@values',
+            github='https://github.com/values', info='Строка\u2028с "кавычками"',
+            role_id=RoleEnum.BACKEND, grade_id=GradeEnum.SENIOR,
+        )
+        cls.author.skills.set(skills)
+        Experience.objects.create(
+            user=cls.author, company='Acme', position='Dev',
+            start_date=date(2020, 1, 1), description='Python',
+        )
+        Experience.objects.create(
+            user=cls.author, company='Initech', position='Lead',
+            start_date=date(2021, 1, 1), end_date=date(2022, 6, 30),
+        )
+        for i in range(7):
+            user = User.objects.create_user(
+                email=f'values{i}@example.com', username=f'values{i}'
+            )
+            user.skills.set(skills[:i % 3])
+            project = Project.objects.create(
+                name=f'Django проект {i}', author=cls.author if i % 2 else user,
+                github=None if i % 3 else f'https://github.com/p{i}',
+                description=None if i % 2 else f'Описание {i}',
+            )
+            project.stacks.set(stacks[:i % 4])
+            for role in [RoleEnum.BACKEND, RoleEnum.QA][:i % 3]:
+                ProjectPosition.objects.create(
+                    project=project, role_id=role, grade_id=GradeEnum.MIDDLE,
+                    count_needed=i,
+                )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def fetch_pages(self, url):
+        """
+        Все страницы по ссылкам next: курсоры тоже должны совпасть.
+        """
+        pages, queries = [], 0
+        while url:
+            with CaptureQueriesContext(connection) as captured:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            pages.append(response.content)
+            queries += len(captured)
+            url = response.json().get('next')
+        return pages, queries
+
+    def test_values_mode_matches_serializers(self):
+        urls = [
+            '/api/projects/?page_size=3',
+            '/api/projects/?page_size=2&ordering=name',
+            '/api/projects/?search=django&page_size=2',
+            f'/api/projects/?stacks={Stack.objects.first().pk}',
+            '/api/projects/my/?page_size=2',
+            '/api/positions/?page_size=2',
+            f'/api/positions/?role_id={RoleEnum.QA}',
+            '/api/positions/my/',
+            '/api/users/?page_size=3',
+            '/api/users/?fields=id,username,skills&expand=skills',
+            '/api/users/?ordering=username&expand=',
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                with override_settings(VALUES_READ_VIEWS=False):
+                    expected, serializer_queries = self.fetch_pages(url)
+                with override_settings(VALUES_READ_VIEWS=True):
+                    pages, queries = self.fetch_pages(url)
+                self.assertEqual(pages, expected)
+                self.assertLessEqual(queries, serializer_queries)
+
+    @override_settings(ASYNC_READ_VIEWS=True, VALUES_READ_VIEWS=True)
+    async def test_async_list_matches(self):
+        view = ProjectViewSet.as_view({'get': 'list'})
+        response = await view(AsyncRequestFactory().get('/api/projects/?page_size=4'))
+        content = response.render().content
+        with override_settings(VALUES_READ_VIEWS=False):
+            response = await view(
+                AsyncRequestFactory().get('/api/projects/?page_size=4')
+            )
+        self.assertEqual(content, response.render().content)
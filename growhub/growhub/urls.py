@@ -8,7 +8,15 @@ from drf_yasg import openapi
 from drf_yasg.views import get_schema_view
 from rest_framework import permissions
 
+from growhub.export import ExportView
+from growhub.importer import ImportView
+from growhub.metrics import MetricsView
+from jobs.views import JobStatsView
 from growhub.settings import SWAGGER_PASSWORD, SWAGGER_USER
+from projects.exports import ProjectExporter
+from projects.imports import ProjectImporter, StackImporter
+from users.exports import UserExporter
+from users.imports import SkillImporter, UserImporter
 
 
 def swagger_password_required(view_func):
@@ -40,8 +48,29 @@ schema_view = get_schema_view(
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/metrics/', MetricsView.as_view(), name='metrics'),
+    path('api/jobs/', JobStatsView.as_view(), name='jobs'),
+    path('api/export/projects/', ExportView.as_view(
+        exporter_class=ProjectExporter, filename='projects'
+    ), name='export-projects'),
+    path('api/export/users/', ExportView.as_view(
+        exporter_class=UserExporter, filename='users'
+    ), name='export-users'),
+    path('api/import/skills/', ImportView.as_view(
+        importer_class=SkillImporter
+    ), name='import-skills'),
+    path('api/import/stacks/', ImportView.as_view(
+        importer_class=StackImporter
+    ), name='import-stacks'),
+    path('api/import/users/', ImportView.as_view(
+        importer_class=UserImporter
+    ), name='import-users'),
+    path('api/import/projects/', ImportView.as_view(
+        importer_class=ProjectImporter
+    ), name='import-projects'),
     path('api/', include('users.urls')),
     path('api/', include('projects.urls')),
+    path('api/', include('comments.urls')),
     path('swagger/', swagger_password_required(
         schema_view.with_ui('swagger', cache_timeout=0)
     ), name='schema-swagger-ui'),
@@ -0,0 +1,305 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ImproperlyConfigured
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from growhub.lookups import LookupRelatedField
+from growhub.metrics import timed_serialization
+
+# to_representation этих полей возвращает значение из базы как есть
+IDENTITY_FIELDS = {
+    serializers.CharField, serializers.EmailField, serializers.URLField,
+    serializers.IntegerField, serializers.BooleanField, serializers.ChoiceField,
+    serializers.ReadOnlyField,
+}
+# Эти поля форматируют значение сами, но не зависят от объекта
+FORMATTED_FIELDS = (
+    serializers.DateField, serializers.DateTimeField, serializers.TimeField,
+    serializers.DecimalField, serializers.FloatField,
+)
+
+_plans = {}
+
+
+def field_converter(field):
+    """
+    Функция значение из базы -> значение ответа, None — без изменений.
+    Поле может задать свою через values_converter().
+    """
+    if hasattr(field, 'values_converter'):
+        return field.values_converter()
+    if type(field) in IDENTITY_FIELDS:
+        return None
+    if type(field) is serializers.UUIDField and field.uuid_format == 'hex_verbose':
+        return str
+    if isinstance(field, FORMATTED_FIELDS):
+        return field.to_representation
+    raise ImproperlyConfigured(
+        f'{type(field).__name__} {field.field_name!r} is not supported in values mode'
+    )
+
+
+def column_path(model, attrs):
+    """
+    source поля -> путь колонки для values_list ('project.author_id' ->
+    'project__author_id'). Методы и свойства модели не поддерживаются.
+    """
+    try:
+        for attr in attrs[:-1]:
+            field = model._meta.get_field(attr)
+            if not (field.many_to_one or field.one_to_one):
+                raise FieldDoesNotExist(attr)
+            model = field.related_model
+        field = model._meta.get_field(attrs[-1])
+    except FieldDoesNotExist:
+        raise ImproperlyConfigured(f'{".".join(attrs)!r} is not a column')
+    if not field.concrete or (field.is_relation and attrs[-1] != field.attname):
+        raise ImproperlyConfigured(f'{".".join(attrs)!r} is not a column')
+    return '__'.join(attrs)
+
+
+class ValuesPlan:
+    """
+    Чтение строк сериализатора без сериализатора: строки — кортежи
+    из values_list, dict ответа собирает функция build, сгенерированная
+    один раз по полям сериализатора. Вложенные коллекции (many=True)
+    и связи справочников (LookupRelatedField) читаются тем же запросом,
+    что и prefetch_related исходной выборки, поэтому совпадает и порядок
+    строк.
+
+    parent — внешний ключ вложенной коллекции на родителя: поля вида
+    project.author_id берутся из строки родителя, а не через JOIN.
+    """
+
+    def __init__(self, serializer, model, parent=None):
+        self.model = model
+        self.parent = parent
+        self.columns = [model._meta.pk.attname]
+        if parent is not None:
+            self.columns.append(parent.attname)
+        self.parent_columns = []
+        self.items = []
+        self.relations = []
+        for name, field in serializer.fields.items():
+            if not field.write_only:
+                self.add_field(name, field)
+
+    def column(self, path):
+        if path not in self.columns:
+            self.columns.append(path)
+        return self.columns.index(path)
+
+    def add_field(self, name, field):
+        attrs = field.source_attrs
+        if isinstance(field, (serializers.ListSerializer, LookupRelatedField)):
+            if self.parent is not None or len(attrs) != 1:
+                raise ImproperlyConfigured(f'{name!r}: only one level of nesting')
+            relation = self.model._meta.get_field(attrs[0])
+            if isinstance(field, LookupRelatedField) and relation.many_to_many:
+                self.relations.append(('lookup', attrs[0], relation, name))
+            elif isinstance(field, serializers.ListSerializer) and relation.one_to_many:
+                child = ValuesPlan(field.child, relation.related_model, relation.field)
+                for path in child.parent_columns:
+                    self.column(path)
+                self.relations.append(('nested', attrs[0], relation, child))
+            else:
+                raise ImproperlyConfigured(f'{name!r} is not a supported relation')
+            self.items.append((name, 'related', len(self.relations) - 1, None))
+            return
+
+        converter = field_converter(field)
+        if self.parent is not None and attrs[0] == self.parent.name and len(attrs) > 1:
+            path = column_path(self.parent.related_model, attrs[1:])
+            self.parent_columns.append(path)
+            self.items.append((name, 'parent', path, converter))
+        else:
+            path = column_path(self.model, attrs)
+            self.items.append((name, 'column', self.column(path), converter))
+
+    def compile(self, parent_columns=None):
+        """
+        Генерирует build(row, parent, related) -> dict: одно выражение
+        на поле, без циклов по полям на каждой строке.
+        """
+        namespace, values = {}, []
+        for index, (name, kind, source, converter) in enumerate(self.items):
+            if kind == 'related':
+                relation = self.relations[source]
+                if relation[0] == 'nested':
+                    namespace[f'b{index}'] = relation[3].compile(self.columns)
+                    value = (f'[b{index}(item, row, None) '
+                             f'for item in related[{source}].get(row[0], ())]')
+                else:
+                    value = f'related[{source}](row[0])'
+                values.append(f'{name!r}: {value}')
+                continue
+            if kind == 'parent':
+                value = f'parent[{parent_columns.index(source)}]'
+            else:
+                value = f'row[{source}]'
+            if converter is not None:
+                namespace[f'c{index}'] = converter
+                value = f'None if {value} is None else c{index}({value})'
+            values.append(f'{name!r}: {value}')
+        code = (
+            'def build(row, parent, related):\n'
+            f'    return {{{", ".join(values)}}}\n'
+        )
+        exec(code, namespace)
+        return namespace['build']
+
+    @property
+    def build(self):
+        if not hasattr(self, '_build'):
+            self._build = self.compile()
+        return self._build
+
+    def rows(self, queryset, extra_columns=()):
+        """
+        Выборка кортежей. Колонки сортировки добавляются в конец:
+        по ним пагинация строит курсор (строки — namedtuple).
+        """
+        columns = [*self.columns]
+        columns += [name for name in extra_columns if name not in columns]
+        return queryset.prefetch_related(None).values_list(*columns, named=True)
+
+    def related_querysets(self, queryset, ids):
+        """
+        Запросы связанных строк для страницы: те же, что выполнил бы
+        prefetch_related исходной выборки.
+        """
+        prefetches = {
+            getattr(lookup, 'prefetch_to', lookup): lookup
+            for lookup in queryset._prefetch_related_lookups
+        }
+        for kind, source, relation, extra in self.relations:
+            lookup = prefetches.get(source)
+            related = relation.related_model._default_manager.all()
+            if isinstance(lookup, Prefetch) and lookup.queryset is not None:
+                related = lookup.queryset
+            if kind == 'nested':
+                yield related.filter(**{f'{relation.field.name}__in': ids}).values_list(
+                    *extra.columns
+                )
+            else:
+                name = relation.related_query_name()
+                yield related.filter(**{f'{name}__in': ids}).values_list(name, 'pk')
+
+    def group(self, serializer, related_rows):
+        related = []
+        for (kind, _, _, extra), rows in zip(self.relations, related_rows):
+            grouped = defaultdict(list)
+            if kind == 'nested':
+                # [0] — id строки, [1] — ключ родителя
+                for row in rows:
+                    grouped[row[1]].append(row)
+                related.append(grouped)
+            else:
+                for parent_id, pk in rows:
+                    grouped[parent_id].append(pk)
+                related.append(lookup_getter(serializer.fields[extra], grouped))
+        return related
+
+    def serialize(self, serializer, queryset, rows):
+        ids = [row[0] for row in rows]
+        related_rows = [
+            list(related) if ids else []
+            for related in self.related_querysets(queryset, ids)
+        ]
+        return self.build_rows(serializer, rows, related_rows)
+
+    async def aserialize(self, serializer, queryset, rows):
+        ids = [row[0] for row in rows]
+        related_rows = [
+            [row async for row in related] if ids else []
+            for related in self.related_querysets(queryset, ids)
+        ]
+        return self.build_rows(serializer, rows, related_rows)
+
+    def build_rows(self, serializer, rows, related_rows):
+        with timed_serialization():
+            related = self.group(serializer, related_rows)
+            build = self.build
+            return [build(row, None, related) for row in rows]
+
+
+def lookup_getter(field, ids):
+    # Поле берётся из сериализатора запроса: в его context снимок справочника
+    return lambda pk: field.represent_ids(ids.get(pk, ()))
+
+
+def get_plan(serializer, model):
+    key = (model, type(serializer), tuple(serializer.fields))
+    plan = _plans.get(key)
+    if plan is None:
+        plan = _plans[key] = ValuesPlan(serializer, model)
+    return plan
+
+
+class ValuesReadMixin:
+    """
+    Режим "values" для списков (VALUES_READ_VIEWS): страница читается
+    через values_list, ответ собирается по ValuesPlan сериализатора —
+    без объектов моделей и полей DRF на каждой строке. Ответ совпадает
+    с ответом сериализатора побайтно (см. контрактный тест в
+    growhub.tests).
+
+    Списочные действия вызывают list_response(queryset).
+    """
+    values_actions = ('list', 'my')
+
+    def values_enabled(self):
+        return (getattr(settings, 'VALUES_READ_VIEWS', False)
+                and self.action in self.values_actions)
+
+    def values_columns(self, queryset):
+        # Всё, по чему пагинация может сортировать и строить курсор
+        ordering = [
+            *(getattr(self, 'ordering_fields', None) or ()),
+            *(getattr(self, 'ordering', None) or ()),
+        ]
+        return [name.lstrip('-') for name in ordering] + list(
+            queryset.query.annotations
+        )
+
+    def list(self, request, *args, **kwargs):
+        return self.list_response(self.filter_queryset(self.get_queryset()))
+
+    def list_response(self, queryset):
+        if not self.values_enabled():
+            page = self.paginate_queryset(queryset)
+            if page is not None:
+                serializer = self.get_serializer(page, many=True)
+                return self.get_paginated_response(serializer.data)
+            return Response(self.get_serializer(queryset, many=True).data)
+
+        serializer = self.get_serializer()
+        plan = get_plan(serializer, queryset.model)
+        rows = plan.rows(queryset, self.values_columns(queryset))
+        page = self.paginate_queryset(rows)
+        data = plan.serialize(
+            serializer, queryset, list(rows) if page is None else page
+        )
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
+
+    async def alist(self, request, *args, **kwargs):
+        if not self.values_enabled():
+            return await super().alist(request, *args, **kwargs)
+
+        queryset = await self.afilter_queryset()
+        serializer = self.get_serializer()
+        plan = get_plan(serializer, queryset.model)
+        rows = plan.rows(queryset, self.values_columns(queryset))
+        page = None
+        if self.paginator is not None:
+            page = await self.paginator.apaginate_queryset(rows, request, view=self)
+        if page is None:
+            page = [row async for row in rows]
+            return Response(await plan.aserialize(serializer, queryset, page))
+        data = await plan.aserialize(serializer, queryset, page)
+        return self.get_paginated_response(data)
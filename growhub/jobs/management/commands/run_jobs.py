@@ -0,0 +1,39 @@
+import json
+import signal
+
+from django.core.management.base import BaseCommand
+
+from jobs.queue import task_stats
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = (
+        'Воркер фоновых задач: забирает задачи из таблицы jobs_job '
+        '(в PostgreSQL — SELECT ... FOR UPDATE SKIP LOCKED) и выполняет их '
+        'в --concurrency потоков. SIGINT/SIGTERM — остановка после текущих задач.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=1)
+        parser.add_argument('--poll-interval', type=float, default=None,
+                            help='Секунды между опросами пустой очереди')
+        parser.add_argument('--burst', action='store_true',
+                            help='Выйти, когда готовых задач не останется')
+        parser.add_argument('--stats', action='store_true',
+                            help='Напечатать метрики по задачам и выйти')
+
+    def handle(self, *args, **options):
+        if options['stats']:
+            self.stdout.write(json.dumps(task_stats(), indent=2, default=str))
+            return
+
+        worker = Worker(
+            concurrency=max(1, options['concurrency']),
+            poll_interval=options['poll_interval'],
+        )
+        if not options['burst']:
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                signal.signal(signum, lambda *args: worker.stop())
+        processed = worker.run(burst=options['burst'])
+        self.stdout.write(f'processed {processed}')
@@ -0,0 +1,215 @@
+import logging
+import random
+import time
+import traceback
+from collections import namedtuple
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Avg, Count, F, Max, Min, Subquery
+from django.utils import timezone
+
+from .models import Job
+
+logger = logging.getLogger('jobs')
+
+Task = namedtuple('Task', ['name', 'func', 'max_attempts'])
+
+# Обработчики по имени: регистрируются декоратором task в <app>/tasks.py
+tasks = {}
+
+
+def task(name, max_attempts=None):
+    """
+    Регистрирует обработчик задачи. Обработчик получает payload как
+    kwargs и выполняется в транзакции вместе с отметкой о выполнении.
+    Задача может выполниться повторно (воркер упал после работы),
+    поэтому обработчик должен быть идемпотентным и читать данные
+    на момент выполнения, а не из payload.
+    """
+    def decorator(func):
+        tasks[name] = Task(name, func, max_attempts or settings.JOBS_MAX_ATTEMPTS)
+        return func
+    return decorator
+
+
+def enqueue(name, payload=None, dedup_key=None, delay=0):
+    """
+    Ставит задачу в очередь в текущей транзакции: воркер увидит её
+    только после коммита, а при откате её не будет вовсе.
+    Если задача с тем же dedup_key ещё ждёт в очереди, новая не
+    ставится — ждущая прочитает свежие данные сама.
+    """
+    if name not in tasks:
+        raise LookupError(f'Unknown task {name!r}')
+    job = Job(
+        task=name,
+        payload=payload or {},
+        dedup_key=dedup_key,
+        max_attempts=tasks[name].max_attempts,
+        run_at=timezone.now() + timedelta(seconds=delay),
+    )
+    # Конфликт с частичным уникальным индексом по dedup_key — пропуск
+    Job.objects.bulk_create([job], ignore_conflicts=dedup_key is not None)
+    return job
+
+
+def retry_delay(attempt):
+    """
+    Экспоненциальная задержка перед повтором со случайным разбросом,
+    чтобы упавшие вместе задачи не повторялись тоже вместе.
+    """
+    delay = min(settings.JOBS_RETRY_MAX_DELAY,
+                settings.JOBS_RETRY_DELAY * 2 ** (attempt - 1))
+    return timedelta(seconds=delay * random.uniform(0.5, 1))
+
+
+def claim(worker_id, limit=1):
+    """
+    Забирает до limit готовых задач. В PostgreSQL строки выбираются
+    с FOR UPDATE SKIP LOCKED: воркеры не ждут друг друга и не берут
+    одну задачу дважды. Без SKIP LOCKED (SQLite) выбор и захват —
+    один UPDATE: блокировка на запись берётся сразу, а не повышается
+    из блокировки на чтение.
+    """
+    now = timezone.now()
+    queryset = Job.objects.filter(
+        status=Job.QUEUED, run_at__lte=now
+    ).order_by('run_at', 'id')
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            ids = list(queryset.select_for_update(skip_locked=True).values_list(
+                'id', flat=True
+            )[:limit])
+            if not ids:
+                return []
+        else:
+            ids = Subquery(queryset.values('id')[:limit])
+        Job.objects.filter(pk__in=ids, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker_id, locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        return list(Job.objects.filter(
+            status=Job.RUNNING, locked_by=worker_id, locked_at=now
+        ).order_by('run_at', 'id'))
+
+
+def requeue(job, run_at, error, duration_ms=None):
+    try:
+        with transaction.atomic():
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.QUEUED, run_at=run_at, last_error=error,
+                duration_ms=duration_ms, locked_by=None, locked_at=None,
+            )
+    except IntegrityError:
+        # В очереди уже ждёт такая же задача (dedup_key): она и выполнит работу
+        Job.objects.filter(pk=job.pk).delete()
+
+
+def fail(job, error, duration_ms=None):
+    """
+    Попытка не удалась: повтор с задержкой или окончательный отказ.
+    """
+    if job.attempts < job.max_attempts:
+        requeue(job, timezone.now() + retry_delay(job.attempts), error, duration_ms)
+        return Job.QUEUED
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.FAILED, finished_at=timezone.now(), last_error=error,
+        duration_ms=duration_ms, locked_by=None,
+    )
+    return Job.FAILED
+
+
+def run_job(job):
+    """
+    Выполняет взятую задачу; возвращает её новый статус.
+    """
+    start = time.perf_counter()
+    try:
+        handler = tasks.get(job.task)
+        if handler is None:
+            raise LookupError(f'Unknown task {job.task!r}')
+        with transaction.atomic():
+            handler.func(**job.payload)
+            Job.objects.filter(pk=job.pk).update(
+                status=Job.DONE, finished_at=timezone.now(), last_error='',
+                duration_ms=(time.perf_counter() - start) * 1000, locked_by=None,
+            )
+    except Exception:
+        duration_ms = (time.perf_counter() - start) * 1000
+        logger.exception('Job %s (%s) failed, attempt %d of %d',
+                         job.pk, job.task, job.attempts, job.max_attempts)
+        return fail(job, traceback.format_exc(), duration_ms)
+    return Job.DONE
+
+
+def requeue_stale():
+    """
+    Задачи воркеров, которые пропали, не закончив их: попытка
+    считается неудачной. Возвращает число таких задач.
+    """
+    deadline = timezone.now() - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+    stale = list(Job.objects.filter(status=Job.RUNNING, locked_at__lt=deadline))
+    for job in stale:
+        logger.warning('Job %s (%s) lock held by %s expired',
+                       job.pk, job.task, job.locked_by)
+        fail(job, f'Lock held by {job.locked_by} expired')
+    return len(stale)
+
+
+def prune():
+    deadline = timezone.now() - timedelta(seconds=settings.JOBS_KEEP_DONE)
+    deleted, _ = Job.objects.filter(status=Job.DONE, finished_at__lt=deadline).delete()
+    return deleted
+
+
+def run_pending(worker_id='inline', limit=None):
+    """
+    Выполняет готовые задачи в текущем потоке, пока они есть
+    (не больше limit). Возвращает число выполненных попыток.
+    """
+    count = 0
+    while limit is None or count < limit:
+        jobs = claim(worker_id)
+        if not jobs:
+            break
+        for job in jobs:
+            run_job(job)
+            count += 1
+    return count
+
+
+def task_stats():
+    """
+    Метрики по задачам из самой очереди (общие для всех воркеров):
+    число строк по статусам, попытки, время выполнения и отставание
+    самой старой готовой задачи.
+    """
+    now = timezone.now()
+    stats = {}
+    rows = Job.objects.values('task', 'status').annotate(
+        count=Count('id'), avg_ms=Avg('duration_ms'), max_ms=Max('duration_ms'),
+    ).order_by()
+    for row in rows:
+        entry = stats.setdefault(row['task'], {
+            **{status: 0 for status, _ in Job.STATUS_CHOICES},
+            'retries': 0, 'avg_ms': None, 'max_ms': None, 'lag_seconds': 0.0,
+        })
+        entry[row['status']] = row['count']
+        if row['status'] == Job.DONE:
+            entry['avg_ms'], entry['max_ms'] = row['avg_ms'], row['max_ms']
+
+    # Задачи, которым понадобилась не одна попытка
+    retried = Job.objects.filter(attempts__gt=1).values('task').annotate(
+        count=Count('id')
+    ).order_by()
+    for row in retried:
+        stats[row['task']]['retries'] = row['count']
+
+    waiting = Job.objects.filter(status=Job.QUEUED, run_at__lte=now).values(
+        'task'
+    ).annotate(oldest=Min('run_at')).order_by()
+    for row in waiting:
+        stats[row['task']]['lag_seconds'] = (now - row['oldest']).total_seconds()
+    return dict(sorted(stats.items()))
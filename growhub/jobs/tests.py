@@ -0,0 +1,131 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from projects.models import Project, Stack
+from users.models import User
+from .models import Job
+from .queue import claim, enqueue, requeue_stale, run_pending, task, task_stats
+
+calls = []
+
+
+@task('jobs.tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task('jobs.tests.flaky', max_attempts=2)
+def flaky(value):
+    calls.append(value)
+    raise RuntimeError('boom')
+
+
+class QueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_jobs_run_in_order_and_are_marked_done(self):
+        enqueue('jobs.tests.record', {'value': 1})
+        enqueue('jobs.tests.record', {'value': 2})
+        later = enqueue('jobs.tests.record', {'value': 3}, delay=60)
+
+        self.assertEqual(run_pending(), 2)
+        self.assertEqual(calls, [1, 2])
+        self.assertEqual(
+            Job.objects.filter(status=Job.DONE, duration_ms__isnull=False).count(), 2
+        )
+        self.assertEqual(Job.objects.get(pk=later.pk).status, Job.QUEUED)
+
+    def test_unknown_task_is_rejected(self):
+        with self.assertRaises(LookupError):
+            enqueue('jobs.tests.missing')
+
+    def test_dedup_key_only_while_queued(self):
+        enqueue('jobs.tests.record', {'value': 1}, dedup_key='same')
+        enqueue('jobs.tests.record', {'value': 2}, dedup_key='same')
+        self.assertEqual(Job.objects.count(), 1)
+
+        # Взятая задача уже могла прочитать старые данные: новая ставится
+        [job] = claim('worker')
+        enqueue('jobs.tests.record', {'value': 3}, dedup_key='same')
+        [queued] = claim('other')
+        self.assertEqual((job.payload, queued.payload), ({'value': 1}, {'value': 3}))
+
+    def test_failed_job_is_retried_with_backoff(self):
+        job = enqueue('jobs.tests.flaky', {'value': 1})
+        with self.assertLogs('jobs', 'ERROR'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.QUEUED, 1))
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('boom', job.last_error)
+
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('jobs', 'ERROR'):
+            run_pending()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+        self.assertEqual(calls, [1, 1])
+
+        stats = task_stats()['jobs.tests.flaky']
+        self.assertEqual((stats['failed'], stats['retries']), (1, 1))
+
+    @override_settings(JOBS_LOCK_TIMEOUT=60)
+    def test_abandoned_job_is_requeued(self):
+        job = enqueue('jobs.tests.record', {'value': 1})
+        claim('lost-worker')
+        Job.objects.filter(pk=job.pk).update(
+            locked_at=timezone.now() - timedelta(minutes=5)
+        )
+        self.assertEqual(requeue_stale(), 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.locked_by), (Job.QUEUED, None))
+
+    def test_worker_command_drains_queue(self):
+        for value in range(3):
+            enqueue('jobs.tests.record', {'value': value})
+        out = StringIO()
+        call_command('run_jobs', '--burst', stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'processed 3')
+        self.assertEqual(calls, [0, 1, 2])
+
+    def test_stats_endpoint_is_admin_only(self):
+        enqueue('jobs.tests.record', {'value': 1})
+        client = APIClient()
+        client.force_authenticate(User.objects.create_user(
+            email='jobs@example.com', username='jobs'
+        ))
+        self.assertEqual(client.get('/api/jobs/').status_code, 403)
+
+        client.force_authenticate(User.objects.create_user(
+            email='jobs-admin@example.com', username='jobs-admin', is_staff=True
+        ))
+        response = client.get('/api/jobs/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['tasks']['jobs.tests.record']['queued'], 1)
+
+
+class DeferredDocumentsTest(TestCase):
+    def test_stack_rename_defers_documents(self):
+        author = User.objects.create_user(email='deferred@example.com', username='d')
+        stack = Stack.objects.create(name='Django')
+        project = Project.objects.create(name='Shop', author=author)
+        project.stacks.add(stack)
+
+        for name in ['FastAPI', 'Flask']:
+            stack.name = name
+            stack.save()
+        # Два переименования подряд — одна задача
+        jobs = Job.objects.filter(task='projects.refresh_documents')
+        self.assertEqual(jobs.count(), 1)
+        project.refresh_from_db()
+        self.assertIn('Django', project.search_document)
+
+        run_pending()
+        project.refresh_from_db()
+        self.assertIn('Flask', project.search_document)
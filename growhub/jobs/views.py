@@ -0,0 +1,15 @@
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from .queue import task_stats
+
+
+class JobStatsView(APIView):
+    """
+    Метрики фоновых задач по имени задачи (только админ).
+    """
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response({'tasks': task_stats()})
@@ -0,0 +1,97 @@
+import logging
+import os
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections, connection, connections
+
+from .queue import claim, prune, requeue_stale, run_job
+
+logger = logging.getLogger('jobs')
+
+# Как часто (секунды) воркер ищет брошенные задачи и чистит выполненные
+MAINTENANCE_INTERVAL = 60
+
+
+class Worker:
+    """
+    Воркер очереди: concurrency потоков, каждый со своим соединением
+    с базой, забирает задачи по одной (jobs.queue.claim). Без брокера:
+    пустая очередь опрашивается раз в poll_interval секунд.
+    """
+
+    def __init__(self, concurrency=1, poll_interval=None, name=None):
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval or settings.JOBS_POLL_INTERVAL
+        self.name = name or f'{socket.gethostname()}:{os.getpid()}'
+        self.stopping = threading.Event()
+        self.lock = threading.Lock()
+        self.next_maintenance = 0.0
+        self.processed = 0
+
+    def stop(self):
+        self.stopping.set()
+
+    def run(self, burst=False):
+        """
+        burst — выйти, когда готовых задач не останется.
+        """
+        if self.concurrency == 1:
+            self.loop(f'{self.name}:0', burst)
+            return self.processed
+        threads = [
+            threading.Thread(
+                target=self.loop, args=(f'{self.name}:{index}', burst),
+                name=f'jobs-worker-{index}',
+            )
+            for index in range(self.concurrency)
+        ]
+        for thread in threads:
+            thread.start()
+        # join с таймаутом: главный поток должен получать сигналы
+        while any(thread.is_alive() for thread in threads):
+            for thread in threads:
+                thread.join(0.5)
+        return self.processed
+
+    def maintain(self):
+        with self.lock:
+            if time.monotonic() < self.next_maintenance:
+                return
+            self.next_maintenance = time.monotonic() + MAINTENANCE_INTERVAL
+        requeue_stale()
+        prune()
+
+    def step(self, worker_id):
+        """
+        Одна задача; False — готовых задач нет.
+        """
+        self.maintain()
+        jobs = claim(worker_id)
+        for job in jobs:
+            status = run_job(job)
+            logger.info('Job %s (%s): %s', job.pk, job.task, status)
+            with self.lock:
+                self.processed += 1
+        return bool(jobs)
+
+    def loop(self, worker_id, burst):
+        try:
+            while not self.stopping.is_set():
+                if not connection.in_atomic_block:
+                    # CONN_MAX_AGE и разорванные соединения, как между запросами
+                    close_old_connections()
+                try:
+                    if self.step(worker_id):
+                        continue
+                except DatabaseError:
+                    # База недоступна или занята: повтор после паузы
+                    logger.exception('Worker %s: database error', worker_id)
+                if burst:
+                    break
+                self.stopping.wait(self.poll_interval)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connections.close_all()
@@ -0,0 +1,110 @@
+import uuid
+from contextlib import contextmanager
+
+from django.http import JsonResponse
+
+from growhub.events import event_stream_response, publish_on_commit
+from users.models import GradeEnum, RoleEnum
+from . import facets
+from .models import ProjectPosition
+
+# Параметр запроса -> (ключ события, проверка значения)
+FILTERS = {
+    'role': ('roles', RoleEnum.values.__contains__),
+    'grade': ('grades', GradeEnum.values.__contains__),
+    'stack': ('stacks', None),
+    'project': ('projects', None),
+}
+
+
+def position_event(position, action, previous=None, stack_ids=None):
+    """
+    Событие позиции: только id и поля для фильтров подписок. При
+    правке в roles/grades есть и старые значения — позиция могла
+    уйти из фильтра подписчика.
+    """
+    roles, grades = {position.role_id}, {position.grade_id}
+    if previous is not None:
+        roles.add(previous['role_id'])
+        grades.add(previous['grade_id'])
+    if stack_ids is None:
+        stack_ids = facets.stack_ids_of(position.project_id)
+    return {
+        'type': f'position.{action}',
+        'position_id': str(position.pk),
+        'projects': [str(position.project_id)],
+        'roles': sorted(roles),
+        'grades': sorted(grades),
+        'stacks': sorted(map(str, stack_ids)),
+    }
+
+
+def position_values(project_id):
+    return set(
+        ProjectPosition.objects.filter(project_id=project_id)
+        .values_list('role_id', 'grade_id')
+    )
+
+
+def project_event(project_id, action, previous=()):
+    """
+    Событие проекта: роли и грейды всех его позиций и стеки. previous —
+    пары (роль, грейд) до правки: удалённая позиция могла быть в
+    фильтре подписчика.
+    """
+    positions = position_values(project_id) | set(previous)
+    return {
+        'type': f'project.{action}',
+        'projects': [str(project_id)],
+        'roles': sorted({role for role, _ in positions}),
+        'grades': sorted({grade for _, grade in positions}),
+        'stacks': sorted(map(str, facets.stack_ids_of(project_id))),
+    }
+
+
+@contextmanager
+def project_sync_event(project_id):
+    """
+    Массовая правка позиций (sync_related): вместо события на каждую
+    позицию — одно событие проекта после коммита.
+    """
+    previous = position_values(project_id)
+    yield
+    publish_on_commit(
+        ('project', project_id),
+        lambda: project_event(project_id, 'updated', previous), replace=True,
+    )
+
+
+def parse_filters(params):
+    """
+    ?role=backend,qa&grade=middle&stack=<id>&project=<id> ->
+    ({ключ события: множество значений}, ошибки).
+    """
+    filters, errors = {}, {}
+    for name, (key, is_valid) in FILTERS.items():
+        values = {value for value in params.get(name, '').split(',') if value}
+        if not values:
+            continue
+        try:
+            if is_valid is None:
+                values = {str(uuid.UUID(value)) for value in values}
+            elif not all(map(is_valid, values)):
+                raise ValueError
+        except ValueError:
+            errors[name] = f'Unknown value in {sorted(values)}'
+            continue
+        filters[key] = values
+    return filters, errors
+
+
+async def catalog_events(request):
+    """
+    SSE: создание, правка и удаление проектов и позиций по фильтрам
+    подписки (см. growhub.events). Данные каталога публичные, как
+    и список проектов, поэтому вход не требуется.
+    """
+    filters, errors = parse_filters(request.GET)
+    if errors:
+        return JsonResponse(errors, status=400)
+    return event_stream_response(request, filters)
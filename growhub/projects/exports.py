@@ -0,0 +1,23 @@
+from rest_framework import serializers
+
+from growhub.export import Exporter
+from .models import Project
+from .serializers import ProjectReadSerializer
+
+
+class ProjectExportSerializer(ProjectReadSerializer):
+    updated_at = serializers.DateTimeField(read_only=True)
+
+    class Meta(ProjectReadSerializer.Meta):
+        fields = ProjectReadSerializer.Meta.fields + ['updated_at']
+        read_only_fields = fields
+
+
+class ProjectExporter(Exporter):
+    """
+    Проекты с позициями и стеками.
+    """
+    serializer_class = ProjectExportSerializer
+
+    def get_queryset(self):
+        return Project.objects.for_read()
@@ -0,0 +1,214 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+
+from users.models import GradeEnum, RoleEnum
+from .lookups import stack_lookup
+from .models import PositionFacet, Project, ProjectPosition
+
+# Проекты, чьи позиции сейчас правятся внутри track_project
+_tracked_projects = ContextVar('tracked_projects', default=frozenset())
+
+FACET_FIELDS = {
+    PositionFacet.ROLE: 'role_id',
+    PositionFacet.GRADE: 'grade_id',
+}
+
+
+def position_keys(role_id, grade_id, stack_ids):
+    keys = [(PositionFacet.ROLE, role_id), (PositionFacet.GRADE, grade_id)]
+    keys += [(PositionFacet.STACK, str(stack_id)) for stack_id in stack_ids]
+    return keys
+
+
+def stack_ids_of(project_id):
+    return list(
+        Project.stacks.through.objects.filter(project_id=project_id)
+        .values_list('stack_id', flat=True)
+    )
+
+
+def position_delta(position, stack_ids, sign=1):
+    """
+    Вклад одной позиции в счётчики: ключ -> (позиции, места).
+    """
+    if position.count_needed <= 0:
+        return {}
+    return {
+        key: (sign, sign * position.count_needed)
+        for key in position_keys(position.role_id, position.grade_id, stack_ids)
+    }
+
+
+def project_contribution(project_id):
+    """
+    Полный вклад открытых позиций проекта: два запроса.
+    """
+    stack_ids = stack_ids_of(project_id)
+    totals = {}
+    positions = ProjectPosition.objects.filter(
+        project_id=project_id, count_needed__gt=0
+    ).values_list('role_id', 'grade_id', 'count_needed')
+    for role_id, grade_id, count_needed in positions:
+        for key in position_keys(role_id, grade_id, stack_ids):
+            count, seats = totals.get(key, (0, 0))
+            totals[key] = (count + 1, seats + count_needed)
+    return totals
+
+
+def open_positions_total(project_ids):
+    totals = ProjectPosition.objects.filter(
+        project_id__in=project_ids, count_needed__gt=0
+    ).aggregate(count=Count('id'), seats=Sum('count_needed'))
+    return totals['count'], totals['seats'] or 0
+
+
+def merge(*deltas, signs=None):
+    result = {}
+    for delta, sign in zip(deltas, signs or [1] * len(deltas)):
+        for key, (count, seats) in delta.items():
+            total_count, total_seats = result.get(key, (0, 0))
+            result[key] = (total_count + sign * count, total_seats + sign * seats)
+    return result
+
+
+def apply_delta(delta):
+    """
+    Прибавляет delta к счётчикам атомарными UPDATE ... SET x = x + d.
+    Недостающие строки создаются заранее (ignore_conflicts), поэтому
+    параллельные транзакции не теряют инкременты.
+    """
+    delta = {key: value for key, value in delta.items() if value != (0, 0)}
+    if not delta:
+        return
+    PositionFacet.objects.bulk_create(
+        [PositionFacet(facet=facet, value=value) for facet, value in delta],
+        ignore_conflicts=True,
+    )
+    for (facet, value), (count, seats) in delta.items():
+        PositionFacet.objects.filter(facet=facet, value=value).update(
+            positions=F('positions') + count, seats=F('seats') + seats
+        )
+
+
+def apply_stack_delta(project_ids, stack_ids, sign):
+    """
+    Стеки добавлены к проектам или убраны из них: открытые позиции
+    этих проектов прибавляются к счётчикам стеков (или вычитаются).
+    """
+    if not project_ids or not stack_ids:
+        return
+    count, seats = open_positions_total(project_ids)
+    apply_delta({
+        (PositionFacet.STACK, str(stack_id)): (sign * count, sign * seats)
+        for stack_id in stack_ids
+    })
+
+
+@contextmanager
+def track_project(project_id):
+    """
+    Для массовых правок позиций (sync_related): bulk-операции идут
+    без сигналов, поэтому счётчики сдвигаются на разницу вклада
+    проекта до и после блока, а сигналы позиций внутри него молчат.
+    """
+    token = _tracked_projects.set(_tracked_projects.get() | {project_id})
+    try:
+        with transaction.atomic():
+            before = project_contribution(project_id)
+            yield
+            apply_delta(merge(project_contribution(project_id), before, signs=[1, -1]))
+    finally:
+        _tracked_projects.reset(token)
+
+
+def is_tracked(project_id):
+    return project_id in _tracked_projects.get()
+
+
+def count_facets():
+    """
+    Счётчики с нуля агрегирующими запросами: {(facet, value): (позиции, места)}.
+    """
+    open_positions = ProjectPosition.objects.filter(count_needed__gt=0)
+    totals = {}
+    for facet, field in FACET_FIELDS.items():
+        rows = open_positions.values(field).annotate(
+            count=Count('id'), seats=Sum('count_needed')
+        ).values_list(field, 'count', 'seats')
+        for value, count, seats in rows:
+            totals[(facet, value)] = (count, seats)
+
+    rows = Project.stacks.through.objects.filter(
+        project__positions__count_needed__gt=0
+    ).values('stack_id').annotate(
+        count=Count('project__positions'),
+        seats=Sum('project__positions__count_needed'),
+    ).values_list('stack_id', 'count', 'seats')
+    for stack_id, count, seats in rows:
+        totals[(PositionFacet.STACK, str(stack_id))] = (count, seats)
+    return totals
+
+
+def stored_facets():
+    return {
+        (facet, value): (count, seats)
+        for facet, value, count, seats in PositionFacet.objects.values_list(
+            'facet', 'value', 'positions', 'seats'
+        )
+    }
+
+
+def find_drift():
+    """
+    Расхождения хранимых счётчиков с пересчётом: ключ -> (хранится, должно быть).
+    Нулевые и отсутствующие строки считаются равными.
+    """
+    expected, stored = count_facets(), stored_facets()
+    drift = {}
+    for key in expected.keys() | stored.keys():
+        actual, wanted = stored.get(key, (0, 0)), expected.get(key, (0, 0))
+        if actual != wanted:
+            drift[key] = (actual, wanted)
+    return drift
+
+
+@transaction.atomic
+def rebuild_facets():
+    PositionFacet.objects.all().delete()
+    PositionFacet.objects.bulk_create([
+        PositionFacet(facet=facet, value=value, positions=count, seats=seats)
+        for (facet, value), (count, seats) in count_facets().items()
+    ])
+
+
+def facet_summary():
+    """
+    Все фасеты одним ответом: один запрос независимо от числа значений.
+    """
+    labels = {
+        PositionFacet.ROLE: dict(RoleEnum.choices),
+        PositionFacet.GRADE: dict(GradeEnum.choices),
+        PositionFacet.STACK: {},
+    }
+    rows = list(
+        PositionFacet.objects.filter(positions__gt=0)
+        .order_by('facet', '-positions', 'value')
+        .values_list('facet', 'value', 'positions', 'seats')
+    )
+    # Названия стеков — из справочника в памяти (projects.lookups)
+    labels[PositionFacet.STACK] = {
+        row['id']: row['name'] for row in stack_lookup.current().values()
+    }
+
+    summary = {facet: [] for facet in labels}
+    for facet, value, count, seats in rows:
+        summary[facet].append({
+            'value': value,
+            'label': labels[facet].get(value, value),
+            'positions': count,
+            'seats': seats,
+        })
+    return summary
@@ -0,0 +1,178 @@
+import uuid
+
+from django.core.exceptions import ValidationError
+
+from growhub.bulk import insert_objects, insert_rows
+from growhub.importer import (
+    Importer, clean_fields, parse_list, reference, upsert_catalog
+)
+from growhub.response_cache import invalidate
+from growhub.search import update_search_vectors
+from users.models import User
+from . import facets
+from .matching import schedule_refresh
+from .models import Project, ProjectPosition, Stack
+from .search import project_document
+
+PROJECT_FIELDS = ['name', 'github', 'description']
+POSITION_FIELDS = ['role_id', 'grade_id', 'count_needed']
+
+
+def clean_stack_names(value):
+    name_field = Stack._meta.get_field('name')
+    names = [
+        name_field.clean(reference(item, 'name'), None) for item in parse_list(value)
+    ]
+    return list(dict.fromkeys(names))
+
+
+def clean_author(row):
+    if row.get('author_email'):
+        return {'author_email': User.objects.normalize_email(row['author_email'])}
+    if not row.get('author_id'):
+        raise ValidationError(
+            {'author_email': ['Either author_email or author_id is required']}
+        )
+    author_field = Project._meta.get_field('author').target_field
+    try:
+        return {'author_id': author_field.clean(row['author_id'], None)}
+    except ValidationError as exc:
+        raise ValidationError({'author_id': exc.messages})
+
+
+def clean_positions(value):
+    positions, errors = [], []
+    for index, item in enumerate(parse_list(value)):
+        if not isinstance(item, dict):
+            errors.append(f'{index}: Expected an object')
+            continue
+        try:
+            positions.append(clean_fields(ProjectPosition, item, POSITION_FIELDS))
+        except ValidationError as exc:
+            errors += [
+                f'{index}: {field}: {message}'
+                for field, messages in exc.message_dict.items()
+                for message in messages
+            ]
+    if errors:
+        raise ValidationError(errors)
+    return positions
+
+
+class StackImporter(Importer):
+    """
+    Справочник стеков: upsert по name ({"name": ...}).
+    """
+
+    def clean_row(self, row):
+        return clean_fields(Stack, row, ['name'])
+
+    def write_batch(self, rows):
+        result = upsert_catalog(Stack, 'name', {row['name']: None for row in rows})
+        if result.created:
+            invalidate('stacks')
+        return result.created, 0
+
+
+class ProjectImporter(Importer):
+    """
+    Новые проекты с позициями и стеками. Автор — author_email или
+    author_id, stacks — названия (недостающие стеки создаются),
+    positions — [{"role_id", "grade_id", "count_needed"}].
+    У проекта нет естественного ключа: повторный импорт тех же
+    строк создаст дубликаты, продолжать нужно с checkpoint.
+    """
+    # Крупные пачки: меньше коммитов и запросов к справочникам
+    batch_size = 5000
+
+    def clean_row(self, row):
+        errors = {}
+        try:
+            values = clean_fields(Project, row, PROJECT_FIELDS)
+        except ValidationError as exc:
+            errors, values = exc.message_dict, {}
+
+        try:
+            values.update(clean_author(row))
+        except ValidationError as exc:
+            errors.update(exc.message_dict)
+
+        nested = [('stacks', clean_stack_names), ('positions', clean_positions)]
+        for name, clean in nested:
+            try:
+                values[name] = clean(row.get(name))
+            except ValidationError as exc:
+                errors[name] = exc.messages
+
+        if errors:
+            raise ValidationError(errors)
+        return values
+
+    def check_batch(self, rows):
+        """
+        Авторы по email и id — двумя запросами на пачку; username
+        автора нужен для поискового документа.
+        """
+        emails = {values.get('author_email') for _, values in rows} - {None}
+        by_email = {
+            email: (pk, username) for email, pk, username in User.objects.filter(
+                email__in=emails
+            ).values_list('email', 'id', 'username')
+        }
+        ids = {values.get('author_id') for _, values in rows} - {None}
+        usernames = dict(User.objects.filter(pk__in=ids).values_list('id', 'username'))
+
+        errors = {}
+        for line, values in rows:
+            if 'author_email' in values:
+                author = by_email.get(values.pop('author_email'))
+                if author is None:
+                    errors[line] = ValidationError({'author_email': ['Unknown user']})
+                    continue
+                values['author_id'], values['author_username'] = author
+            elif values['author_id'] in usernames:
+                values['author_username'] = usernames[values['author_id']]
+            else:
+                errors[line] = ValidationError({'author_id': ['Unknown user']})
+        return errors
+
+    def write_batch(self, rows):
+        catalog = upsert_catalog(
+            Stack, 'name', {name: None for row in rows for name in row['stacks']}
+        )
+        projects, links, positions, delta = [], [], [], {}
+        for row in rows:
+            stack_names = row.pop('stacks')
+            position_rows = row.pop('positions')
+            username = row.pop('author_username')
+            project = Project(**row, search_document=project_document(
+                row['name'], row['description'], username, stack_names
+            ))
+            projects.append(project)
+
+            stack_ids = [catalog.ids[name] for name in stack_names]
+            links += [(project.pk, stack_id) for stack_id in stack_ids]
+            # Позиции — кортежами, без экземпляров модели
+            for values in position_rows:
+                role_id, grade_id = values['role_id'], values['grade_id']
+                count_needed = values['count_needed']
+                positions.append(
+                    (uuid.uuid4(), project.pk, role_id, grade_id, count_needed)
+                )
+                if count_needed <= 0:
+                    continue
+                for key in facets.position_keys(role_id, grade_id, stack_ids):
+                    count, seats = delta.get(key, (0, 0))
+                    delta[key] = (count + 1, seats + count_needed)
+
+        insert_objects(projects)
+        insert_rows(Project.stacks.through, ['project', 'stack'], links)
+        insert_rows(ProjectPosition, ['id', 'project'] + POSITION_FIELDS, positions)
+        # Вставка идёт без сигналов: счётчики фасетов сдвигаются здесь
+        facets.apply_delta(delta)
+
+        project_ids = [project.pk for project in projects]
+        update_search_vectors(Project.objects.filter(pk__in=project_ids))
+        schedule_refresh(projects=project_ids)
+        invalidate(*(['projects', 'stacks'] if catalog.created else ['projects']))
+        return len(projects), 0
@@ -0,0 +1,5 @@
+from growhub.lookups import LookupTable
+from .models import Stack
+
+# Поколение 'stacks' — то же, что у кэша ответов стеков (см. signals)
+stack_lookup = LookupTable('stacks', Stack.objects.all(), ['id', 'name'])
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from projects.facets import find_drift, rebuild_facets
+
+
+class Command(BaseCommand):
+    help = 'Пересчёт счётчиков фасетов открытых позиций с проверкой расхождений'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true',
+            help='Только сообщить о расхождениях (код выхода 1, если они есть)'
+        )
+
+    def handle(self, *args, **options):
+        drift = find_drift()
+        for (facet, value), (stored, expected) in sorted(drift.items()):
+            self.stdout.write(
+                f'{facet}={value}: stored {stored}, expected {expected}'
+            )
+
+        if options['check']:
+            if drift:
+                raise CommandError(f'Facet counters drifted: {len(drift)} keys')
+            self.stdout.write('Facet counters are consistent')
+            return
+
+        rebuild_facets()
+        self.stdout.write(f'Facet counters rebuilt ({len(drift)} keys fixed)')
@@ -0,0 +1,339 @@
+import heapq
+import threading
+import time
+from collections import defaultdict
+
+from django.core.cache import cache
+from django.db import transaction
+
+from growhub.response_cache import (
+    GENERATION_KEY, GENERATION_TIMEOUT, get_generation
+)
+from users.models import GradeEnum, RoleEnum, User
+from .models import Project, ProjectPosition
+
+GENERATION_NAMESPACE = 'matching'
+CHANGES_KEY = 'matching:changes:{}'
+# Журнал хранится CHANGES_TIMEOUT секунд; процесс, отставший больше чем
+# на MAX_CATCH_UP поколений, перестраивает индекс целиком
+CHANGES_TIMEOUT = 600
+MAX_CATCH_UP = 1000
+
+ROLE_WEIGHT = 0.5
+SKILL_WEIGHT = 0.35
+GRADE_WEIGHT = 0.15
+
+GRADE_ORDER = [
+    GradeEnum.INTERN, GradeEnum.JUNIOR, GradeEnum.MIDDLE,
+    GradeEnum.SENIOR, GradeEnum.LEAD, GradeEnum.ARCHITECT,
+]
+GRADE_RANK = {grade.value: rank for rank, grade in enumerate(GRADE_ORDER)}
+
+
+def normalize_term(value):
+    return ' '.join(value.lower().split())
+
+
+def grade_score(first, second):
+    if first not in GRADE_RANK or second not in GRADE_RANK:
+        return 0.0
+    distance = abs(GRADE_RANK[first] - GRADE_RANK[second])
+    return 1 - distance / (len(GRADE_ORDER) - 1)
+
+
+def match_score(position_role, position_grade, project_mask,
+                user_role, user_grade, user_mask):
+    """
+    Оценка пары позиция — кандидат в диапазоне [0, 1].
+
+    Навыки и стеки хранятся битовыми масками над общим словарём
+    терминов, поэтому пересечение множеств — одна операция AND.
+    """
+    score = 0.0
+    if position_role != RoleEnum.NOT_SELECTED and position_role == user_role:
+        score += ROLE_WEIGHT
+    if project_mask:
+        overlap = (project_mask & user_mask).bit_count()
+        score += SKILL_WEIGHT * overlap / project_mask.bit_count()
+    score += GRADE_WEIGHT * grade_score(position_grade, user_grade)
+    return score
+
+
+class MatchingIndex:
+    """
+    In-process инвертированный индекс для подбора кандидатов и позиций.
+
+    Хранит роль, грейд и маску навыков каждого активного пользователя,
+    позиции с маской стеков проекта и обратные списки
+    роль/термин -> id. Кандидаты собираются объединением обратных
+    списков и ранжируются без обхода всех таблиц.
+
+    Сигналы после коммита пишут id затронутых пользователей и проектов
+    в журнал изменений под новым поколением 'matching' в кэше
+    (publish_changes). Процесс, увидевший чужое поколение, перечитывает
+    по журналу только эти строки; без журнала (запись вытеснена,
+    слишком большое отставание, invalidate без журнала) — перестраивает
+    индекс целиком.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.reset()
+
+    def reset(self):
+        self.generation = None
+        self.vocabulary = {}
+        self.users = {}
+        self.projects = {}
+        self.positions = {}
+        self.users_by_role = defaultdict(set)
+        self.users_by_term = defaultdict(set)
+        self.positions_by_role = defaultdict(set)
+        self.projects_by_term = defaultdict(set)
+        self.positions_by_project = defaultdict(set)
+
+    def term_bit(self, term):
+        bit = self.vocabulary.get(term)
+        if bit is None:
+            bit = self.vocabulary[term] = len(self.vocabulary)
+        return bit
+
+    def make_mask(self, terms):
+        mask = 0
+        for term in terms:
+            mask |= 1 << self.term_bit(normalize_term(term))
+        return mask
+
+    @staticmethod
+    def iter_bits(mask):
+        while mask:
+            low = mask & -mask
+            yield low.bit_length() - 1
+            mask ^= low
+
+    # Загрузка
+
+    def ensure_current(self):
+        generation = get_generation(GENERATION_NAMESPACE)
+        if generation == self.generation:
+            return
+        with self.lock:
+            if generation == self.generation:
+                return
+            changes = self.changes_until(generation)
+            if changes is None:
+                self.rebuild(generation)
+            else:
+                self.apply_changes(*changes)
+                self.generation = generation
+
+    def changes_until(self, generation):
+        """
+        Объединение записей журнала от текущего поколения индекса до
+        generation: (user_ids, project_ids) или None, если журнала нет.
+        """
+        if self.generation is None:
+            return None
+        behind = generation - self.generation
+        if not 0 < behind <= MAX_CATCH_UP:
+            return None
+        keys = [
+            CHANGES_KEY.format(number)
+            for number in range(self.generation + 1, generation + 1)
+        ]
+        entries = cache.get_many(keys)
+        if len(entries) != len(keys):
+            return None
+        user_ids, project_ids = set(), set()
+        for users, projects in entries.values():
+            user_ids.update(users)
+            project_ids.update(projects)
+        return user_ids, project_ids
+
+    def rebuild(self, generation=None):
+        with self.lock:
+            self.reset()
+            self.load_users(User.objects.all())
+            self.load_projects(Project.objects.all())
+            self.generation = generation
+
+    def load_users(self, queryset):
+        rows = queryset.filter(is_active=True).values_list(
+            'id', 'role_id', 'grade_id'
+        )
+        users = {
+            user_id: (role_id, grade_id, [])
+            for user_id, role_id, grade_id in rows
+        }
+        skills = User.skills.through.objects.filter(
+            user_id__in=queryset.values('id')
+        ).values_list('user_id', 'skill__code', 'skill__name')
+        for user_id, code, name in skills:
+            if user_id in users:
+                users[user_id][2].extend((code, name))
+
+        for user_id, (role_id, grade_id, terms) in users.items():
+            mask = self.make_mask(terms)
+            self.users[user_id] = (role_id, grade_id, mask)
+            self.users_by_role[role_id].add(user_id)
+            for bit in self.iter_bits(mask):
+                self.users_by_term[bit].add(user_id)
+
+    def load_projects(self, queryset):
+        projects = {
+            project_id: (author_id, [])
+            for project_id, author_id in queryset.values_list('id', 'author_id')
+        }
+        stacks = Project.stacks.through.objects.filter(
+            project_id__in=queryset.values('id')
+        ).values_list('project_id', 'stack__name')
+        for project_id, name in stacks:
+            if project_id in projects:
+                projects[project_id][1].append(name)
+
+        for project_id, (author_id, terms) in projects.items():
+            mask = self.make_mask(terms)
+            self.projects[project_id] = (author_id, mask)
+            for bit in self.iter_bits(mask):
+                self.projects_by_term[bit].add(project_id)
+
+        positions = ProjectPosition.objects.filter(
+            project_id__in=queryset.values('id'), count_needed__gt=0
+        ).values_list('id', 'project_id', 'role_id', 'grade_id')
+        for position_id, project_id, role_id, grade_id in positions:
+            if project_id not in self.projects:
+                continue
+            self.positions[position_id] = (project_id, role_id, grade_id)
+            self.positions_by_role[role_id].add(position_id)
+            self.positions_by_project[project_id].add(position_id)
+
+    # Инкрементальные обновления
+
+    def forget_users(self, user_ids):
+        for user_id in user_ids:
+            entry = self.users.pop(user_id, None)
+            if entry is None:
+                continue
+            role_id, _, mask = entry
+            self.users_by_role[role_id].discard(user_id)
+            for bit in self.iter_bits(mask):
+                self.users_by_term[bit].discard(user_id)
+
+    def forget_projects(self, project_ids):
+        for project_id in project_ids:
+            for position_id in self.positions_by_project.pop(project_id, ()):
+                _, role_id, _ = self.positions.pop(position_id)
+                self.positions_by_role[role_id].discard(position_id)
+            entry = self.projects.pop(project_id, None)
+            if entry is None:
+                continue
+            for bit in self.iter_bits(entry[1]):
+                self.projects_by_term[bit].discard(project_id)
+
+    def apply_changes(self, user_ids, project_ids):
+        with self.lock:
+            if user_ids:
+                self.forget_users(user_ids)
+                self.load_users(User.objects.filter(pk__in=user_ids))
+            if project_ids:
+                self.forget_projects(project_ids)
+                self.load_projects(Project.objects.filter(pk__in=project_ids))
+
+    # Запросы
+
+    def candidates_for_position(self, position_id, limit=10):
+        """
+        Лучшие кандидаты на позицию: список (user_id, score).
+        """
+        self.ensure_current()
+        with self.lock:
+            position = self.positions.get(position_id)
+            if position is None:
+                return []
+            project_id, role_id, grade_id = position
+            author_id, project_mask = self.projects[project_id]
+
+            user_ids = set()
+            if role_id != RoleEnum.NOT_SELECTED:
+                user_ids |= self.users_by_role.get(role_id, set())
+            for bit in self.iter_bits(project_mask):
+                user_ids |= self.users_by_term.get(bit, set())
+            user_ids.discard(author_id)
+
+            scored = (
+                (match_score(role_id, grade_id, project_mask, *self.users[user_id]),
+                 user_id)
+                for user_id in user_ids
+            )
+            return [
+                (user_id, round(score, 4))
+                for score, user_id in heapq.nlargest(limit, scored)
+            ]
+
+    def positions_for_user(self, user_id, limit=10):
+        """
+        Лучшие открытые позиции для пользователя: список (position_id, score).
+        Позиции в собственных проектах пользователя не предлагаются.
+        """
+        self.ensure_current()
+        with self.lock:
+            user = self.users.get(user_id)
+            if user is None:
+                return []
+            role_id, _, user_mask = user
+
+            position_ids = set()
+            if role_id != RoleEnum.NOT_SELECTED:
+                position_ids |= self.positions_by_role.get(role_id, set())
+            for bit in self.iter_bits(user_mask):
+                for project_id in self.projects_by_term.get(bit, ()):
+                    position_ids |= self.positions_by_project.get(project_id, set())
+
+            scored = []
+            for position_id in position_ids:
+                project_id, position_role, position_grade = self.positions[position_id]
+                author_id, project_mask = self.projects[project_id]
+                if author_id == user_id:
+                    continue
+                score = match_score(
+                    position_role, position_grade, project_mask, *user
+                )
+                scored.append((score, position_id))
+            return [
+                (position_id, round(score, 4))
+                for score, position_id in heapq.nlargest(limit, scored)
+            ]
+
+
+matching_index = MatchingIndex()
+
+
+def publish_changes(user_ids=(), project_ids=()):
+    """
+    Сдвигает общее поколение и записывает под ним, какие строки
+    изменились. Индексы всех процессов, включая этот, применят запись
+    при следующем запросе — есть ли у процесса свой индекс, неважно.
+    """
+    if not user_ids and not project_ids:
+        return
+    key = GENERATION_KEY.format(GENERATION_NAMESPACE)
+    try:
+        generation = cache.incr(key)
+    except ValueError:
+        # Поколение вытеснено: новое не совпадёт ни с одним индексом
+        cache.add(key, time.time_ns(), GENERATION_TIMEOUT)
+        return
+    # Процесс, успевший увидеть поколение до этой записи, перестроит
+    # индекс целиком — дороже, но не устаревшие данные
+    cache.set(
+        CHANGES_KEY.format(generation), (list(user_ids), list(project_ids)),
+        CHANGES_TIMEOUT,
+    )
+
+
+def schedule_refresh(users=(), projects=()):
+    """
+    Опубликовать изменение после коммита текущей транзакции.
+    """
+    user_ids, project_ids = set(users), set(projects)
+    transaction.on_commit(lambda: publish_changes(user_ids, project_ids))
@@ -0,0 +1,72 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:07
+
+from collections import defaultdict
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+INDEX_NAME = 'project_search_vector_gin'
+
+
+def create_search_index(apps, schema_editor):
+    # GIN-индекс есть только в PostgreSQL, в SQLite поиск идёт по тексту
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX {INDEX_NAME} ON projects_project USING gin (search_vector)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+def fill_search_documents(apps, schema_editor):
+    # Документ собирается здесь, а не через projects.search: миграция
+    # должна повторяться одинаково при любых правках модуля и модели
+    Project = apps.get_model('projects', 'Project')
+    ProjectStacks = Project._meta.get_field('stacks').remote_field.through
+
+    stacks = defaultdict(list)
+    for project_id, name in ProjectStacks.objects.values_list(
+        'project_id', 'stack__name'
+    ):
+        stacks[project_id].append(name)
+
+    rows = Project.objects.values_list('id', 'name', 'description', 'author__username')
+    Project.objects.bulk_update(
+        [
+            Project(id=pk, search_document=' '.join(filter(None, [
+                name, description, username, *stacks[pk]
+            ])))
+            for pk, name, description, username in rows
+        ],
+        ['search_document'], batch_size=1000,
+    )
+    if schema_editor.connection.vendor == 'postgresql':
+        Project.objects.update(
+            search_vector=SearchVector('search_document', config='simple')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0005_alter_project_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='project',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='project',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:23
+
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def fill_facets(apps, schema_editor):
+    # Счётчики с нуля, как projects.facets.count_facets, но по
+    # историческим моделям: текущий код может не совпадать со схемой
+    Project = apps.get_model('projects', 'Project')
+    ProjectPosition = apps.get_model('projects', 'ProjectPosition')
+    PositionFacet = apps.get_model('projects', 'PositionFacet')
+    ProjectStacks = Project._meta.get_field('stacks').remote_field.through
+
+    open_positions = ProjectPosition.objects.filter(count_needed__gt=0)
+    facets = []
+    for facet, field in (('role', 'role_id'), ('grade', 'grade_id')):
+        rows = open_positions.values(field).annotate(
+            count=Count('id'), seats=Sum('count_needed')
+        ).values_list(field, 'count', 'seats')
+        facets += [
+            PositionFacet(facet=facet, value=value, positions=count, seats=seats)
+            for value, count, seats in rows
+        ]
+
+    rows = ProjectStacks.objects.filter(
+        project__positions__count_needed__gt=0
+    ).values('stack_id').annotate(
+        count=Count('project__positions'),
+        seats=Sum('project__positions__count_needed'),
+    ).values_list('stack_id', 'count', 'seats')
+    facets += [
+        PositionFacet(facet='stack', value=str(stack_id), positions=count, seats=seats)
+        for stack_id, count, seats in rows
+    ]
+    PositionFacet.objects.bulk_create(facets)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0007_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PositionFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facet', models.CharField(max_length=20)),
+                ('value', models.CharField(max_length=50)),
+                ('positions', models.IntegerField(default=0)),
+                ('seats', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('facet', 'value'), name='position_facet_unique')],
+            },
+        ),
+        migrations.RunPython(fill_facets, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:25
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('projects', '0008_position_facets'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['-created_at', 'id'], name='project_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['name', 'id'], name='project_name_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='project',
+            index=models.Index(fields=['author', '-created_at', 'id'], name='project_author_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectposition',
+            index=models.Index(fields=['role_id', 'grade_id'], name='position_role_grade_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectposition',
+            index=models.Index(fields=['grade_id'], name='position_grade_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='projectposition',
+            index=models.Index(condition=models.Q(('count_needed__gt', 0)), fields=['project', 'role_id'], name='position_open_idx'),
+        ),
+    ]
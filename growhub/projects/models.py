@@ -1,4 +1,5 @@
 import uuid
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.conf import settings
 from users.models import RoleEnum, GradeEnum
@@ -12,6 +13,24 @@ class Stack(models.Model):
         return self.name
 
 
+class ProjectQuerySet(models.QuerySet):
+    def for_read(self):
+        """
+        Выборка для чтения: проекты, позиции и стеки за фиксированное
+        число запросов (3) независимо от количества строк. У стеков
+        читаются только id: строки берутся из projects.lookups.
+        """
+        return self.prefetch_related(
+            models.Prefetch('stacks', queryset=Stack.objects.only('id')),
+            models.Prefetch(
+                'positions',
+                queryset=ProjectPosition.objects.only(
+                    'id', 'project_id', 'role_id', 'grade_id', 'count_needed'
+                )
+            ),
+        )
+
+
 class Project(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
     name = models.CharField(max_length=255)
@@ -24,6 +43,24 @@ class Project(models.Model):
     )
     stacks = models.ManyToManyField('Stack', related_name='projects', blank=True)
     created_at = models.DateField(auto_now_add=True)
+    # Версия для ETag/Last-Modified: меняется и при правке позиций/стеков
+    updated_at = models.DateTimeField(auto_now=True)
+    # Поисковый документ: название, описание, автор и стеки (см. projects.search)
+    search_document = models.TextField(blank=True, default='', editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = ProjectQuerySet.as_manager()
+
+    class Meta:
+        # Под keyset-пагинацию: сортировка всегда дополняется id
+        indexes = [
+            models.Index(fields=['-created_at', 'id'], name='project_created_id_idx'),
+            models.Index(fields=['name', 'id'], name='project_name_id_idx'),
+            models.Index(
+                fields=['author', '-created_at', 'id'],
+                name='project_author_created_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -48,5 +85,45 @@ class ProjectPosition(models.Model):
     )
     count_needed = models.PositiveIntegerField(default=1)
 
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['role_id', 'grade_id'], name='position_role_grade_idx'
+            ),
+            models.Index(fields=['grade_id'], name='position_grade_idx'),
+            # Открытые позиции: фасеты, подбор кандидатов
+            models.Index(
+                fields=['project', 'role_id'],
+                condition=models.Q(count_needed__gt=0),
+                name='position_open_idx',
+            ),
+        ]
+
     def __str__(self):
         return f"{self.get_role_id_display()} - {self.get_grade_id_display()}"
+
+
+class PositionFacet(models.Model):
+    """
+    Денормализованный счётчик открытых позиций (count_needed > 0)
+    по значению фасета: роли, грейду или стеку проекта.
+    Поддерживается сигналами в той же транзакции (см. projects.facets).
+    """
+    ROLE = 'role'
+    GRADE = 'grade'
+    STACK = 'stack'
+
+    facet = models.CharField(max_length=20)
+    value = models.CharField(max_length=50)
+    positions = models.IntegerField(default=0)
+    seats = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['facet', 'value'], name='position_facet_unique'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.facet}={self.value}: {self.positions}'
@@ -0,0 +1,40 @@
+from collections import defaultdict
+
+from growhub.search import update_search_vectors
+
+BATCH_SIZE = 1000
+
+
+def project_document(name, description, username, stacks):
+    return ' '.join(filter(None, [name, description, username, *stacks]))
+
+
+def build_project_documents(projects):
+    """
+    Собирает текст поискового документа для каждого проекта выборки:
+    {project_id: 'name description author stack ...'}.
+    """
+    Project = projects.model
+    stacks = defaultdict(list)
+    links = Project.stacks.through.objects.filter(
+        project__in=projects.values('id')
+    ).values_list('project_id', 'stack__name')
+    for project_id, stack_name in links:
+        stacks[project_id].append(stack_name)
+
+    rows = projects.values_list('id', 'name', 'description', 'author__username')
+    return {
+        project_id: project_document(name, description, username, stacks[project_id])
+        for project_id, name, description, username in rows
+    }
+
+
+def refresh_project_documents(projects):
+    documents = build_project_documents(projects)
+    Project = projects.model
+    instances = [
+        Project(id=project_id, search_document=document)
+        for project_id, document in documents.items()
+    ]
+    Project.objects.bulk_update(instances, ['search_document'], batch_size=BATCH_SIZE)
+    update_search_vectors(projects)
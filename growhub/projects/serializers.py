@@ -1,12 +1,20 @@
+from django.db import transaction
 from rest_framework import serializers
+
+from growhub.bulk import sync_related
+from growhub.lookups import LookupIdsField, LookupRelatedField
+from growhub.metrics import TimedSerializerMixin
+from .events import project_sync_event
+from .facets import track_project
+from .lookups import stack_lookup
 from .models import Project, ProjectPosition, Stack
-from users.serializers import UserReadSerializer
+from users.serializers import UserReadSerializer, ChoiceLabelField
 
-from users.models import User
+from users.models import User, RoleEnum, GradeEnum
 
 
 class ProjectPositionWriteSerializer(serializers.ModelSerializer):
-    user_id = serializers.UUIDField(source='project.author.id', read_only=True)
+    user_id = serializers.UUIDField(source='project.author_id', read_only=True)
 
     class Meta:
         model = ProjectPosition
@@ -14,11 +22,19 @@ class ProjectPositionWriteSerializer(serializers.ModelSerializer):
         read_only_fields = ['id', 'project', 'user_id']
 
 
-class ProjectPositionReadSerializer(serializers.ModelSerializer):
-    role = serializers.CharField(source='get_role_id_display', read_only=True)
-    grade = serializers.CharField(source='get_grade_id_display', read_only=True)
-    project_id = serializers.UUIDField(source='project.id', read_only=True)
-    user_id = serializers.UUIDField(source='project.author.id', read_only=True)
+class ProjectPositionItemSerializer(ProjectPositionWriteSerializer):
+    """
+    Позиция внутри проекта: id необязателен и служит для сопоставления
+    с уже существующей позицией при обновлении.
+    """
+    id = serializers.UUIDField(required=False)
+
+
+class ProjectPositionReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    role = ChoiceLabelField(RoleEnum.choices, source='role_id')
+    grade = ChoiceLabelField(GradeEnum.choices, source='grade_id')
+    project_id = serializers.UUIDField(read_only=True)
+    user_id = serializers.UUIDField(source='project.author_id', read_only=True)
 
     class Meta:
         model = ProjectPosition
@@ -32,7 +48,7 @@ class ProjectPositionReadSerializer(serializers.ModelSerializer):
         ]
 
 
-class StackSerializer(serializers.ModelSerializer):
+class StackSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Stack
         fields = ['id', 'name']
@@ -44,10 +60,11 @@ class ProjectAuthorSerializer(serializers.ModelSerializer):
         fields = ['id']
 
 
-class ProjectReadSerializer(serializers.ModelSerializer):
-    author_id = serializers.UUIDField(source="author.id")
+class ProjectReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    author_id = serializers.UUIDField(read_only=True)
     positions = ProjectPositionReadSerializer(many=True)
-    stacks = StackSerializer(many=True)
+    # Стеки рендерятся из справочника в памяти: из базы — только id связей
+    stacks = LookupRelatedField(stack_lookup)
 
     class Meta:
         model = Project
@@ -65,29 +82,31 @@ class ProjectReadSerializer(serializers.ModelSerializer):
 
 
 class ProjectWriteSerializer(serializers.ModelSerializer):
-    positions_data = ProjectPositionWriteSerializer(
+    POSITION_FIELDS = ['role_id', 'grade_id', 'count_needed']
+
+    positions_data = ProjectPositionItemSerializer(
         many=True, required=False
     )
-    stacks = serializers.ListField(
-        child=serializers.UUIDField(),
-        write_only=True,
-        required=False
-    )
+    stacks = LookupIdsField(stack_lookup, write_only=True, required=False)
 
     class Meta:
         model = Project
         fields = ['name', 'github', 'description', 'positions_data', 'stacks']
 
+    @transaction.atomic
     def create(self, validated_data):
         positions_data = validated_data.pop('positions_data', [])
         stacks_ids = validated_data.pop('stacks', [])
-        user = self.context['request'].user
+        author = validated_data.pop('author', self.context['request'].user)
 
-        project = Project.objects.create(author=user, **validated_data)
+        project = Project.objects.create(author=author, **validated_data)
 
-        # Создаем позиции
-        for pos in positions_data:
-            ProjectPosition.objects.create(project=project, **pos)
+        # Создаем позиции одним запросом
+        with track_project(project.pk):
+            self.positions_result = sync_related(
+                project.positions.none(), positions_data,
+                self.POSITION_FIELDS, project=project
+            )
 
         # Привязываем стеки через M2M
         if stacks_ids:
@@ -95,17 +114,20 @@ class ProjectWriteSerializer(serializers.ModelSerializer):
 
         return project
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         positions_data = validated_data.pop('positions_data', None)
-        stacks_ids = validated_data.pop('stacks_ids', None)
+        stacks_ids = validated_data.pop('stacks', None)
 
         instance = super().update(instance, validated_data)
 
-        # Обновляем позиции
+        # Сверяем позиции по id: вставка/обновление/удаление пачками
         if positions_data is not None:
-            instance.positions.all().delete()
-            for pos in positions_data:
-                ProjectPosition.objects.create(project=instance, **pos)
+            with track_project(instance.pk), project_sync_event(instance.pk):
+                self.positions_result = sync_related(
+                    instance.positions.all(), positions_data,
+                    self.POSITION_FIELDS, project=instance
+                )
 
         # Обновляем стеки
         if stacks_ids is not None:
@@ -0,0 +1,371 @@
+from django.db.models import QuerySet
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from growhub.events import publish_on_commit
+from growhub.response_cache import invalidate
+from jobs.queue import enqueue
+from users.models import Skill, User
+from . import events, facets
+from .matching import schedule_refresh
+from .models import PositionFacet, Project, ProjectPosition, Stack
+from .search import refresh_project_documents
+
+PROJECT_DOCUMENT_FIELDS = {'name', 'description', 'author'}
+USER_MATCHING_FIELDS = {'role_id', 'grade_id', 'is_active'}
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+def deleted_with_project(position, origin):
+    """
+    Позиция удаляется каскадом вместе с проектом (у позиции нет других
+    FK): счётчики, версию, кэш и событие учитывают обработчики проекта,
+    а построчные сигналы ничего не делают.
+    """
+    if origin is position:
+        return False
+    return not (isinstance(origin, QuerySet) and origin.model is ProjectPosition)
+
+
+def projects_changed(projects):
+    """
+    Вложенные данные проектов изменились: пересобрать поисковые
+    документы и сдвинуть updated_at (версию для ETag).
+    """
+    project_ids = list(projects.values_list('id', flat=True))
+    refresh_project_documents(projects)
+    projects.update(updated_at=timezone.now())
+    schedule_refresh(projects=project_ids)
+
+
+def projects_changed_later(projects, payload, dedup_key=None):
+    """
+    Как projects_changed, но для правок, задевающих много проектов
+    (стек): документы пересобирает фоновая задача (projects.tasks).
+    """
+    project_ids = list(projects.values_list('id', flat=True))
+    Project.objects.filter(pk__in=project_ids).update(updated_at=timezone.now())
+    schedule_refresh(projects=project_ids)
+    enqueue('projects.refresh_documents', payload, dedup_key=dedup_key)
+
+
+@receiver(post_save, sender=Project)
+def project_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not _touches(update_fields, PROJECT_DOCUMENT_FIELDS):
+        return
+    refresh_project_documents(Project.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=Project.stacks.through)
+def project_stacks_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            projects_changed(Project.objects.filter(pk=instance.pk))
+        return
+
+    # Обратная сторона: stack.projects.add/remove/clear
+    if action == 'pre_clear':
+        instance._cleared_project_ids = list(
+            instance.projects.values_list('id', flat=True)
+        )
+    elif action in ('post_add', 'post_remove'):
+        projects_changed(Project.objects.filter(pk__in=pk_set))
+    elif action == 'post_clear':
+        project_ids = getattr(instance, '_cleared_project_ids', [])
+        projects_changed(Project.objects.filter(pk__in=project_ids))
+
+
+@receiver(post_save, sender=Stack)
+def stack_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    projects_changed_later(
+        Project.objects.filter(stacks=instance), {'stack_id': instance.pk},
+        dedup_key=f'projects.documents:stack:{instance.pk}',
+    )
+
+
+@receiver(pre_delete, sender=Stack)
+def stack_deleting(sender, instance, **kwargs):
+    instance._deleted_project_ids = list(
+        instance.projects.values_list('id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Stack)
+def stack_deleted(sender, instance, **kwargs):
+    project_ids = getattr(instance, '_deleted_project_ids', [])
+    if project_ids:
+        projects_changed_later(
+            Project.objects.filter(pk__in=project_ids), {'project_ids': project_ids}
+        )
+
+
+@receiver(post_save, sender=ProjectPosition)
+@receiver(post_delete, sender=ProjectPosition)
+def position_changed(sender, instance, raw=False, origin=None, **kwargs):
+    # Массовую правку (track_project) учитывает save() проекта
+    if raw or facets.is_tracked(instance.project_id):
+        return
+    if origin is not None and deleted_with_project(instance, origin):
+        return
+    Project.objects.filter(pk=instance.project_id).update(updated_at=timezone.now())
+    schedule_refresh(projects=[instance.project_id])
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw or created or not _touches(update_fields, {'username'}):
+        return
+    # Имя автора есть в документах всех его проектов
+    enqueue(
+        'projects.refresh_documents', {'author_id': instance.pk},
+        dedup_key=f'projects.documents:author:{instance.pk}',
+    )
+
+
+# Индекс подбора (projects.matching): затронутые пользователи и проекты
+# (для навыка — все его пользователи) перечитываются после коммита.
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+def project_matching_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    schedule_refresh(projects=[instance.pk])
+
+
+@receiver(post_save, sender=User)
+def user_matching_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not _touches(update_fields, USER_MATCHING_FIELDS):
+        return
+    schedule_refresh(users=[instance.pk])
+
+
+@receiver(post_delete, sender=User)
+def user_matching_deleted(sender, instance, **kwargs):
+    schedule_refresh(users=[instance.pk])
+
+
+def skill_user_ids(skill):
+    return list(skill.users.values_list('id', flat=True))
+
+
+@receiver(m2m_changed, sender=User.skills.through)
+def user_skills_matching_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        instance._matching_user_ids = skill_user_ids(instance)
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        schedule_refresh(users=[instance.pk])
+    elif action == 'post_clear':
+        schedule_refresh(users=getattr(instance, '_matching_user_ids', []))
+    else:
+        schedule_refresh(users=pk_set)
+
+
+@receiver(post_save, sender=Skill)
+def skill_matching_saved(sender, instance, raw=False, created=False, **kwargs):
+    if raw or created:
+        return
+    # Код и название навыка — термины в масках его пользователей
+    schedule_refresh(users=skill_user_ids(instance))
+
+
+@receiver(pre_delete, sender=Skill)
+def skill_matching_deleting(sender, instance, **kwargs):
+    instance._matching_user_ids = skill_user_ids(instance)
+
+
+@receiver(post_delete, sender=Skill)
+def skill_matching_deleted(sender, instance, **kwargs):
+    schedule_refresh(users=getattr(instance, '_matching_user_ids', []))
+
+
+# Счётчики фасетов (projects.facets) меняются в той же транзакции,
+# что и позиции/стеки. Массовые правки позиций через sync_related
+# учитываются в сериализаторе (facets.track_project).
+@receiver(pre_save, sender=ProjectPosition)
+def position_facets_saving(sender, instance, raw=False, **kwargs):
+    if raw or facets.is_tracked(instance.project_id):
+        instance._facet_skip = True
+        return
+    instance._facet_skip = False
+    instance._facet_stack_ids = facets.stack_ids_of(instance.project_id)
+    instance._facet_old_delta = {}
+    if not instance._state.adding:
+        old = ProjectPosition.objects.filter(pk=instance.pk).first()
+        if old is not None:
+            stack_ids = instance._facet_stack_ids
+            if old.project_id != instance.project_id:
+                stack_ids = facets.stack_ids_of(old.project_id)
+            instance._facet_old_delta = facets.position_delta(old, stack_ids, sign=-1)
+
+
+@receiver(post_save, sender=ProjectPosition)
+def position_facets_saved(sender, instance, raw=False, **kwargs):
+    if raw or instance._facet_skip:
+        return
+    facets.apply_delta(facets.merge(
+        facets.position_delta(instance, instance._facet_stack_ids),
+        instance._facet_old_delta,
+    ))
+
+
+@receiver(pre_delete, sender=ProjectPosition)
+def position_facets_deleting(sender, instance, origin, **kwargs):
+    if facets.is_tracked(instance.project_id) or deleted_with_project(instance, origin):
+        return
+    instance._facet_old_delta = facets.position_delta(
+        instance, facets.stack_ids_of(instance.project_id), sign=-1
+    )
+
+
+@receiver(post_delete, sender=ProjectPosition)
+def position_facets_deleted(sender, instance, **kwargs):
+    facets.apply_delta(getattr(instance, '_facet_old_delta', {}))
+
+
+@receiver(pre_delete, sender=Project)
+def project_facets_deleting(sender, instance, **kwargs):
+    # Вклад всех позиций проекта — двумя запросами и одним UPDATE на
+    # ключ, а не по позиции; стеки и позиции ещё на месте
+    instance._facet_old_delta = facets.merge(
+        facets.project_contribution(instance.pk), signs=[-1]
+    )
+
+
+@receiver(post_delete, sender=Project)
+def project_facets_deleted(sender, instance, **kwargs):
+    facets.apply_delta(instance._facet_old_delta)
+
+
+@receiver(m2m_changed, sender=Project.stacks.through)
+def stack_facets_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        related = instance.projects if reverse else instance.stacks
+        instance._facet_cleared_ids = list(related.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    sign = 1 if action == 'post_add' else -1
+    related_ids = (
+        getattr(instance, '_facet_cleared_ids', [])
+        if action == 'post_clear' else pk_set
+    )
+    if reverse:
+        facets.apply_stack_delta(related_ids, [instance.pk], sign)
+    else:
+        facets.apply_stack_delta([instance.pk], related_ids, sign)
+
+
+@receiver(post_delete, sender=Stack)
+def stack_facets_deleted(sender, instance, **kwargs):
+    PositionFacet.objects.filter(
+        facet=PositionFacet.STACK, value=str(instance.pk)
+    ).delete()
+
+
+# Кэш ответов: любая запись сдвигает поколение каталога.
+# Позиции, изменённые через sync_related, всегда идут вместе
+# с сохранением проекта, поэтому отдельного сигнала не требуют.
+@receiver(post_save, sender=Project)
+@receiver(post_delete, sender=Project)
+@receiver(post_save, sender=ProjectPosition)
+@receiver(m2m_changed, sender=Project.stacks.through)
+def invalidate_projects_cache(sender, **kwargs):
+    invalidate('projects')
+
+
+@receiver(post_delete, sender=ProjectPosition)
+def invalidate_positions_cache(sender, instance, origin, **kwargs):
+    if not deleted_with_project(instance, origin):
+        invalidate('projects')
+
+
+@receiver(post_save, sender=Stack)
+@receiver(post_delete, sender=Stack)
+def invalidate_stacks_cache(sender, **kwargs):
+    invalidate('projects', 'stacks')
+
+
+# События для подписчиков (growhub.events): уходят после коммита,
+# правки проекта собираются в одно событие на транзакцию. Позиции,
+# изменённые через sync_related, попадают в событие проекта
+# (events.project_sync_event), сигналы позиций при этом молчат.
+@receiver(post_save, sender=Project)
+def project_event_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    action = 'created' if created else 'updated'
+    publish_on_commit(
+        ('project', instance.pk), lambda: events.project_event(instance.pk, action)
+    )
+
+
+@receiver(m2m_changed, sender=Project.stacks.through)
+def project_stacks_event(sender, instance, action, reverse, **kwargs):
+    if reverse or action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    publish_on_commit(
+        ('project', instance.pk), lambda: events.project_event(instance.pk, 'updated')
+    )
+
+
+@receiver(pre_delete, sender=Project)
+def project_event_deleting(sender, instance, **kwargs):
+    # Позиции и стеки удаляются вместе с проектом: читаем до удаления
+    instance._event = events.project_event(instance.pk, 'deleted')
+
+
+@receiver(post_delete, sender=Project)
+def project_event_deleted(sender, instance, **kwargs):
+    event = instance._event
+    publish_on_commit(('project', instance.pk), lambda: event, replace=True)
+
+
+@receiver(pre_save, sender=ProjectPosition)
+def position_event_saving(sender, instance, raw=False, **kwargs):
+    instance._event_previous = None
+    if raw or facets.is_tracked(instance.project_id):
+        return
+    if not instance._state.adding:
+        instance._event_previous = ProjectPosition.objects.filter(
+            pk=instance.pk
+        ).values('role_id', 'grade_id').first()
+
+
+@receiver(post_save, sender=ProjectPosition)
+def position_event_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or facets.is_tracked(instance.project_id):
+        return
+    action = 'created' if created else 'updated'
+    previous = instance._event_previous
+    publish_on_commit(
+        ('position', instance.pk),
+        lambda: events.position_event(instance, action, previous),
+    )
+
+
+@receiver(pre_delete, sender=ProjectPosition)
+def position_event_deleting(sender, instance, origin, **kwargs):
+    # При удалении проекта — одно событие project.deleted с его позициями
+    if facets.is_tracked(instance.project_id) or deleted_with_project(instance, origin):
+        return
+    instance._event = events.position_event(instance, 'deleted')
+
+
+@receiver(post_delete, sender=ProjectPosition)
+def position_event_deleted(sender, instance, **kwargs):
+    event = getattr(instance, '_event', None)
+    if event is None:
+        return
+    publish_on_commit(('position', instance.pk), lambda: event, replace=True)
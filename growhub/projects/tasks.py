@@ -0,0 +1,19 @@
+from jobs.queue import task
+from .models import Project
+from .search import refresh_project_documents
+
+
+@task('projects.refresh_documents')
+def refresh_documents(project_ids=None, stack_id=None, author_id=None):
+    """
+    Поисковые документы проектов после правки стека или автора.
+    Проекты стека/автора выбираются в момент выполнения.
+    """
+    projects = Project.objects.all()
+    if project_ids is not None:
+        projects = projects.filter(pk__in=project_ids)
+    if stack_id is not None:
+        projects = projects.filter(stacks=stack_id)
+    if author_id is not None:
+        projects = projects.filter(author_id=author_id)
+    refresh_project_documents(projects)
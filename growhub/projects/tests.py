@@ -1,3 +1,729 @@
-from django.test import TestCase
+import time
+import uuid
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from growhub.events import Broker, CacheBackend, broker
+from growhub.response_cache import get_generation, invalidate
+from jobs.queue import run_pending
+from users.models import User, RoleEnum, GradeEnum, Skill
+from .events import catalog_events
+from .facets import find_drift
+from .lookups import stack_lookup
+from .matching import MatchingIndex, matching_index
+from .models import PositionFacet, Project, ProjectPosition, Stack
+from .views import ProjectViewSet
+
+
+class ProjectReadQueryBudgetTest(TestCase):
+    """
+    Количество запросов на чтение не должно зависеть от числа строк.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='author@example.com', username='author', password='pass'
+        )
+        cls.stacks = [Stack.objects.create(name=f'stack-{i}') for i in range(3)]
+
+    def setUp(self):
+        cache.clear()
+        # Справочник стеков загружается один раз на процесс, не на запрос
+        stack_lookup.current()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def create_projects(self, count):
+        for i in range(count):
+            project = Project.objects.create(name=f'project-{i}', author=self.author)
+            project.stacks.set(self.stacks)
+            ProjectPosition.objects.create(
+                project=project,
+                role_id=RoleEnum.BACKEND,
+                grade_id=GradeEnum.MIDDLE
+            )
+            ProjectPosition.objects.create(project=project, role_id=RoleEnum.QA)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context), response.json()
+
+    def test_project_list_query_count_is_constant(self):
+        self.create_projects(2)
+        small, _ = self.count_queries('/api/projects/?page_size=100')
+        self.create_projects(20)
+        large, data = self.count_queries('/api/projects/?page_size=100')
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(data['results']), 22)
+        position = data['results'][0]['positions'][0]
+        self.assertEqual(position['user_id'], str(self.author.id))
+        self.assertIn(position['role'], dict(RoleEnum.choices).values())
+
+    def test_position_list_query_count_is_constant(self):
+        self.create_projects(2)
+        small, _ = self.count_queries('/api/positions/?page_size=100')
+        self.create_projects(20)
+        large, data = self.count_queries('/api/positions/?page_size=100')
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(data['results']), 44)
+        labels = {position['grade'] for position in data['results']}
+        self.assertEqual(labels, {'Middle', GradeEnum.NOT_SELECTED.label})
+
+
+class ProjectSearchTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='search@example.com', username='searcher'
+        )
+        cls.django = Stack.objects.create(name='Django')
+        cls.react = Stack.objects.create(name='React')
+
+        cls.shop = Project.objects.create(
+            name='Shop backend', description='Online shop API', author=cls.author
+        )
+        cls.shop.stacks.set([cls.django])
+        cls.blog = Project.objects.create(
+            name='Blog', description='Frontend for a shop blog', author=cls.author
+        )
+        cls.blog.stacks.set([cls.react])
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, term, **params):
+        response = APIClient().get('/api/projects/', {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [project['name'] for project in response.json()['results']]
+
+    def test_prefix_search_is_ranked(self):
+        self.assertEqual(self.search('sho'), ['Shop backend', 'Blog'])
+        self.assertEqual(self.search('sho', ordering='name'), ['Blog', 'Shop backend'])
+        self.assertEqual(self.search('shop djan'), ['Shop backend'])
+        self.assertEqual(self.search('mobile'), [])
+        self.assertEqual(len(self.search('searc')), 2)
+
+    def test_documents_follow_related_changes(self):
+        self.django.name = 'FastAPI'
+        self.django.save()
+        # Стек общий для многих проектов: документы пересобирает воркер
+        run_pending()
+        self.assertEqual(self.search('django'), [])
+        self.assertEqual(self.search('fastapi'), ['Shop backend'])
+
+        self.react.projects.clear()
+        self.assertEqual(self.search('react'), [])
+
+        self.author.username = 'renamed'
+        self.author.save()
+        run_pending()
+        self.assertEqual(len(self.search('renamed')), 2)
+
+
+class ProjectWriteTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            email='writer@example.com', username='writer'
+        )
+        cls.stack = Stack.objects.create(name='Django')
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def test_update_keeps_position_ids_and_syncs_rows(self):
+        response = self.client.post('/api/projects/', {
+            'name': 'GrowHub',
+            'stacks': [str(self.stack.id)],
+            'positions_data': [
+                {'role_id': RoleEnum.BACKEND, 'grade_id': GradeEnum.MIDDLE},
+                {'role_id': RoleEnum.QA},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        project = response.json()
+        backend, qa = sorted(project['positions'], key=lambda p: p['role'])
+
+        response = self.client.put(f"/api/projects/{project['id']}/", {
+            'name': 'GrowHub 2',
+            'stacks': [],
+            'positions_data': [
+                {'id': backend['id'], 'role_id': RoleEnum.BACKEND, 'count_needed': 3},
+                {'role_id': RoleEnum.DEVOPS},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        self.assertEqual(data['name'], 'GrowHub 2')
+        self.assertEqual(data['stacks'], [])
+        positions = {p['id']: p for p in data['positions']}
+        self.assertEqual(len(positions), 2)
+        self.assertEqual(positions[backend['id']]['count_needed'], 3)
+        self.assertNotIn(qa['id'], positions)
+
+    def test_unknown_stack_ids_are_rejected(self):
+        response = self.client.post('/api/projects/', {
+            'name': 'GrowHub', 'stacks': [str(self.stack.id), str(uuid.uuid4())],
+        }, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('stacks', response.json())
+        self.assertFalse(Project.objects.exists())
+
+        # Переименование видно в ответе без запроса за строками стеков
+        self.stack.name = 'Django 5'
+        self.stack.save()
+        response = self.client.post('/api/projects/', {
+            'name': 'GrowHub', 'stacks': [str(self.stack.id)],
+        }, format='json')
+        self.assertEqual(response.json()['stacks'], [
+            {'id': str(self.stack.id), 'name': 'Django 5'}
+        ])
+
+
+class RequestMetricsTest(TestCase):
+    def test_server_timing_and_endpoint_aggregates(self):
+        admin = User.objects.create_user(
+            email='admin@example.com', username='admin-metrics', is_staff=True
+        )
+        client = APIClient()
+        client.force_authenticate(admin)
+        client.delete('/api/metrics/')
+
+        response = client.get('/api/projects/')
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+        data = client.get('/api/metrics/').json()
+        entry = data['endpoints']['ProjectViewSet.list']
+        self.assertEqual(entry['count'], 1)
+        self.assertEqual(sum(entry['wall_ms']), 1)
+        self.assertGreater(entry['response_bytes'], 0)
+
+
+class ResponseCacheTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            email='cache@example.com', username='cache'
+        )
+        self.stack = Stack.objects.create(name='Go')
+        self.project = Project.objects.create(name='Cached', author=self.author)
+        self.project.stacks.set([self.stack])
+
+    def test_hit_not_modified_and_invalidation(self):
+        url = f'/api/projects/{self.project.id}/'
+        first = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        with self.assertNumQueries(0):
+            second = self.client.get(url)
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(not_modified.status_code, 304)
+
+        self.stack.name = 'Golang'
+        self.stack.save()
+        third = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(third.status_code, 200)
+        self.assertEqual(third.json()['stacks'][0]['name'], 'Golang')
+
+    def test_generation_outlives_entry_timeout(self):
+        generation = get_generation('projects')
+        invalidate('projects')
+        # Срок записей кэша прошёл, поколение остаётся прежним
+        later = time.time() + 3600
+        clock = 'django.core.cache.backends.locmem.time.time'
+        with mock.patch(clock, return_value=later):
+            self.assertEqual(get_generation('projects'), generation + 1)
+
+    def test_query_string_is_normalized(self):
+        self.client.get('/api/stacks/?page_size=5&ordering=name')
+        response = self.client.get('/api/stacks/?ordering=name&page_size=5')
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+
+@override_settings(RESPONSE_CACHE_ENABLED=False)
+class ConditionalRetrieveTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='etag@example.com', username='etag'
+        )
+        self.project = Project.objects.create(name='Versioned', author=self.author)
+        self.positions = ProjectPosition.objects.bulk_create([
+            ProjectPosition(project=self.project, role_id=RoleEnum.QA)
+            for _ in range(5)
+        ])
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+        self.url = f'/api/projects/{self.project.id}/'
+
+    def assertChanged(self, etag):
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response
+
+    def test_not_modified_until_positions_change(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        position = self.positions[0]
+        position.count_needed = 3
+        position.save()
+        etag = self.assertChanged(first['ETag'])['ETag']
+        self.positions[1].delete()
+        etag = self.assertChanged(etag)['ETag']
+
+        # Сверка позиций: одна запись версии проекта, не по строке
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.put(self.url, {
+                'name': 'Versioned',
+                'positions_data': [{'id': str(position.id), 'role_id': RoleEnum.QA}],
+            }, format='json')
+        self.assertEqual(response.status_code, 200)
+        project_updates = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE') and 'updated_at' in query['sql']
+            and connection.ops.quote_name(Project._meta.db_table)
+            in query['sql'].split('SET')[0]
+        ]
+        self.assertEqual(len(project_updates), 1)
+        response = self.assertChanged(etag)
+        self.assertEqual(len(response.json()['positions']), 1)
+
+
+@override_settings(ASYNC_READ_VIEWS=True, RESPONSE_CACHE_ENABLED=False)
+class AsyncReadViewTest(TestCase):
+    def setUp(self):
+        self.factory = AsyncRequestFactory()
+        self.author = User.objects.create_user(
+            email='async@example.com', username='async'
+        )
+        stack = Stack.objects.create(name='Rust')
+        for index in range(3):
+            project = Project.objects.create(name=f'Async {index}', author=self.author)
+            project.stacks.set([stack])
+        self.project = project
+
+    async def test_list_and_retrieve_match_sync_views(self):
+        list_view = ProjectViewSet.as_view({'get': 'list', 'post': 'create'})
+        response = await list_view(self.factory.get('/api/projects/?page_size=2'))
+        response.render()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertIsNotNone(response.data['next'])
+        sync_response = await sync_to_async(self.client.get)(
+            '/api/projects/?page_size=2'
+        )
+        self.assertEqual(response.data['results'], sync_response.json()['results'])
+
+        # Запись идёт через синхронный вьюсет
+        response = await list_view(self.factory.post('/api/projects/', {}))
+        self.assertEqual(response.status_code, 401)
+
+        detail_view = ProjectViewSet.as_view({'get': 'retrieve'})
+        response = await detail_view(
+            self.factory.get(f'/api/projects/{self.project.id}/'),
+            pk=str(self.project.id)
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['name'], 'Async 2')
+        not_modified = await detail_view(
+            self.factory.get(
+                f'/api/projects/{self.project.id}/',
+                headers={'If-None-Match': response['ETag']}
+            ),
+            pk=str(self.project.id)
+        )
+        self.assertEqual(not_modified.status_code, 304)
+
+        missing = await detail_view(
+            self.factory.get('/api/projects/missing/'), pk='missing'
+        )
+        self.assertEqual(missing.status_code, 404)
+
+
+class MatchingTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            email='owner@example.com', username='owner', role_id=RoleEnum.BACKEND
+        )
+        python = Skill.objects.create(code='python', name='Python')
+        django = Skill.objects.create(code='django', name='Django')
+
+        self.strong = User.objects.create_user(
+            email='strong@example.com', username='strong',
+            role_id=RoleEnum.BACKEND, grade_id=GradeEnum.SENIOR
+        )
+        self.strong.skills.set([python, django])
+        self.weak = User.objects.create_user(
+            email='weak@example.com', username='weak',
+            role_id=RoleEnum.BACKEND, grade_id=GradeEnum.INTERN
+        )
+        self.weak.skills.set([python])
+        self.frontend = User.objects.create_user(
+            email='front@example.com', username='front',
+            role_id=RoleEnum.FRONTEND, grade_id=GradeEnum.SENIOR
+        )
+        self.frontend.skills.set([Skill.objects.create(code='react', name='React')])
+        User.objects.create_user(
+            email='gone@example.com', username='gone',
+            role_id=RoleEnum.BACKEND, is_active=False
+        )
+
+        self.project = Project.objects.create(name='Shop', author=self.author)
+        self.project.stacks.set([
+            Stack.objects.create(name='Python'), Stack.objects.create(name='Django')
+        ])
+        self.position = ProjectPosition.objects.create(
+            project=self.project, role_id=RoleEnum.BACKEND, grade_id=GradeEnum.SENIOR
+        )
+        self.client.force_authenticate(self.weak)
+
+    def test_candidates_are_ranked(self):
+        url = f'/api/positions/{self.position.id}/candidates/'
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        names = [item['user']['username'] for item in response.json()['results']]
+        # Автор, неактивные и пользователи без общей роли/навыков не предлагаются
+        self.assertEqual(names, ['strong', 'weak'])
+        self.assertEqual(response.json()['results'][0]['score'], 1.0)
+
+        # Индекс уже построен: позиция, пользователи и навыки
+        with self.assertNumQueries(3):
+            self.client.get(url + '?limit=1')
+
+    def test_index_is_updated_incrementally(self):
+        self.client.get('/api/positions/matching/')
+        generation = matching_index.generation
+        # Индекс другого воркера, построенный до записи
+        peer = MatchingIndex()
+        peer.ensure_current()
+
+        # Запись в воркере без своего индекса всё равно сдвигает поколение
+        matching_index.reset()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.frontend.role_id = RoleEnum.BACKEND
+            self.frontend.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.frontend.skills.add(Skill.objects.get(code='python'))
+        self.assertEqual(get_generation('matching'), generation + 2)
+
+        # Пользователь и его навыки — без перестройки индекса
+        with mock.patch.object(peer, 'rebuild') as rebuild:
+            with self.assertNumQueries(2):
+                peer.ensure_current()
+        rebuild.assert_not_called()
+        self.assertEqual(peer.generation, generation + 2)
+        self.assertEqual(
+            [user_id for user_id, _ in peer.candidates_for_position(self.position.id)],
+            [self.strong.id, self.frontend.id, self.weak.id],
+        )
+
+        response = self.client.get(f'/api/positions/{self.position.id}/candidates/')
+        names = [item['user']['username'] for item in response.json()['results']]
+        self.assertEqual(names, ['strong', 'front', 'weak'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.position.count_needed = 0
+            self.position.save()
+        response = self.client.get(f'/api/positions/{self.position.id}/candidates/')
+        self.assertEqual(response.json()['results'], [])
+
+    def test_skill_edits_refresh_its_users(self):
+        peer = MatchingIndex()
+        peer.ensure_current()
+        django = Skill.objects.get(code='django')
+        before = peer.users[self.strong.id]
+
+        with self.captureOnCommitCallbacks(execute=True):
+            django.code, django.name = 'flask', 'Flask'
+            django.save()
+        with mock.patch.object(peer, 'rebuild') as rebuild:
+            peer.ensure_current()
+        rebuild.assert_not_called()
+        renamed = peer.users[self.strong.id]
+        self.assertNotEqual(renamed, before)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            django.delete()
+        with self.captureOnCommitCallbacks(execute=True):
+            Skill.objects.get(code='python').users.clear()
+        with mock.patch.object(peer, 'rebuild') as rebuild:
+            peer.ensure_current()
+        rebuild.assert_not_called()
+        self.assertNotEqual(peer.users[self.strong.id], renamed)
+        self.assertEqual(peer.generation, get_generation('matching'))
+
+    def test_worker_start_warms_index(self):
+        from growhub.gunicorn_conf import post_worker_init
+
+        matching_index.reset()
+        post_worker_init(worker=None)
+        self.assertEqual(matching_index.generation, get_generation('matching'))
+        self.assertIn(self.strong.id, matching_index.users)
+
+    def test_positions_for_user(self):
+        other = Project.objects.create(name='Landing', author=self.weak)
+        other.stacks.set([Stack.objects.get(name='Python')])
+        ProjectPosition.objects.create(project=other, role_id=RoleEnum.BACKEND)
+
+        response = self.client.get('/api/positions/matching/')
+        self.assertEqual(response.status_code, 200)
+        results = response.json()['results']
+        # Позиции в собственных проектах пропускаются
+        self.assertEqual([item['position']['id'] for item in results],
+                         [str(self.position.id)])
+        self.assertEqual(results[0]['position']['role'], 'Backend Developer')
+
+
+class PositionFacetTest(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.author = User.objects.create_user(
+            email='facets@example.com', username='facets'
+        )
+        self.client.force_authenticate(self.author)
+        self.python = Stack.objects.create(name='Python')
+        self.vue = Stack.objects.create(name='Vue')
+
+    def facets(self):
+        data = self.client.get('/api/positions/facets/').json()
+        return {
+            facet: {item['label']: (item['positions'], item['seats']) for item in items}
+            for facet, items in data.items()
+        }
+
+    def test_counters_follow_writes_without_drift(self):
+        response = self.client.post('/api/projects/', {
+            'name': 'Board',
+            'stacks': [str(self.python.id)],
+            'positions_data': [
+                {'role_id': RoleEnum.BACKEND, 'grade_id': GradeEnum.MIDDLE},
+                {'role_id': RoleEnum.BACKEND, 'count_needed': 2},
+                {'role_id': RoleEnum.QA, 'count_needed': 0},
+            ],
+        }, format='json')
+        project = Project.objects.get(pk=response.json()['id'])
+        self.assertEqual(find_drift(), {})
+        facets = self.facets()
+        self.assertEqual(facets['role'], {'Backend Developer': (2, 3)})
+        self.assertEqual(facets['grade']['Middle'], (1, 1))
+        self.assertEqual(facets['stack'], {'Python': (2, 3)})
+
+        backend = project.positions.filter(count_needed=2).get()
+        self.client.put(f'/api/projects/{project.id}/', {
+            'name': 'Board',
+            'stacks': [str(self.vue.id)],
+            'positions_data': [
+                {'id': str(backend.id), 'role_id': RoleEnum.DEVOPS, 'count_needed': 1},
+            ],
+        }, format='json')
+        self.assertEqual(find_drift(), {})
+        self.assertEqual(self.facets()['stack'], {'Vue': (1, 1)})
+
+        position = ProjectPosition.objects.create(
+            project=project, role_id=RoleEnum.DEVOPS, count_needed=4
+        )
+        project.stacks.add(self.python)
+        self.assertEqual(find_drift(), {})
+        self.assertEqual(self.facets()['role'], {'DevOps Engineer': (2, 5)})
+
+        position.count_needed = 0
+        position.save()
+        self.python.projects.clear()
+        self.assertEqual(find_drift(), {})
+        self.assertEqual(self.facets()['stack'], {'Vue': (1, 1)})
+
+        self.vue.delete()
+        project.stacks.add(self.python)
+        position.delete()
+        self.assertEqual(find_drift(), {})
+        project.delete()
+        self.assertEqual(find_drift(), {})
+        self.assertEqual(self.facets(), {'role': {}, 'grade': {}, 'stack': {}})
+
+    def test_project_delete_is_handled_per_project(self):
+        def project_with_positions(size):
+            project = Project.objects.create(name=f'Size {size}', author=self.author)
+            project.stacks.set([self.python, self.vue])
+            ProjectPosition.objects.bulk_create([
+                ProjectPosition(
+                    project=project, role_id=RoleEnum.BACKEND,
+                    grade_id=GradeEnum.MIDDLE, count_needed=index % 3,
+                )
+                for index in range(size)
+            ])
+            return project
+
+        with self.captureOnCommitCallbacks(execute=True):
+            small, large = project_with_positions(2), project_with_positions(40)
+        call_command('rebuild_facets', stdout=StringIO())
+
+        queries = []
+        for project in (small, large):
+            with mock.patch.object(broker, 'publish') as publish:
+                with self.captureOnCommitCallbacks(execute=True), \
+                        CaptureQueriesContext(connection) as captured:
+                    project.delete()
+            queries.append(len(captured))
+            [[event], _] = publish.call_args
+            self.assertEqual(publish.call_count, 1)
+            self.assertEqual(event['type'], 'project.deleted')
+            self.assertEqual(event['roles'], [RoleEnum.BACKEND])
+            self.assertEqual(find_drift(), {})
+        self.assertEqual(queries[0], queries[1])
+        self.assertEqual(self.facets(), {'role': {}, 'grade': {}, 'stack': {}})
+
+        # Каскад от автора: позиции его проектов тоже не считаются по одной
+        project_with_positions(5)
+        call_command('rebuild_facets', stdout=StringIO())
+        self.author.delete()
+        self.assertEqual(find_drift(), {})
+
+    def test_rebuild_command_fixes_drift(self):
+        project = Project.objects.create(name='Drift', author=self.author)
+        ProjectPosition.objects.create(project=project, role_id=RoleEnum.PM)
+        PositionFacet.objects.filter(facet=PositionFacet.ROLE).update(positions=7)
+
+        with self.assertRaises(CommandError):
+            call_command('rebuild_facets', '--check', stdout=StringIO())
+        out = StringIO()
+        call_command('rebuild_facets', stdout=out)
+        self.assertIn('role=pm: stored (7, 1), expected (1, 1)', out.getvalue())
+        self.assertEqual(find_drift(), {})
+
+
+class CatalogEventsTest(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(
+            email='events@example.com', username='events'
+        )
+        self.stack = Stack.objects.create(name='Go')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.project = Project.objects.create(name='Feed', author=self.author)
+            self.project.stacks.set([self.stack])
+
+    def test_changes_publish_events_after_commit(self):
+        with mock.patch.object(broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                position = ProjectPosition.objects.create(
+                    project=self.project, role_id=RoleEnum.BACKEND
+                )
+                position.grade_id = GradeEnum.MIDDLE
+                position.save()
+                self.assertFalse(publish.called)
+            # Две записи позиции в транзакции — одно событие
+            [[event], _] = publish.call_args
+            self.assertEqual(event['type'], 'position.created')
+            self.assertEqual(event['grades'], [GradeEnum.MIDDLE])
+            self.assertEqual(event['stacks'], [str(self.stack.id)])
+
+            publish.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                position.role_id = RoleEnum.QA
+                position.save()
+            [[event], _] = publish.call_args
+            # Позиция ушла из фильтра backend: подписчик должен узнать
+            self.assertEqual(event['roles'], sorted([RoleEnum.BACKEND, RoleEnum.QA]))
+
+            publish.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.project.name = 'Renamed'
+                self.project.save()
+                self.project.delete()
+            types = [event['type'] for [event], _ in publish.call_args_list]
+            self.assertEqual(sorted(types), ['project.deleted'])
+            project_event = publish.call_args_list[types.index('project.deleted')][0][0]
+            self.assertEqual(project_event['roles'], [RoleEnum.QA])
+            self.assertEqual(project_event['stacks'], [str(self.stack.id)])
+
+    def test_position_sync_publishes_one_project_event(self):
+        ProjectPosition.objects.bulk_create([
+            ProjectPosition(project=self.project, role_id=RoleEnum.QA)
+            for _ in range(30)
+        ])
+        client = APIClient()
+        client.force_authenticate(self.author)
+        with mock.patch.object(broker, 'publish') as publish:
+            with self.captureOnCommitCallbacks(execute=True):
+                response = client.put(f'/api/projects/{self.project.id}/', {
+                    'name': 'Feed',
+                    'positions_data': [{'role_id': RoleEnum.BACKEND}],
+                }, format='json')
+            self.assertEqual(response.status_code, 200)
+        # Удалённые позиции QA — в том же событии, без position.deleted
+        [[event], _] = publish.call_args
+        self.assertEqual(publish.call_count, 1)
+        self.assertEqual(event['type'], 'project.updated')
+        self.assertEqual(event['roles'], sorted([RoleEnum.BACKEND, RoleEnum.QA]))
+
+    async def test_stream_delivers_matching_events(self):
+        factory = AsyncRequestFactory()
+        response = await catalog_events(factory.get(
+            f'/api/events/?role={RoleEnum.BACKEND}&stack={self.stack.id}'
+        ))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+
+        event = {'type': 'position.created', 'stacks': [str(self.stack.id)]}
+        broker.publish({**event, 'roles': [RoleEnum.QA]})
+        broker.publish({**event, 'roles': [RoleEnum.BACKEND]})
+        chunk = await anext(stream)
+        self.assertIn(b'event: position.created', chunk)
+        self.assertIn(RoleEnum.BACKEND.encode(), chunk)
+        await stream.aclose()
+        last_id = broker.buffer[-1]['id']
+
+        # Переподключение досылает пропущенное из буфера
+        broker.publish({**event, 'type': 'project.updated'})
+        response = await catalog_events(factory.get(
+            '/api/events/', headers={'Last-Event-ID': str(last_id)}
+        ))
+        stream = aiter(response.streaming_content)
+        await anext(stream)
+        self.assertIn(b'event: project.updated', await anext(stream))
+        await stream.aclose()
+
+    def test_invalid_filters_and_wsgi(self):
+        response = self.client.get('/api/events/?role=wizard')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('role', response.json())
+        # Под WSGI поток занял бы воркер целиком
+        response = self.client.get(f'/api/events/?project={self.project.id}')
+        self.assertEqual(response.status_code, 501)
+
+    def test_cache_backend_shares_numbering(self):
+        cache.clear()
+        publisher, receiver = Broker(), Broker()
+        publisher._backend = CacheBackend(publisher)
+        receiver._backend = backend = CacheBackend(receiver)
+        backend.last_id = 0
+        for index in range(3):
+            publisher.publish({'type': 'project.updated', 'index': index})
+        self.assertIsNone(backend.poll())
+        self.assertEqual([event['id'] for event in receiver.buffer], [1, 2, 3])
+        self.assertEqual(receiver.buffer[-1]['index'], 2)
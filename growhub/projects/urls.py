@@ -1,5 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
+from .events import catalog_events
 from .views import ProjectViewSet, ProjectPositionViewSet, StackViewSet
 
 router = DefaultRouter()
@@ -8,5 +9,6 @@ router.register(r'positions', ProjectPositionViewSet, basename='position')
 router.register(r'stacks', StackViewSet, basename='stack')  # новый эндпоинт
 
 urlpatterns = [
+    path('events/', catalog_events, name='catalog-events'),
     path('', include(router.urls)),
 ]
@@ -1,9 +1,18 @@
-from rest_framework import viewsets, permissions, filters
+from rest_framework import viewsets, permissions
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 
+from growhub.async_views import AsyncReadMixin
+from growhub.conditional import ConditionalRetrieveMixin
+from growhub.response_cache import CachedResponseMixin
+from growhub.search import FullTextSearchFilter, RankedOrderingFilter
+from growhub.values_read import ValuesReadMixin
+from users.models import User
+from users.serializers import UserReadSerializer
+from .facets import facet_summary
+from .matching import matching_index
 from .models import Project, ProjectPosition, Stack
 from .serializers import (ProjectReadSerializer,
                           ProjectWriteSerializer, ProjectPositionWriteSerializer,
@@ -14,7 +23,7 @@ class IsAuthorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.author == request.user
+        return obj.author_id == request.user.pk
 
 
 class IsProjectAuthorOrReadOnly(permissions.BasePermission):
@@ -24,18 +33,25 @@ class IsProjectAuthorOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj.project.author == request.user
-
-
-class ProjectViewSet(viewsets.ModelViewSet):
-    queryset = Project.objects.all().prefetch_related('stacks', 'positions', 'author')
+        return obj.project.author_id == request.user.pk
+
+
+class ProjectViewSet(
+    CachedResponseMixin,
+    ConditionalRetrieveMixin,
+    ValuesReadMixin,
+    AsyncReadMixin,
+    viewsets.ModelViewSet
+):
+    cache_namespace = 'projects'
+    queryset = Project.objects.for_read()
     filter_backends = [
         DjangoFilterBackend,
-        filters.SearchFilter,
-        filters.OrderingFilter
+        FullTextSearchFilter,
+        RankedOrderingFilter
     ]
     filterset_fields = ['stacks', 'positions__role_id', 'positions__grade_id']
-    search_fields = ['name', 'description', 'author__username']
+    # Поиск по тексту (?search=) идёт по search_document, см. projects.search
     ordering_fields = ['created_at', 'name']
     ordering = ['-created_at']
 
@@ -53,20 +69,23 @@ class ProjectViewSet(viewsets.ModelViewSet):
         serializer.save(author=self.request.user)
 
     def create(self, request, *args, **kwargs):
-        response = super().create(request, *args, **kwargs)
-        project = Project.objects.get(pk=response.data['id'])
-        return Response(ProjectReadSerializer(
-            project,
-            context={'request': request}
-        ).data)
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        self.perform_create(serializer)
+        project = Project.objects.for_read().get(pk=serializer.instance.pk)
+        return Response(
+            ProjectReadSerializer(project, context={'request': request}).data
+        )
 
     def update(self, request, *args, **kwargs):
+        partial = kwargs.pop('partial', False)
         project = self.get_object()
+        serializer = self.get_serializer(project, data=request.data, partial=partial)
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        project = Project.objects.for_read().get(pk=project.pk)
         return Response(
-            ProjectReadSerializer(
-                project,
-                context={'request': request}
-            ).data
+            ProjectReadSerializer(project, context={'request': request}).data
         )
 
     @action(
@@ -75,18 +94,22 @@ class ProjectViewSet(viewsets.ModelViewSet):
         permission_classes=[permissions.IsAuthenticated]
     )
     def my(self, request):
-        projects = self.queryset.filter(author=request.user)
-        serializer = self.get_serializer(projects, many=True)
-        return Response(serializer.data)
+        return self.list_response(self.filter_queryset(
+            self.get_queryset().filter(author_id=request.user.pk)
+        ))
 
 
-class ProjectPositionViewSet(viewsets.ModelViewSet):
+class ProjectPositionViewSet(ValuesReadMixin, viewsets.ModelViewSet):
     queryset = ProjectPosition.objects.select_related('project').all()
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['role_id', 'grade_id']
+    ordering = ['id']
+    match_limit = 10
+    max_match_limit = 50
+    candidate_fields = ['id', 'username', 'role_id', 'grade_id', 'skills']
 
     def get_serializer_class(self):
-        if self.action in ['list', 'retrieve', 'my']:
+        if self.action in ['list', 'retrieve', 'my', 'matching']:
             return ProjectPositionReadSerializer
         return ProjectPositionWriteSerializer
 
@@ -104,15 +127,76 @@ class ProjectPositionViewSet(viewsets.ModelViewSet):
         """
         Вернуть только позиции в проектах, созданных текущим пользователем
         """
-        positions = self.queryset.filter(project__author=request.user)
-        serializer = self.get_serializer(positions, many=True)
-        return Response(serializer.data)
-
+        return self.list_response(self.filter_queryset(
+            self.get_queryset().filter(project__author_id=request.user.pk)
+        ))
+
+    def get_match_limit(self):
+        try:
+            limit = int(self.request.query_params.get('limit', self.match_limit))
+        except ValueError:
+            limit = self.match_limit
+        return max(1, min(limit, self.max_match_limit))
+
+    @action(detail=True, methods=["get"])
+    def candidates(self, request, pk=None):
+        """
+        Лучшие кандидаты на позицию по роли, грейду и навыкам (?limit=)
+        """
+        position = self.get_object()
+        ranked = matching_index.candidates_for_position(
+            position.pk, self.get_match_limit()
+        )
+        users = User.objects.for_read(expand=['skills']).in_bulk(
+            [user_id for user_id, _ in ranked]
+        )
+        results = [
+            {
+                'score': score,
+                'user': UserReadSerializer(
+                    users[user_id], fields=self.candidate_fields
+                ).data,
+            }
+            for user_id, score in ranked if user_id in users
+        ]
+        return Response({'position_id': position.pk, 'results': results})
+
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """
+        Число открытых позиций по ролям, грейдам и стекам
+        """
+        return Response(facet_summary())
 
-class StackViewSet(viewsets.ReadOnlyModelViewSet):
+    @action(detail=False, methods=["get"])
+    def matching(self, request):
+        """
+        Открытые позиции, подходящие текущему пользователю (?limit=)
+        """
+        ranked = matching_index.positions_for_user(
+            request.user.pk, self.get_match_limit()
+        )
+        positions = self.get_queryset().in_bulk(
+            [position_id for position_id, _ in ranked]
+        )
+        results = [
+            {
+                'score': score,
+                'position': ProjectPositionReadSerializer(positions[position_id]).data,
+            }
+            for position_id, score in ranked if position_id in positions
+        ]
+        return Response({'results': results})
+
+
+class StackViewSet(
+    CachedResponseMixin, AsyncReadMixin, viewsets.ReadOnlyModelViewSet
+):
     """
     Только чтение: просмотр доступных стеков
     """
+    cache_namespace = 'stacks'
     queryset = Stack.objects.all()
     serializer_class = StackSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    ordering = ['name']
@@ -1,6 +1,4 @@
 from django.apps import AppConfig
-from django.contrib.auth import get_user_model
-from growhub.settings import SUPERUSER_NAME, SUPERUSER_PASSWORD
 
 
 class UsersConfig(AppConfig):
@@ -8,14 +6,6 @@ class UsersConfig(AppConfig):
     name = 'users'
 
     def ready(self):
-        User = get_user_model()
-        username = SUPERUSER_NAME
-        password = SUPERUSER_PASSWORD
-        email = f'{username}@example.com'
-
-        if not User.objects.filter(username=username).exists():
-            User.objects.create_superuser(
-                username=username,
-                email=email,
-                password=password
-            )
+        # Только регистрация обработчиков: запросы к базе при старте
+        # процесса недопустимы (суперпользователь — ensure_superuser)
+        from . import signals  # noqa: F401
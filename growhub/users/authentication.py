@@ -0,0 +1,177 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.functional import SimpleLazyObject, empty
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from growhub.replicas import use_primary
+
+from .models import User
+
+
+class UserStatusCache:
+    """
+    In-process кэш (TTL) статуса пользователя для проверки токена:
+    активен ли он, хэш пароля для отзыва токенов после его смены и
+    права (is_staff, is_superuser) для сверки с claims.
+    """
+
+    def __init__(self, ttl, max_size=10000):
+        self.ttl = ttl
+        self.max_size = max_size
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        # Не с реплики: токен только что созданного пользователя или
+        # после смены пароля проверяется по актуальной строке
+        with use_primary():
+            row = User.objects.filter(pk=user_id).values_list(
+                'is_active', 'password', 'is_staff', 'is_superuser'
+            ).first()
+        status = None
+        if row is not None:
+            is_active, password, is_staff, is_superuser = row
+            status = (
+                is_active, get_md5_hash_password(password), is_staff, is_superuser
+            )
+
+        with self.lock:
+            self.entries[user_id] = (now + self.ttl, status)
+            self.entries.move_to_end(user_id)
+            while len(self.entries) > self.max_size:
+                self.entries.popitem(last=False)
+        return status
+
+    def invalidate(self, user_id):
+        with self.lock:
+            self.entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+user_status_cache = UserStatusCache(
+    ttl=getattr(settings, 'JWT_USER_STATUS_TTL', 60)
+)
+
+
+class ClaimsUser(SimpleLazyObject):
+    """
+    Пользователь из подписанных claims токена.
+
+    id, is_staff, is_superuser, is_active и role_id берутся из токена;
+    строка User загружается из БД только при обращении к остальным
+    атрибутам (или когда объект нужен как модель, например для FK).
+    """
+
+    def __init__(self, token):
+        user_id = token[api_settings.USER_ID_CLAIM]
+        super().__init__(lambda: User.objects.get(pk=user_id))
+        self.__dict__['token'] = token
+
+    def _claim(self, name):
+        token = self.__dict__['token']
+        if name in token:
+            return token[name]
+        # Токен выпущен до появления claim — берём значение из БД
+        if self._wrapped is empty:
+            self._setup()
+        return getattr(self._wrapped, name)
+
+    @property
+    def id(self):
+        return uuid.UUID(str(self.__dict__['token'][api_settings.USER_ID_CLAIM]))
+
+    pk = id
+
+    @property
+    def is_staff(self):
+        return self._claim('is_staff')
+
+    @property
+    def is_superuser(self):
+        return self._claim('is_superuser')
+
+    @property
+    def is_active(self):
+        return self._claim('is_active')
+
+    @property
+    def role_id(self):
+        return self._claim('role_id')
+
+    @property
+    def is_authenticated(self):
+        return True
+
+    @property
+    def is_anonymous(self):
+        return False
+
+    @property
+    def is_loaded(self):
+        return self._wrapped is not empty
+
+    def __bool__(self):
+        return True
+
+    def __eq__(self, other):
+        return self.pk == getattr(other, 'pk', None)
+
+    def __hash__(self):
+        return hash(self.pk)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT-аутентификация без чтения строки User на каждый запрос:
+    возвращает ClaimsUser, а активность, отзыв токена и права из
+    claims проверяет по кэшу статусов (user_status_cache).
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = str(validated_token[api_settings.USER_ID_CLAIM])
+        except KeyError:
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        status = user_status_cache.get(user_id)
+        if status is None:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+
+        is_active, password_hash, is_staff, is_superuser = status
+        if api_settings.CHECK_USER_IS_ACTIVE and not is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != password_hash:
+            raise AuthenticationFailed(
+                _("The user's password has been changed."), code='password_changed'
+            )
+
+        # Права в токене выданы при входе: после их снятия (или выдачи)
+        # токен отклоняется, клиент получает новый с актуальными claims
+        for name, value in (('is_staff', is_staff), ('is_superuser', is_superuser)):
+            if validated_token.get(name, value) != value:
+                raise AuthenticationFailed(
+                    _("The user's permissions have changed."),
+                    code='permissions_changed',
+                )
+
+        return ClaimsUser(validated_token)
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+
+from growhub.export import Exporter
+from .models import User
+from .serializers import UserReadSerializer
+
+
+class UserExportSerializer(UserReadSerializer):
+    date_joined = serializers.DateTimeField(read_only=True)
+    updated_at = serializers.DateTimeField(read_only=True)
+
+    class Meta(UserReadSerializer.Meta):
+        fields = UserReadSerializer.Meta.fields + ['date_joined', 'updated_at']
+        read_only_fields = fields
+
+
+class UserExporter(Exporter):
+    """
+    Профили активных пользователей с навыками и опытом.
+    """
+    serializer_class = UserExportSerializer
+
+    def get_queryset(self):
+        return User.objects.filter(is_active=True).for_read()
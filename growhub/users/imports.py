@@ -0,0 +1,122 @@
+from django.contrib.auth.hashers import identify_hasher, make_password
+from django.core.exceptions import ValidationError
+
+from growhub.bulk import insert_objects, insert_rows
+from growhub.importer import (
+    Importer, clean_fields, parse_list, reference, unique_conflicts, upsert_catalog
+)
+from growhub.response_cache import invalidate
+from growhub.search import update_search_vectors
+from projects.matching import schedule_refresh
+from .models import Skill, User
+from .search import DOCUMENT_FIELDS, user_document
+from .signals import users_changed_later
+
+USER_FIELDS = [
+    'email', 'username', 'telegram', 'avatar', 'github', 'linkedin', 'resume',
+    'info', 'role_id', 'grade_id',
+]
+USER_UNIQUE_FIELDS = ['email', 'username', 'telegram']
+
+
+def clean_skill_codes(value):
+    code_field = Skill._meta.get_field('code')
+    codes = []
+    for item in parse_list(value):
+        codes.append(code_field.clean(reference(item, 'code'), None))
+    return list(dict.fromkeys(codes))
+
+
+class SkillImporter(Importer):
+    """
+    Справочник навыков: upsert по code ({"code": ..., "name": ...}).
+    """
+
+    def clean_row(self, row):
+        # Без name навык называется своим кодом
+        row = {**row, 'name': row.get('name') or row.get('code')}
+        return clean_fields(Skill, row, ['code', 'name'])
+
+    def write_batch(self, rows):
+        result = upsert_catalog(
+            Skill, 'code', {row['code']: row['name'] for row in rows}, 'name'
+        )
+        if result.changed:
+            # Название навыка входит в поисковый документ профиля
+            # и в маску подбора его пользователей
+            user_ids = list(User.skills.through.objects.filter(
+                skill_id__in=result.changed
+            ).values_list('user_id', flat=True).distinct())
+            users_changed_later(
+                User.objects.filter(pk__in=user_ids), {'skill_ids': result.changed}
+            )
+            schedule_refresh(users=user_ids)
+        if result.created or result.changed:
+            invalidate('skills')
+        return result.created, len(result.changed)
+
+
+class UserImporter(Importer):
+    """
+    Новые пользователи: поля профиля, skills — коды навыков (недостающие
+    навыки создаются), password — готовый хэш Django; без него пароль
+    непригоден до сброса. Существующие email/username/telegram — ошибка строки.
+    """
+    # Крупные пачки: меньше коммитов и запросов к справочникам
+    batch_size = 5000
+
+    def clean_row(self, row):
+        errors = {}
+        try:
+            values = clean_fields(User, row, USER_FIELDS)
+            values['email'] = User.objects.normalize_email(values['email'])
+        except ValidationError as exc:
+            errors, values = exc.message_dict, {}
+        try:
+            values['skills'] = clean_skill_codes(row.get('skills'))
+        except ValidationError as exc:
+            errors['skills'] = exc.messages
+
+        password = row.get('password')
+        if password:
+            try:
+                identify_hasher(password)
+            except ValueError:
+                errors['password'] = ['Expected a Django password hash']
+        values['password'] = password or None
+
+        if errors:
+            raise ValidationError(errors)
+        return values
+
+    def check_batch(self, rows):
+        return unique_conflicts(User, rows, USER_UNIQUE_FIELDS)
+
+    def write_batch(self, rows):
+        skills = upsert_catalog(
+            Skill, 'code', {code: None for row in rows for code in row['skills']},
+            'name',
+        )
+        # Непригодный пароль один на пачку: make_password(None) не дёшев
+        unusable_password = make_password(None)
+        users, links = [], []
+        for row in rows:
+            codes = row.pop('skills')
+            row['password'] = row['password'] or unusable_password
+            # Поисковый документ собирается сразу, без второго прохода
+            # по вставленным строкам (см. users.search)
+            user = User(**row, search_document=user_document(
+                [row.get(field) for field in DOCUMENT_FIELDS],
+                [part for code in codes for part in (code, skills.values[code])],
+            ))
+            users.append(user)
+            links += [(user.pk, skills.ids[code]) for code in codes]
+        insert_objects(users)
+        insert_rows(User.skills.through, ['user', 'skill'], links)
+        if skills.created:
+            invalidate('skills')
+
+        user_ids = [user.pk for user in users]
+        update_search_vectors(User.objects.filter(pk__in=user_ids))
+        schedule_refresh(users=user_ids)
+        return len(users), 0
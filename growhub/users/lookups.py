@@ -0,0 +1,5 @@
+from growhub.lookups import LookupTable
+from .models import Skill
+
+# Поколение 'skills' сдвигают сигналы навыков и импорт (users.imports)
+skill_lookup = LookupTable('skills', Skill.objects.all(), ['id', 'code', 'name'])
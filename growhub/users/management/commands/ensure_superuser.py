@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт суперпользователя SUPERUSER_NAME, если его нет. '
+        'Запускается один раз на деплой, после migrate'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--username', default=settings.SUPERUSER_NAME)
+        parser.add_argument('--email')
+
+    def handle(self, *args, **options):
+        username = options['username']
+        if not username or not settings.SUPERUSER_PASSWORD:
+            raise CommandError('SUPERUSER_NAME и SUPERUSER_PASSWORD не заданы')
+
+        # Существующий пользователь не трогается: пароль могли сменить
+        if User.objects.filter(username=username).exists():
+            self.stdout.write(f'Superuser {username} already exists')
+            return
+        try:
+            User.objects.create_superuser(
+                username=username,
+                email=options['email'] or f'{username}@example.com',
+                password=settings.SUPERUSER_PASSWORD,
+            )
+        except IntegrityError:
+            # Параллельный деплой успел создать его первым
+            self.stdout.write(f'Superuser {username} already exists')
+            return
+        self.stdout.write(f'Created superuser {username}')
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.4 on 2026-10-18 17:07
+
+from collections import defaultdict
+
+import django.contrib.postgres.search
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+
+INDEX_NAME = 'user_search_vector_gin'
+
+
+def create_search_index(apps, schema_editor):
+    # GIN-индекс есть только в PostgreSQL, в SQLite поиск идёт по тексту
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(
+            f'CREATE INDEX {INDEX_NAME} ON users_user USING gin (search_vector)'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+def fill_search_documents(apps, schema_editor):
+    # Документ собирается здесь, а не через users.search: миграция
+    # должна повторяться одинаково при любых правках модуля и модели
+    User = apps.get_model('users', 'User')
+    UserSkills = User._meta.get_field('skills').remote_field.through
+
+    skills = defaultdict(list)
+    for user_id, code, name in UserSkills.objects.values_list(
+        'user_id', 'skill__code', 'skill__name'
+    ):
+        skills[user_id] += [code, name]
+
+    fields = ['username', 'email', 'telegram', 'github', 'linkedin']
+    rows = User.objects.values_list('id', *fields)
+    User.objects.bulk_update(
+        [
+            User(id=pk, search_document=' '.join(filter(None, [*values, *skills[pk]])))
+            for pk, *values in rows
+        ],
+        ['search_document'], batch_size=1000,
+    )
+    if schema_editor.connection.vendor == 'postgresql':
+        User.objects.update(
+            search_vector=SearchVector('search_document', config='simple')
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0005_experience'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(fill_search_documents, migrations.RunPython.noop),
+    ]
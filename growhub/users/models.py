@@ -2,11 +2,25 @@ import uuid
 
 from django.contrib.auth.base_user import AbstractBaseUser, BaseUserManager
 from django.contrib.auth.models import PermissionsMixin
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import URLValidator
 from django.db import models
 
 
-class UserManager(BaseUserManager):
+class UserQuerySet(models.QuerySet):
+    def for_read(self, expand=('skills', 'experiences')):
+        """
+        Выборка для чтения профилей: вложенные коллекции
+        подгружаются пачкой, одним запросом на каждую. У навыков
+        читаются только id: строки берутся из users.lookups.
+        """
+        lookups = {
+            'skills': models.Prefetch('skills', queryset=Skill.objects.only('id')),
+        }
+        return self.prefetch_related(*(lookups.get(name, name) for name in expand))
+
+
+class UserManager(BaseUserManager.from_queryset(UserQuerySet)):
     use_in_migrations = True
 
     def create_user(self, email, username, password=None, **extra_fields):
@@ -82,6 +96,11 @@ class User(AbstractBaseUser, PermissionsMixin):
         default=GradeEnum.NOT_SELECTED
     )
     date_joined = models.DateTimeField(auto_now_add=True)
+    # Версия для ETag/Last-Modified: меняется и при правке опыта/навыков
+    updated_at = models.DateTimeField(auto_now=True)
+    # Поисковый документ: контакты и навыки (см. users.search)
+    search_document = models.TextField(blank=True, default='', editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
 
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=True)
@@ -92,6 +111,13 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     objects = UserManager()
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['-date_joined', 'id'], name='user_joined_id_idx'),
+            models.Index(fields=['role_id', 'grade_id'], name='user_role_grade_idx'),
+            models.Index(fields=['grade_id'], name='user_grade_idx'),
+        ]
+
     def __str__(self):
         return self.email
 
@@ -107,6 +133,14 @@ class Experience(models.Model):
     start_date = models.DateField()
     end_date = models.DateField(blank=True, null=True)
     description = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['user', '-start_date', 'id'], name='experience_user_start_idx'
+            ),
+        ]
 
     def __str__(self):
         return f"{self.position} at {self.company}"
@@ -0,0 +1,45 @@
+from collections import defaultdict
+
+from growhub.search import update_search_vectors
+
+BATCH_SIZE = 1000
+
+DOCUMENT_FIELDS = ['username', 'email', 'telegram', 'github', 'linkedin']
+
+
+def user_document(values, skills):
+    """
+    Текст документа из значений DOCUMENT_FIELDS и кодов/названий навыков.
+    """
+    return ' '.join(filter(None, [*values, *skills]))
+
+
+def build_user_documents(users):
+    """
+    Собирает текст поискового документа для каждого пользователя выборки:
+    {user_id: 'username email ... skill ...'}.
+    """
+    User = users.model
+    skills = defaultdict(list)
+    links = User.skills.through.objects.filter(
+        user__in=users.values('id')
+    ).values_list('user_id', 'skill__code', 'skill__name')
+    for user_id, code, name in links:
+        skills[user_id] += [code, name]
+
+    rows = users.values_list('id', *DOCUMENT_FIELDS)
+    return {
+        user_id: user_document(values, skills[user_id])
+        for user_id, *values in rows
+    }
+
+
+def refresh_user_documents(users):
+    documents = build_user_documents(users)
+    User = users.model
+    instances = [
+        User(id=user_id, search_document=document)
+        for user_id, document in documents.items()
+    ]
+    User.objects.bulk_update(instances, ['search_document'], batch_size=BATCH_SIZE)
+    update_search_vectors(users)
@@ -1,7 +1,32 @@
+from django.db import transaction
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+
+from growhub.bulk import sync_related
+from growhub.lookups import LookupIdsField, LookupRelatedField
+from growhub.metrics import TimedSerializerMixin
+from .lookups import skill_lookup
 from .models import User, RoleEnum, GradeEnum, Skill, Experience
 
 
+class ChoiceLabelField(serializers.ReadOnlyField):
+    """
+    Отдаёт человекочитаемое значение enum-поля из заранее
+    построенного словаря, без вызова get_*_display на каждой строке.
+    """
+
+    def __init__(self, choices, **kwargs):
+        self.labels = dict(choices)
+        super().__init__(**kwargs)
+
+    def to_representation(self, value):
+        return self.labels.get(value, value)
+
+    def values_converter(self):
+        # Для режима values (growhub.values_read)
+        return lambda value: self.labels.get(value, value)
+
+
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True)
 
@@ -18,13 +43,29 @@ class RegisterSerializer(serializers.ModelSerializer):
         return user
 
 
-class SkillSerializer(serializers.ModelSerializer):
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """
+    Кладёт в токен claims, по которым ClaimsJWTAuthentication
+    строит пользователя без запроса к БД.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['is_staff'] = user.is_staff
+        token['is_superuser'] = user.is_superuser
+        token['is_active'] = user.is_active
+        token['role_id'] = user.role_id
+        return token
+
+
+class SkillSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     class Meta:
         model = Skill
         fields = ['id', 'code', 'name']
 
 
-class ExperienceSerializer(serializers.ModelSerializer):
+class ExperienceSerializer(TimedSerializerMixin, serializers.ModelSerializer):
     id = serializers.UUIDField(read_only=True)
 
     class Meta:
@@ -32,8 +73,17 @@ class ExperienceSerializer(serializers.ModelSerializer):
         fields = ['id', 'company', 'position', 'start_date', 'end_date', 'description']
 
 
-class UserReadSerializer(serializers.ModelSerializer):
-    skills = SkillSerializer(many=True)
+class ExperienceItemSerializer(ExperienceSerializer):
+    """
+    Опыт внутри профиля: id необязателен и служит для сопоставления
+    с уже существующей записью при обновлении.
+    """
+    id = serializers.UUIDField(required=False)
+
+
+class UserReadSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    # Навыки рендерятся из справочника в памяти: из базы — только id связей
+    skills = LookupRelatedField(skill_lookup)
     experiences = ExperienceSerializer(many=True)
 
     class Meta:
@@ -44,16 +94,26 @@ class UserReadSerializer(serializers.ModelSerializer):
             'role_id', 'grade_id', 'skills', 'experiences'
         ]
         read_only_fields = fields
+        expandable_fields = ['skills', 'experiences']
+
+    def __init__(self, *args, **kwargs):
+        # Позволяет отдать только часть полей (?fields= / ?expand=)
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
 
 
 class UserWriteSerializer(serializers.ModelSerializer):
     role_id = serializers.ChoiceField(choices=RoleEnum.choices)
     grade_id = serializers.ChoiceField(choices=GradeEnum.choices)
-    skills = serializers.ListField(
-        child=serializers.UUIDField(),
-        required=False
-    )
-    experiences = ExperienceSerializer(many=True, required=False)
+    skills = LookupIdsField(skill_lookup, required=False)
+    experiences = ExperienceItemSerializer(many=True, required=False)
+
+    EXPERIENCE_FIELDS = [
+        'company', 'position', 'start_date', 'end_date', 'description'
+    ]
 
     class Meta:
         model = User
@@ -63,6 +123,7 @@ class UserWriteSerializer(serializers.ModelSerializer):
             'role_id', 'grade_id', 'skills', 'experiences'
         ]
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         skill_ids = validated_data.pop('skills', None)
         experiences = validated_data.pop('experiences', None)
@@ -71,13 +132,13 @@ class UserWriteSerializer(serializers.ModelSerializer):
 
         # обработка скиллов
         if skill_ids is not None:
-            skills = Skill.objects.filter(id__in=skill_ids)
-            instance.skills.set(skills)
+            instance.skills.set(skill_ids)
 
-        # обработка опыта
+        # обработка опыта: сверка по id, изменения пачками
         if experiences is not None:
-            instance.experiences.all().delete()
-            for exp_data in experiences:
-                Experience.objects.create(user=instance, **exp_data)
+            self.experiences_result = sync_related(
+                instance.experiences.all(), experiences,
+                self.EXPERIENCE_FIELDS, user=instance
+            )
 
         return instance
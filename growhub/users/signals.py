@@ -0,0 +1,106 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from growhub.bulk import is_syncing
+from growhub.response_cache import invalidate
+from jobs.queue import enqueue
+
+from .authentication import user_status_cache
+from .models import User, Skill, Experience
+from .search import DOCUMENT_FIELDS, refresh_user_documents
+
+USER_DOCUMENT_FIELDS = set(DOCUMENT_FIELDS)
+
+
+def _touches(update_fields, fields):
+    return update_fields is None or bool(fields & set(update_fields))
+
+
+def users_changed(users):
+    """
+    Вложенные данные профилей изменились: пересобрать поисковые
+    документы и сдвинуть updated_at (версию для ETag).
+    """
+    refresh_user_documents(users)
+    users.update(updated_at=timezone.now())
+
+
+def users_changed_later(users, payload, dedup_key=None):
+    """
+    Как users_changed, но для правок, задевающих много профилей
+    (навык): документы пересобирает фоновая задача (users.tasks).
+    """
+    users.update(updated_at=timezone.now())
+    enqueue('users.refresh_documents', payload, dedup_key=dedup_key)
+
+
+@receiver(post_save, sender=User)
+def user_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or not _touches(update_fields, USER_DOCUMENT_FIELDS):
+        return
+    refresh_user_documents(User.objects.filter(pk=instance.pk))
+
+
+@receiver(m2m_changed, sender=User.skills.through)
+def user_skills_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            users_changed(User.objects.filter(pk=instance.pk))
+        return
+
+    # Обратная сторона: skill.users.add/remove/clear
+    if action == 'pre_clear':
+        instance._cleared_user_ids = list(instance.users.values_list('id', flat=True))
+    elif action in ('post_add', 'post_remove'):
+        users_changed(User.objects.filter(pk__in=pk_set))
+    elif action == 'post_clear':
+        user_ids = getattr(instance, '_cleared_user_ids', [])
+        users_changed(User.objects.filter(pk__in=user_ids))
+
+
+@receiver(post_save, sender=Skill)
+def skill_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or created:
+        return
+    users_changed_later(
+        User.objects.filter(skills=instance), {'skill_ids': [instance.pk]},
+        dedup_key=f'users.documents:skill:{instance.pk}',
+    )
+
+
+@receiver(pre_delete, sender=Skill)
+def skill_deleting(sender, instance, **kwargs):
+    instance._deleted_user_ids = list(instance.users.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Skill)
+def skill_deleted(sender, instance, **kwargs):
+    user_ids = getattr(instance, '_deleted_user_ids', [])
+    if user_ids:
+        users_changed_later(
+            User.objects.filter(pk__in=user_ids), {'user_ids': user_ids}
+        )
+
+
+@receiver(post_save, sender=Skill)
+@receiver(post_delete, sender=Skill)
+def invalidate_skill_lookup(sender, **kwargs):
+    # Справочник навыков в памяти процессов (users.lookups)
+    invalidate('skills')
+
+
+@receiver(post_save, sender=Experience)
+@receiver(post_delete, sender=Experience)
+def experience_changed(sender, instance, raw=False, **kwargs):
+    # При сверке опыта (sync_related) updated_at сдвигает save() профиля
+    if raw or is_syncing(Experience, instance.user_id):
+        return
+    User.objects.filter(pk=instance.user_id).update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_status_changed(sender, instance, **kwargs):
+    # Остальные процессы увидят изменение по истечении JWT_USER_STATUS_TTL
+    user_status_cache.invalidate(instance.pk)
@@ -0,0 +1,19 @@
+from jobs.queue import task
+from .models import User
+from .search import refresh_user_documents
+
+
+@task('users.refresh_documents')
+def refresh_documents(user_ids=None, skill_ids=None):
+    """
+    Поисковые документы профилей после правки навыков. Владельцы
+    навыков выбираются в момент выполнения.
+    """
+    users = User.objects.all()
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+    if skill_ids is not None:
+        users = users.filter(pk__in=User.skills.through.objects.filter(
+            skill_id__in=skill_ids
+        ).values('user_id'))
+    refresh_user_documents(users)
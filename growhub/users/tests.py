@@ -1,3 +1,314 @@
-from django.test import TestCase
+import datetime
+import uuid
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from .authentication import user_status_cache
+from growhub.lookups import LookupTable
+from .lookups import skill_lookup
+from .models import User, Skill, Experience
+from .serializers import ClaimsTokenObtainPairSerializer, UserWriteSerializer
+
+
+class UserListQueryBudgetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.skills = [
+            Skill.objects.create(code=f'skill-{i}', name=f'Skill {i}')
+            for i in range(3)
+        ]
+        cls.viewer = cls.create_users(1)[0]
+
+    @classmethod
+    def create_users(cls, count, offset=0):
+        users = []
+        for i in range(offset, offset + count):
+            user = User.objects.create_user(
+                email=f'user-{i}@example.com', username=f'user-{i}'
+            )
+            user.skills.set(cls.skills)
+            Experience.objects.create(
+                user=user,
+                company='GrowHub',
+                position='Developer',
+                start_date=datetime.date(2024, 1, 1)
+            )
+            users.append(user)
+        return users
+
+    def setUp(self):
+        # Справочник навыков загружается один раз на процесс, не на запрос
+        skill_lookup.current()
+        self.client = APIClient()
+        self.client.force_authenticate(self.viewer)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context), response.json()
+
+    def test_user_list_query_count_is_constant(self):
+        self.create_users(2, offset=1)
+        small, _ = self.count_queries('/api/users/?page_size=100')
+        self.create_users(20, offset=3)
+        large, data = self.count_queries('/api/users/?page_size=100')
+
+        self.assertEqual(small, large)
+        self.assertEqual(len(data['results']), 23)
+        self.assertEqual(len(data['results'][0]['skills']), 3)
+        self.assertEqual(len(data['results'][0]['experiences']), 1)
+
+    def test_fields_and_expand_skip_nested_collections(self):
+        full, _ = self.count_queries('/api/users/')
+        short, data = self.count_queries(
+            '/api/users/?fields=id,username,role_id,grade_id'
+        )
+        self.assertEqual(short, full - 2)
+        self.assertEqual(
+            set(data['results'][0]), {'id', 'username', 'role_id', 'grade_id'}
+        )
+
+        _, data = self.count_queries(f'/api/users/{self.viewer.id}/?expand=skills')
+        self.assertIn('skills', data)
+        self.assertNotIn('experiences', data)
+
+
+class UserUpdateTest(TestCase):
+    def test_experiences_are_synced_by_id(self):
+        user = User.objects.create_user(email='me@example.com', username='me')
+        kept = Experience.objects.create(
+            user=user, company='A', position='Dev', start_date=datetime.date(2020, 1, 1)
+        )
+        Experience.objects.create(
+            user=user, company='B', position='Dev', start_date=datetime.date(2021, 1, 1)
+        )
+        client = APIClient()
+        client.force_authenticate(user)
+
+        response = client.patch(f'/api/users/{user.id}/', {
+            'role_id': 'backend',
+            'grade_id': 'senior',
+            'experiences': [
+                {'id': str(kept.id), 'company': 'A', 'position': 'Lead',
+                 'start_date': '2020-01-01'},
+                {'company': 'C', 'position': 'Dev', 'start_date': '2023-01-01'},
+            ],
+        }, format='json')
+        self.assertEqual(response.status_code, 200)
+
+        experiences = {e['company']: e for e in response.json()['experiences']}
+        self.assertEqual(set(experiences), {'A', 'C'})
+        self.assertEqual(experiences['A']['id'], str(kept.id))
+        self.assertEqual(experiences['A']['position'], 'Lead')
+
+
+class SkillLookupTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='me@example.com', username='me')
+        self.skill = Skill.objects.create(code='python', name='Python')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_skill_ids_are_validated_with_one_query(self):
+        skill_lookup.current()
+        serializer = UserWriteSerializer(
+            self.user, data={'skills': [str(self.skill.id), str(uuid.uuid4())]},
+            partial=True,
+        )
+        with self.assertNumQueries(1):
+            self.assertFalse(serializer.is_valid())
+        self.assertIn('Unknown ids', str(serializer.errors['skills']))
+
+        response = self.client.patch(
+            f'/api/users/{self.user.id}/', {'skills': [str(self.skill.id)]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['skills'], [
+            {'id': str(self.skill.id), 'code': 'python', 'name': 'Python'}
+        ])
+
+    def test_workers_agree_through_shared_generation(self):
+        # Таблица другого процесса: своя копия строк, общее поколение
+        fields = ['id', 'code', 'name']
+        other_worker = LookupTable('skills', Skill.objects.all(), fields)
+        self.assertEqual(other_worker.missing([self.skill.id]), [])
+
+        self.skill.name = 'Python 3'
+        self.skill.save()
+        fresh = Skill.objects.create(code='go', name='Go')
+        self.assertEqual(other_worker.missing([fresh.id]), [])
+        self.assertEqual(other_worker.current()[self.skill.id]['name'], 'Python 3')
+
+        deleted_id = self.skill.id
+        self.skill.delete()
+        self.assertEqual(other_worker.missing([deleted_id]), [deleted_id])
+        response = self.client.patch(
+            f'/api/users/{self.user.id}/', {'skills': [str(deleted_id)]},
+            format='json'
+        )
+        self.assertEqual(response.status_code, 400)
+
+    def test_stale_worker_table_checks_database(self):
+        # Без общего кэша поколение другого воркера не сдвигается
+        fields = ['id', 'code', 'name']
+        other_worker = LookupTable('skills', Skill.objects.all(), fields)
+        other_worker.current()
+        fresh = Skill.objects.create(code='go', name='Go')
+        deleted_id = self.skill.id
+        self.skill.delete()
+        stale = other_worker.generation
+        with mock.patch('growhub.lookups.get_generation', return_value=stale):
+            self.assertIn(deleted_id, other_worker.current())
+            self.assertEqual(
+                other_worker.missing([deleted_id, fresh.id]), [deleted_id]
+            )
+
+
+class ConditionalRetrieveTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='etag@example.com', username='etag')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.url = f'/api/users/{self.user.id}/'
+
+    def test_not_modified_until_nested_data_changes(self):
+        first = self.client.get(self.url)
+        self.assertEqual(first.status_code, 200)
+        self.assertIn('Last-Modified', first)
+
+        # Только запрос версии, без сериализатора и вложенных связей
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+        Experience.objects.create(
+            user=self.user, company='A', position='Dev',
+            start_date=datetime.date(2022, 1, 1)
+        )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], first['ETag'])
+        self.assertEqual(len(response.json()['experiences']), 1)
+
+    def test_experience_edit_and_delete_change_etag(self):
+        experiences = [
+            Experience.objects.create(
+                user=self.user, company=f'C{index}', position='Dev',
+                start_date=datetime.date(2020, 1, index + 1)
+            )
+            for index in range(5)
+        ]
+        etag = self.client.get(self.url)['ETag']
+
+        kept = experiences[0]
+        kept.company = 'Renamed'
+        kept.save()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        experiences[1].delete()
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+
+        # Сверка опыта: одна запись версии профиля, не по строке
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.patch(self.url, {'experiences': [{
+                'id': str(kept.id), 'company': 'Again', 'position': 'Dev',
+                'start_date': '2020-01-01',
+            }]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        profile_updates = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('UPDATE') and 'updated_at' in query['sql']
+            and connection.ops.quote_name(User._meta.db_table)
+            in query['sql'].split('SET')[0]
+        ]
+        self.assertEqual(len(profile_updates), 1)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['experiences']), 1)
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            304
+        )
+
+    def test_unknown_object_is_not_found(self):
+        response = self.client.get('/api/users/not-a-uuid/')
+        self.assertEqual(response.status_code, 404)
+
+
+class ClaimsAuthenticationTest(TestCase):
+    def setUp(self):
+        user_status_cache.clear()
+        self.user = User.objects.create_user(email='jwt@example.com', username='jwt')
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return [q['sql'] for q in context if '"users_user"' in q['sql']]
+
+    def test_user_row_is_not_loaded_per_request(self):
+        self.assertEqual(len(self.user_queries('/api/positions/')), 1)
+        self.assertEqual(self.user_queries('/api/positions/'), [])
+
+    def test_deactivated_user_is_rejected(self):
+        self.client.get('/api/positions/')
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get('/api/positions/')
+        self.assertEqual(response.status_code, 401)
+
+    def test_demoted_staff_token_is_rejected(self):
+        self.user.is_staff = True
+        self.user.save()
+        token = ClaimsTokenObtainPairSerializer.get_token(self.user).access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(self.client.get('/api/metrics/').status_code, 200)
+
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get('/api/metrics/')
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json()['code'], 'permissions_changed')
+
+    def test_self_permission_without_loading_user(self):
+        other = User.objects.create_user(email='other@example.com', username='other')
+        response = self.client.patch(
+            f'/api/users/{other.id}/', {'role_id': 'qa', 'grade_id': 'junior'}
+        )
+        self.assertEqual(response.status_code, 403)
+        response = self.client.patch(
+            f'/api/users/{self.user.id}/', {'role_id': 'qa', 'grade_id': 'junior'}
+        )
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(SUPERUSER_NAME='root', SUPERUSER_PASSWORD='initial')
+class EnsureSuperuserTest(TestCase):
+    def test_creates_once_and_keeps_password(self):
+        out = StringIO()
+        call_command('ensure_superuser', stdout=out)
+        user = User.objects.get(username='root')
+        self.assertTrue(user.is_superuser and user.check_password('initial'))
+
+        user.set_password('changed')
+        user.save()
+        with self.assertNumQueries(1):
+            call_command('ensure_superuser', username='root', stdout=out)
+        user.refresh_from_db()
+        self.assertTrue(user.check_password('changed'))
+        self.assertIn('already exists', out.getvalue())
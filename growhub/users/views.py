@@ -8,7 +8,10 @@ from .serializers import (
     RegisterSerializer, UserReadSerializer,
     UserWriteSerializer, SkillSerializer, ExperienceSerializer)
 from rest_framework.permissions import AllowAny, IsAdminUser
-from rest_framework import filters
+from growhub.async_views import AsyncReadMixin
+from growhub.conditional import ConditionalRetrieveMixin
+from growhub.search import FullTextSearchFilter, RankedOrderingFilter
+from growhub.values_read import ValuesReadMixin
 
 
 class IsSelfOrReadOnly(permissions.BasePermission):
@@ -20,7 +23,7 @@ class IsSelfOrReadOnly(permissions.BasePermission):
     def has_object_permission(self, request, view, obj):
         if request.method in permissions.SAFE_METHODS:
             return True
-        return obj == request.user
+        return obj.pk == request.user.pk
 
 
 class RegisterView(generics.CreateAPIView):
@@ -29,6 +32,9 @@ class RegisterView(generics.CreateAPIView):
 
 
 class UserViewSet(
+    ConditionalRetrieveMixin,
+    ValuesReadMixin,
+    AsyncReadMixin,
     mixins.RetrieveModelMixin,
     mixins.UpdateModelMixin,
     mixins.DestroyModelMixin,
@@ -37,13 +43,19 @@ class UserViewSet(
 ):
     queryset = User.objects.all()
     permission_classes = [permissions.IsAuthenticated, IsSelfOrReadOnly]
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter]
+    async_actions = ('retrieve',)
+    filter_backends = [
+        DjangoFilterBackend,
+        FullTextSearchFilter,
+        RankedOrderingFilter
+    ]
 
     # Для точных фильтров
     filterset_fields = ['role_id', 'grade_id']
 
-    # Для поиска по тексту
-    search_fields = ['username', 'email', 'telegram', 'github', 'linkedin']
+    # Поиск по тексту (?search=) идёт по search_document, см. users.search
+    ordering_fields = ['date_joined', 'username']
+    ordering = ['-date_joined']
 
     def get_serializer_class(self):
         if self.action in ['update', 'partial_update']:
@@ -51,7 +63,44 @@ class UserViewSet(
         return UserReadSerializer
 
     def get_queryset(self):
-        return User.objects.all()
+        queryset = User.objects.all()
+        if self.action in ['list', 'retrieve']:
+            fields = self.get_requested_fields()
+            queryset = queryset.for_read(expand=[
+                field for field in UserReadSerializer.Meta.expandable_fields
+                if field in fields
+            ])
+        return queryset
+
+    def get_serializer(self, *args, **kwargs):
+        if self.action in ['list', 'retrieve']:
+            kwargs.setdefault('fields', self.get_requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_query_param_list(self, name):
+        value = self.request.query_params.get(name)
+        if value is None:
+            return None
+        return [item.strip() for item in value.split(',') if item.strip()]
+
+    def get_requested_fields(self):
+        """
+        ?fields=id,username — ограничить набор полей,
+        ?expand=skills — какие вложенные коллекции включить
+        (без параметра включаются все).
+        """
+        meta = UserReadSerializer.Meta
+        fields = self.get_query_param_list('fields')
+        expand = self.get_query_param_list('expand')
+
+        if fields is None:
+            fields = list(meta.fields)
+        if expand is not None:
+            fields = [
+                field for field in fields
+                if field not in meta.expandable_fields or field in expand
+            ]
+        return [field for field in meta.fields if field in fields]
 
     def update(self, request, *args, **kwargs):
         partial = kwargs.pop('partial', False)
@@ -68,11 +117,13 @@ class SkillViewSet(viewsets.ModelViewSet):
     queryset = Skill.objects.all()
     serializer_class = SkillSerializer
     permission_classes = [IsAdminUser]
+    ordering = ['code']
 
 
-class ExperienceViewSet(viewsets.ModelViewSet):
+class ExperienceViewSet(ConditionalRetrieveMixin, viewsets.ModelViewSet):
     serializer_class = ExperienceSerializer
     permission_classes = [permissions.IsAuthenticated]
+    ordering = ['-start_date']
 
     def get_queryset(self):
         user_id = self.kwargs.get("user_pk")